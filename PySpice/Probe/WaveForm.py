@@ -28,6 +28,7 @@
 
 ####################################################################################################
 
+from collections.abc import Mapping
 import logging
 import os
 
@@ -65,7 +66,9 @@ class WaveForm(UnitValues):
     ##############################################
 
     @classmethod
-    def from_unit_values(cls, name, array, title=None, abscissa=None):
+    def from_unit_values(cls, name, array, title=None, abscissa=None, copy=True):
+        if not copy:
+            return cls._from_view(name, array, title, abscissa)
         obj = cls(
             name,
             array.prefixed_unit,
@@ -80,7 +83,9 @@ class WaveForm(UnitValues):
     ##############################################
 
     @classmethod
-    def from_array(cls, name, array, title=None, abscissa=None):
+    def from_array(cls, name, array, title=None, abscissa=None, copy=True):
+        if not copy:
+            return cls._from_view(name, array, title, abscissa)
         # Fixme: ok ???
         obj = cls(name, None, array.shape, title=title, abscissa=abscissa)
         obj[...] = array[...]
@@ -88,6 +93,17 @@ class WaveForm(UnitValues):
 
     ##############################################
 
+    @classmethod
+    def _from_view(cls, name, array, title=None, abscissa=None):
+        """Return a waveform sharing the memory of *array*, the writeable flag is preserved."""
+        obj = array.view(cls)
+        obj._name = str(name)
+        obj._title = title
+        obj._abscissa = abscissa
+        return obj
+
+    ##############################################
+
     def __new__(cls, name, prefixed_unit, shape,
                 dtype=float, buffer=None, offset=0, strides=None, order=None,
                 title=None, abscissa=None,
@@ -240,6 +256,9 @@ class Analysis:
       :attr:`elements`
         Dictionary for elements ...
 
+    The waveforms can be given as an iterable or as a mapping indexed by names, which is then used
+    as is, e.g. to load the waveforms on demand.
+
     """
 
     ##############################################
@@ -249,11 +268,19 @@ class Analysis:
         # Fixme: branches are elements in fact, and elements is not yet supported ...
 
         self._simulation = simulation
-        # Fixme: to func?
-        self._nodes = {waveform.name:waveform for waveform in nodes}
-        self._branches = {waveform.name:waveform for waveform in branches}
-        self._elements = {waveform.name:waveform for waveform in elements}
-        self._internal_parameters = {waveform.name:waveform for waveform in internal_parameters}
+        self._nodes = self._to_dict(nodes)
+        self._branches = self._to_dict(branches)
+        self._elements = self._to_dict(elements)
+        self._internal_parameters = self._to_dict(internal_parameters)
+
+    ##############################################
+
+    @staticmethod
+    def _to_dict(waveforms):
+        if isinstance(waveforms, Mapping):
+            return waveforms
+        else:
+            return {waveform.name:waveform for waveform in waveforms}
 
     ##############################################
 
@@ -312,6 +339,9 @@ class Analysis:
 
     def __getattr__(self, name):
 
+        # private and special attributes, e.g. when the instance is unpickled
+        if name.startswith('_'):
+            raise AttributeError(name)
         try:
             return self.__getitem__(name)
         except IndexError:
@@ -429,7 +429,7 @@ class PySpicePostInstallation:
 
         command = 'version -f'
         print('> ' + command)
-        print(ngspice.exec_command(command))
+        print(ngspice.exec_command(command, capture=True))
         print()
 
         circuit_test = CircuitTest()
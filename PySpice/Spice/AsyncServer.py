@@ -0,0 +1,144 @@
+####################################################################################################
+#
+# PySpice - A Spice Package for Python
+# Copyright (C) 2021 Fabrice Salvaire
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+####################################################################################################
+
+"""This module implements the asyncio support shared by the asynchronous simulator servers, see
+:class:`PySpice.Spice.NgSpice.Server.AsyncSpiceServer` and
+:class:`PySpice.Spice.Xyce.Server.AsyncXyceServer`.
+
+An event loop can drive many simulations concurrently without a thread per simulation::
+
+    spice_server = AsyncSpiceServer(max_concurrency=16, timeout=60)
+
+    async def simulate(simulator):
+        simulation = simulator.prepare('operating_point')
+        raw_file = await spice_server(simulation)
+        raw_file.simulation = simulation
+        return raw_file.to_analysis()
+
+    analyses = await asyncio.gather(*(simulate(simulator) for simulator in simulators))
+
+"""
+
+####################################################################################################
+
+__all__ = ['AsyncServerMixin']
+
+####################################################################################################
+
+import asyncio
+import logging
+import weakref
+
+####################################################################################################
+
+_module_logger = logging.getLogger(__name__)
+
+####################################################################################################
+
+class AsyncServerMixin:
+
+    """This mixin runs the simulator processes using :func:`asyncio.create_subprocess_exec`.
+
+    At most *max_concurrency* processes run at the same time in an event loop, :obj:`None` means
+    unlimited.  A simulation which doesn't complete within *timeout* seconds raises
+    :exc:`NameError`.  When the simulation times out or the calling task is cancelled, the process
+    is killed.  The limits are handled by :class:`PySpice.Spice.ProcessLimits.ProcessLimits` set by the server.
+
+    """
+
+    _logger = _module_logger.getChild('AsyncServerMixin')
+
+    ##############################################
+
+    def __init__(self, **kwargs):
+
+        super().__init__(**kwargs)
+
+        max_concurrency = kwargs.get('max_concurrency', None)
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError('The maximum concurrency must be positive')
+        self._max_concurrency = max_concurrency
+        # a semaphore is bound to the event loop where it is used
+        self._semaphores = weakref.WeakKeyDictionary()
+        self._number_of_running_processes = 0
+
+    ##############################################
+
+    @property
+    def max_concurrency(self):
+        return self._max_concurrency
+
+    @property
+    def number_of_running_processes(self):
+        return self._number_of_running_processes
+
+    ##############################################
+
+    def _get_semaphore(self):
+        if self._max_concurrency is None:
+            return None
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self._max_concurrency)
+        return semaphore
+
+    ##############################################
+
+    async def _communicate(self, command, input_=None, timeout=None):
+
+        """Run the command, send *input_* on its standard input and return the standard output and
+        error as bytes.
+
+        """
+
+        if timeout is None:
+            timeout = self._limits.timeout
+        semaphore = self._get_semaphore()
+        if semaphore is not None:
+            async with semaphore:
+                return await self._run_process(command, input_, timeout)
+        else:
+            return await self._run_process(command, input_, timeout)
+
+    ##############################################
+
+    async def _run_process(self, command, input_, timeout):
+
+        self._logger.info('Run {}'.format(' '.join(command)))
+        process = await asyncio.create_subprocess_exec(
+            *self._limits.command(command),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        self._number_of_running_processes += 1
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(input_), timeout)
+            self._limits.check_return_code(process.returncode, stderr or stdout)
+            return stdout, stderr
+        except asyncio.TimeoutError:
+            raise self._limits.timeout_error(timeout=timeout)
+        finally:
+            self._number_of_running_processes -= 1
+            if process.returncode is None:
+                self._logger.info('Kill process {}'.format(process.pid))
+                process.kill()
+                await process.wait()
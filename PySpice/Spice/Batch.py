@@ -0,0 +1,162 @@
+####################################################################################################
+#
+# PySpice - A Spice Package for Python
+# Copyright (C) 2021 Fabrice Salvaire
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+####################################################################################################
+
+"""This module implements the batch execution of independent simulations in a pool of processes.
+
+It is intended to run a large number of decks using the subprocess simulators, i.e. ngspice in
+server mode or Xyce.  The simulations are sent to the worker processes, where the decks are
+rendered and simulated, and the results are yielded in completion order::
+
+    simulations = []
+    for circuit in circuits:
+        simulator = circuit.simulator(simulator='ngspice-subprocess')
+        simulations.append(simulator.prepare('transient', step_time=1@u_us, end_time=1@u_ms))
+
+    for result in simulate_many(simulations, max_workers=8):
+        if result.error is None:
+            print(result.index, result.analysis.out)
+        else:
+            print(result.index, 'failed', result.error)
+
+The simulations, and thus the circuits, are pickled, so they must not be modified before they are
+submitted, i.e. while the generator is consumed.  Only the waveforms are sent back by the workers,
+they are attached to the submitted simulations.  A simulator using a persistent ngspice server runs
+on the shared server of the worker having the same settings, see
+:meth:`PySpice.Spice.NgSpice.Server.PersistentSpiceServer.shared`.  The shared library simulator
+cannot be used, since its ngspice instance lives in the calling process.
+
+"""
+
+####################################################################################################
+
+__all__ = [
+    'SimulationResult',
+    'simulate_many',
+]
+
+####################################################################################################
+
+import logging
+import os
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .Cache import SimulationCache
+
+####################################################################################################
+
+_module_logger = logging.getLogger(__name__)
+
+####################################################################################################
+
+class SimulationResult:
+
+    """This class holds the result of a simulation run by :func:`simulate_many`.
+
+    Public Attributes:
+
+      :attr:`index`
+        index of the simulation in the input order
+
+      :attr:`simulation`
+        the submitted simulation
+
+      :attr:`analysis`
+        the analysis or :obj:`None` if the simulation failed
+
+      :attr:`error`
+        the exception raised by the simulation or :obj:`None`
+
+    """
+
+    ##############################################
+
+    def __init__(self, index, simulation, analysis=None, error=None):
+        self.index = index
+        self.simulation = simulation
+        self.analysis = analysis
+        self.error = error
+
+    ##############################################
+
+    @property
+    def failed(self):
+        return self.error is not None
+
+    ##############################################
+
+    def __repr__(self):
+        status = 'failed: {}'.format(self.error) if self.failed else 'done'
+        return '{} {} {}'.format(self.__class__.__name__, self.index, status)
+
+####################################################################################################
+
+def _simulate(simulation):
+    # run in the worker process, the simulation is not sent back
+    return SimulationCache._detach(simulation._simulate())
+
+####################################################################################################
+
+def simulate_many(simulations, max_workers=None):
+
+    """Run the simulations in a pool of up to *max_workers* processes, by default the number of
+    CPUs, and yield a :class:`SimulationResult` for each simulation in completion order.
+
+    A simulation is a subprocess simulator where an analysis is declared, see
+    :meth:`PySpice.Spice.Simulation.CircuitSimulator.prepare`.  The errors are captured in the
+    results, and don't stop the other simulations.  The analyses are attached to the submitted
+    simulations.  A :exc:`ValueError` is raised for a shared library simulator.
+
+    """
+
+    from .NgSpice.Simulation import NgSpiceSharedCircuitSimulator
+
+    simulations = list(simulations)
+    for index, simulation in enumerate(simulations):
+        if isinstance(simulation, NgSpiceSharedCircuitSimulator):
+            raise ValueError('Simulation {} uses the ngspice shared library,'
+                             ' use a subprocess simulator'.format(index))
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = max(1, min(max_workers, len(simulations)))
+    if not simulations:
+        return
+
+    _module_logger.info('Run {} simulations using {} processes'.format(len(simulations), max_workers))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {}
+        for index, simulation in enumerate(simulations):
+            futures[executor.submit(_simulate, simulation)] = index
+        try:
+            for future in as_completed(futures):
+                index = futures[future]
+                simulation = simulations[index]
+                try:
+                    analysis = future.result()
+                except Exception as exception:
+                    _module_logger.warning('Simulation {} failed: {}'.format(index, exception))
+                    yield SimulationResult(index, simulation, error=exception)
+                else:
+                    analysis._simulation = simulation
+                    yield SimulationResult(index, simulation, analysis)
+        finally:
+            # the generator can be closed before the end
+            for future in futures:
+                future.cancel()
@@ -0,0 +1,280 @@
+####################################################################################################
+#
+# PySpice - A Spice Package for Python
+# Copyright (C) 2021 Fabrice Salvaire
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+####################################################################################################
+
+"""This module implements an on-disk cache of the simulation results.
+
+The results are indexed by a SHA-256 hash of the rendered deck, of the content of the included
+files and libraries, of the simulator name and of the simulator version.  Thus a simulation is only
+run again if something which could change its result was modified.
+
+The cache is enabled by the *cache* parameter of a simulator, which can be a
+:class:`SimulationCache` instance or a directory path::
+
+    cache = SimulationCache('~/.cache/pyspice', max_size=2**30)
+    simulator = circuit.simulator(cache=cache)
+    analysis = simulator.transient(step_time=1@u_us, end_time=1@u_ms)
+
+Each analysis is stored as a pickle file.  The files are written atomically and the cache can be
+shared by several processes.  When the total size exceeds *max_size*, the least recently used
+entries are removed.
+
+"""
+
+####################################################################################################
+
+__all__ = ['SimulationCache']
+
+####################################################################################################
+
+import copy
+import hashlib
+import logging
+import os
+import pickle
+import re
+import tempfile
+import time
+
+from pathlib import Path
+
+####################################################################################################
+
+_module_logger = logging.getLogger(__name__)
+
+####################################################################################################
+
+class SimulationCache:
+
+    """This class implements a content-addressed cache of analyses in a directory.
+
+    *max_size* is the maximum total size of the cache in bytes, :obj:`None` means unbounded.
+
+    """
+
+    _logger = _module_logger.getChild('SimulationCache')
+
+    VERSION = 1
+    SUFFIX = '.pickle'
+
+    # .include path, .lib path section, but not the .lib section ... .endl blocks of a library
+    INCLUDE_PATTERN = re.compile(r'^[ \t]*\.(?:include|inc|lib(?=[ \t]+\S+[ \t]+[^\s*;]))[ \t]+["\']?([^\s"\']+)',
+                                 re.IGNORECASE | re.MULTILINE)
+
+    ##############################################
+
+    def __init__(self, directory, max_size=2**30):
+
+        if max_size is not None and max_size <= 0:
+            raise ValueError('The maximum size must be positive')
+        self._directory = Path(directory).expanduser()
+        self._directory.mkdir(parents=True, exist_ok=True)
+        self._max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+    ##############################################
+
+    @property
+    def directory(self):
+        return self._directory
+
+    @property
+    def max_size(self):
+        return self._max_size
+
+    ##############################################
+
+    def _entries(self):
+        entries = []
+        for entry in os.scandir(self._directory):
+            if entry.name.endswith(self.SUFFIX):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    # removed by another process
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        return entries
+
+    def __len__(self):
+        return len(self._entries())
+
+    @property
+    def size(self):
+        """Total size of the entries in bytes"""
+        return sum(size for mtime, size, path in self._entries())
+
+    ##############################################
+
+    def _path(self, key):
+        return self._directory.joinpath(key + self.SUFFIX)
+
+    ##############################################
+
+    def _hash_file(self, hasher, path, visited):
+
+        # hash the file and the files it includes
+        path = Path(path).expanduser()
+        if path in visited:
+            return
+        visited.add(path)
+        hasher.update(str(path).encode('utf-8') + b'\0')
+        try:
+            content = path.read_bytes()
+        except OSError:
+            hasher.update(b'\0missing\0')
+            return
+        hasher.update(hashlib.sha256(content).digest())
+        text = content.decode('utf-8', errors='replace')
+        for match in self.INCLUDE_PATTERN.finditer(text):
+            self._hash_file(hasher, path.parent.joinpath(match.group(1)), visited)
+
+    ##############################################
+
+    def key(self, simulator):
+
+        """Return the key of the simulation declared in the simulator."""
+
+        hasher = hashlib.sha256()
+        for item in (
+                'PySpice simulation cache {}'.format(self.VERSION),
+                simulator.SIMULATOR,
+                simulator.__class__.__name__,
+                str(simulator.simulator_version),
+                str(simulator),
+        ):
+            hasher.update(item.encode('utf-8') + b'\0')
+        circuit = simulator.circuit
+        visited = set()
+        for path in circuit._includes:
+            self._hash_file(hasher, path, visited)
+        for path, section in circuit._libs:
+            self._hash_file(hasher, path, visited)
+        return hasher.hexdigest()
+
+    ##############################################
+
+    def get(self, key):
+
+        """Return the analysis for the key or :obj:`None`."""
+
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as fh:
+                analysis = pickle.load(fh)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError) as exception:
+            self._logger.warning('Cannot read cache entry {}: {}'.format(key, exception))
+            self.misses += 1
+            return None
+        self._touch(path)
+        self.hits += 1
+        return analysis
+
+    ##############################################
+
+    @staticmethod
+    def _touch(path):
+        # The modification time gives the least recently used order, the file system timestamps
+        # can be too coarse to order successive accesses.
+        now = time.time_ns()
+        try:
+            os.utime(path, ns=(now, now))
+        except OSError:
+            pass
+
+    ##############################################
+
+    @staticmethod
+    def _detach(analysis):
+        # The simulation isn't stored and lazy waveforms are fetched
+        analysis = copy.copy(analysis)
+        analysis._simulation = None
+        for attribute in ('_nodes', '_branches', '_elements', '_internal_parameters'):
+            setattr(analysis, attribute, dict(getattr(analysis, attribute)))
+        return analysis
+
+    ##############################################
+
+    def put(self, key, analysis):
+
+        """Store the analysis for the key."""
+
+        data = pickle.dumps(self._detach(analysis), protocol=pickle.HIGHEST_PROTOCOL)
+        fd, tmp_path = tempfile.mkstemp(dir=self._directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as fh:
+                fh.write(data)
+            path = self._path(key)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+        self._touch(path)
+        if self._max_size is not None:
+            self.evict(self._max_size)
+
+    ##############################################
+
+    def evict(self, max_size):
+
+        """Remove the least recently used entries until the total size is lower than *max_size*."""
+
+        entries = self._entries()
+        size = sum(entry[1] for entry in entries)
+        if size <= max_size:
+            return
+        entries.sort()
+        for mtime, entry_size, path in entries:
+            if size <= max_size:
+                break
+            try:
+                os.unlink(path)
+                self._logger.debug('Evict {}'.format(path))
+            except FileNotFoundError:
+                pass
+            size -= entry_size
+
+    ##############################################
+
+    def clear(self):
+        """Remove all the entries."""
+        self.evict(0)
+
+    ##############################################
+
+    def lookup(self, simulator):
+
+        """Return a pair *(key, analysis)* for the simulation declared in the simulator, the analysis
+        is :obj:`None` if it is not in the cache.
+
+        """
+
+        key = self.key(simulator)
+        analysis = self.get(key)
+        if analysis is not None:
+            analysis._simulation = simulator
+            self._logger.info('Cache hit {}'.format(key))
+        return key, analysis
@@ -0,0 +1,330 @@
+####################################################################################################
+#
+# PySpice - A Spice Package for Python
+# Copyright (C) 2021 Fabrice Salvaire
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+####################################################################################################
+
+"""This module implements Monte Carlo analyses.
+
+Tolerances are attached to element parameters and to model parameters as distributions::
+
+    circuit.R1.set_tolerance('resistance', Gaussian(.01))
+    circuit.R2.set_tolerance('resistance', Gaussian(.01), Gaussian(.05, lot='resistors'))
+    diode_model.set_tolerance('IS', Uniform(.2))
+
+A distribution has a *tolerance*, which is relative to the nominal value by default.  The
+deviations of several distributions attached to a parameter are summed.  Distributions sharing the
+same *lot* name use the same draw for a sample, thus the corresponding parameters are fully
+correlated, e.g. the resistors of an array, while the other draws are independent, e.g. the
+device mismatch.
+
+The samples are drawn at once using Numpy, then the analysis is run for each sample using the
+sweep machinery of :mod:`PySpice.Spice.Sweep`, thus in parallel for the subprocess simulators::
+
+    monte_carlo = MonteCarlo(simulator, number_of_samples=1000, seed=0)
+    analysis = monte_carlo.run('operating_point')
+    analysis.mean('out'), analysis.std('out')
+
+The shared library simulator runs the samples sequentially, since an Ngspice instance can only
+run a simulation at once, excepted if a pool of instances is given::
+
+    pool = NgSpiceSharedPool(number_of_instances=4)
+    analysis = monte_carlo.run('operating_point', pool=pool)
+
+"""
+
+####################################################################################################
+
+__all__ = [
+    'Distribution',
+    'Gaussian',
+    'MonteCarlo',
+    'MonteCarloAnalysis',
+    'Uniform',
+]
+
+####################################################################################################
+
+import logging
+
+import numpy as np
+
+####################################################################################################
+
+from .Sweep import ParameterSweep, SweepAnalysis
+
+####################################################################################################
+
+_module_logger = logging.getLogger(__name__)
+
+####################################################################################################
+
+class Distribution:
+
+    """Base class for the distributions.
+
+    If *relative* is set, the *tolerance* is relative to the nominal value, else it is an absolute
+    deviation.  Distributions having the same *lot* name share their draws.
+
+    """
+
+    ##############################################
+
+    def __init__(self, tolerance, relative=True, lot=None):
+        self._tolerance = float(tolerance)
+        self._relative = bool(relative)
+        self._lot = lot
+
+    ##############################################
+
+    @property
+    def tolerance(self):
+        return self._tolerance
+
+    @property
+    def relative(self):
+        return self._relative
+
+    @property
+    def lot(self):
+        return self._lot
+
+    ##############################################
+
+    def standard_draw(self, rng, size):
+        """Return *size* draws of the standardised variable."""
+        raise NotImplementedError
+
+    def deviation(self, draws):
+        """Return the deviations for the standardised draws."""
+        return self._tolerance * draws
+
+####################################################################################################
+
+class Gaussian(Distribution):
+
+    """This class implements a gaussian distribution, the tolerance corresponds to *sigma* standard
+    deviations, i.e. 3 sigma by default.
+
+    """
+
+    ##############################################
+
+    def __init__(self, tolerance, sigma=3, relative=True, lot=None):
+        super().__init__(tolerance, relative, lot)
+        self._sigma = float(sigma)
+
+    @property
+    def sigma(self):
+        return self._sigma
+
+    ##############################################
+
+    def standard_draw(self, rng, size):
+        return rng.standard_normal(size)
+
+    def deviation(self, draws):
+        return self._tolerance / self._sigma * draws
+
+####################################################################################################
+
+class Uniform(Distribution):
+
+    """This class implements a uniform distribution within the tolerance."""
+
+    ##############################################
+
+    def standard_draw(self, rng, size):
+        return rng.uniform(-1, 1, size)
+
+####################################################################################################
+
+class MonteCarlo:
+
+    """This class implements a Monte Carlo analysis of the tolerances of the simulator circuit.
+
+    *seed* is passed to :func:`numpy.random.default_rng` to reproduce a run.
+
+    """
+
+    _logger = _module_logger.getChild('MonteCarlo')
+
+    ##############################################
+
+    def __init__(self, simulator, number_of_samples, seed=None):
+
+        if number_of_samples < 1:
+            raise ValueError('The number of samples must be positive')
+        self._simulator = simulator
+        self._number_of_samples = int(number_of_samples)
+        self._seed = seed
+
+    ##############################################
+
+    @property
+    def simulator(self):
+        return self._simulator
+
+    @property
+    def number_of_samples(self):
+        return self._number_of_samples
+
+    ##############################################
+
+    def tolerances(self):
+
+        """Return the list of tuples *(key, nominal value, distributions)* where the key is a sweep
+        parameter key, see :mod:`PySpice.Spice.Sweep`.
+
+        """
+
+        circuit = self._simulator.circuit
+        tolerances = []
+        for element in circuit.elements:
+            if not element.enabled:
+                continue
+            for name, distributions in element.tolerances.items():
+                tolerances.append(('{}.{}'.format(element.name, name), getattr(element, name), distributions))
+        for model in circuit.models:
+            for name, distributions in model.tolerances.items():
+                tolerances.append(('{}.{}'.format(model.name, name), model[name], distributions))
+        return tolerances
+
+    ##############################################
+
+    def draw(self):
+
+        """Draw the samples and return a dictionary of arrays indexed by parameter keys."""
+
+        rng = np.random.default_rng(self._seed)
+        size = self._number_of_samples
+        lot_draws = {}
+        samples = {}
+        for key, nominal, distributions in self.tolerances():
+            try:
+                nominal = float(nominal)
+            except (TypeError, ValueError):
+                raise NameError("Parameter {} value {} is not a number".format(key, nominal))
+            relative_deviation = np.zeros(size)
+            absolute_deviation = np.zeros(size)
+            for distribution in distributions:
+                if distribution.lot is not None:
+                    lot_key = (distribution.lot, distribution.__class__)
+                    if lot_key not in lot_draws:
+                        lot_draws[lot_key] = distribution.standard_draw(rng, size)
+                    draws = lot_draws[lot_key]
+                else:
+                    draws = distribution.standard_draw(rng, size)
+                if distribution.relative:
+                    relative_deviation += distribution.deviation(draws)
+                else:
+                    absolute_deviation += distribution.deviation(draws)
+            samples[key] = nominal * (1 + relative_deviation) + absolute_deviation
+        return samples
+
+    ##############################################
+
+    def run(self, analysis, *args, max_workers=None, pool=None, **kwargs):
+
+        """Run the analysis *analysis*, e.g. ``'transient'``, for each sample and return a
+        :class:`MonteCarloAnalysis`.  *args* and *kwargs* are the analysis parameters.
+
+        For the shared library simulator, the samples are run sequentially on the simulator
+        instance, unless *pool* is a :class:`PySpice.Spice.NgSpice.Shared.NgSpiceSharedPool`.
+
+        """
+
+        samples = self.draw()
+        if not samples:
+            raise NameError('No tolerance is defined in the circuit')
+        self._logger.info('Run {} samples for {} parameters'.format(self._number_of_samples, len(samples)))
+        sweep = ParameterSweep(samples, mode='zip')
+        analyses = sweep.execute(self._simulator, analysis, *args, max_workers=max_workers, pool=pool, **kwargs)
+        return MonteCarloAnalysis(sweep, analyses, samples)
+
+####################################################################################################
+
+class MonteCarloAnalysis(SweepAnalysis):
+
+    """This class stacks the analyses of a Monte Carlo run along the first axis, and computes
+    statistics over the samples.  NaN values, i.e. padding, are ignored.
+
+    Public Attributes:
+
+      :attr:`samples`
+        dictionary of the parameter values indexed by parameter keys
+
+    """
+
+    ##############################################
+
+    def __init__(self, sweep, analyses, samples):
+        super().__init__(sweep, analyses)
+        self._samples = samples
+
+    ##############################################
+
+    @property
+    def samples(self):
+        return self._samples
+
+    @property
+    def number_of_samples(self):
+        return len(self._analyses)
+
+    ##############################################
+
+    def mean(self, name):
+        return np.nanmean(self[name], axis=0)
+
+    def std(self, name):
+        return np.nanstd(self[name], axis=0)
+
+    def min(self, name):
+        return np.nanmin(self[name], axis=0)
+
+    def max(self, name):
+        return np.nanmax(self[name], axis=0)
+
+    def percentile(self, name, q):
+        return np.nanpercentile(self[name], q, axis=0)
+
+    ##############################################
+
+    def statistics(self, name):
+        """Return a dictionary of summary statistics over the samples."""
+        return {
+            'mean': self.mean(name),
+            'std': self.std(name),
+            'min': self.min(name),
+            'max': self.max(name),
+        }
+
+    ##############################################
+
+    def yield_ratio(self, predicate):
+
+        """Return the fraction of samples for which *predicate* returns true.
+
+        *predicate* is called with the analysis of a sample, e.g.::
+
+            analysis.yield_ratio(lambda analysis: 4.9 < float(analysis.out) < 5.1)
+
+        """
+
+        passed = sum(1 for analysis in self._analyses if predicate(analysis))
+        return passed / len(self._analyses)
@@ -158,11 +158,15 @@ class DeviceModel:
                 key = key[:-1]
             self._parameters[key] = value
 
+        self._tolerances = {}
+
     ##############################################
 
     def clone(self):
         # Fixme: clone parameters ???
-        return self.__class__(self._name, self._model_type, self._parameters)
+        model = self.__class__(self._name, self._model_type, **self._parameters)
+        model._tolerances = dict(self._tolerances)
+        return model
 
     ##############################################
 
@@ -183,9 +187,28 @@ class DeviceModel:
     def __getitem__(self, name):
         return self._parameters[name]
 
+    def __setitem__(self, name, value):
+        self._parameters[name] = value
+
+    ##############################################
+
+    @property
+    def tolerances(self):
+        """Dictionary of the parameter distributions, see :mod:`PySpice.Spice.MonteCarlo`"""
+        return self._tolerances
+
+    def set_tolerance(self, name, *distributions):
+        """Set the distributions of a parameter for a Monte Carlo analysis."""
+        if name not in self._parameters:
+            raise NameError("Model {} doesn't have a parameter {}".format(self._name, name))
+        self._tolerances[name] = distributions
+
     ##############################################
 
     def __getattr__(self, name):
+        # private and special attributes, e.g. when the instance is unpickled
+        if name.startswith('_'):
+            raise AttributeError(name)
         try:
             return self._parameters[name]
         except KeyError:
@@ -505,6 +528,7 @@ class Element(metaclass=ElementParameterMetaClass):
         self._name = str(name)
         self.raw_spice = ''
         self.enabled = True
+        self._tolerances = {}
 
         # Process remaining args
         if len(self._parameters_from_args) < len(args):
@@ -546,6 +570,30 @@ class Element(metaclass=ElementParameterMetaClass):
         if hasattr(self, 'raw_spice'):
             element.raw_spice = self.raw_spice
 
+        element._tolerances = dict(self._tolerances)
+
+    ##############################################
+
+    @property
+    def tolerances(self):
+        """Dictionary of the parameter distributions, see :mod:`PySpice.Spice.MonteCarlo`"""
+        return self._tolerances
+
+    def set_tolerance(self, name, *distributions):
+
+        """Set the distributions of a parameter for a Monte Carlo analysis, e.g.::
+
+            circuit.R1.set_tolerance('resistance', Gaussian(.01), Gaussian(.05, lot='resistors'))
+
+        """
+
+        cls = self.__class__
+        if name in cls._spice_to_parameters:
+            name = cls._spice_to_parameters[name].attribute_name
+        elif name not in cls._positional_parameters and name not in cls._optional_parameters:
+            raise NameError("Element {} doesn't have a parameter {}".format(self.name, name))
+        self._tolerances[name] = distributions
+
     ##############################################
 
     @property
@@ -885,6 +933,46 @@ class Netlist:
 
     ##############################################
 
+    def flat_size(self):
+
+        """Return the numbers of elements and of nodes of the netlist once the subcircuit instances
+        are expanded.
+
+        An instance of a subcircuit which is not defined in the netlist, e.g. in a library, counts
+        for one element.
+
+        """
+
+        return self._flat_size({}, {}, ())
+
+    def _flat_size(self, subcircuits, sizes, external_nodes):
+
+        # subcircuits defined in the enclosing netlists are visible
+        subcircuits = dict(subcircuits)
+        subcircuits.update(self._subcircuits)
+
+        number_of_elements = 0
+        number_of_nodes = len(set(self._nodes) - set(str(node) for node in external_nodes))
+        for element in self._elements.values():
+            if not element.enabled:
+                continue
+            subcircuit = subcircuits.get(getattr(element, 'subcircuit_name', None))
+            if subcircuit is None:
+                number_of_elements += 1
+                continue
+            name = subcircuit.name
+            if name not in sizes:
+                sizes[name] = (1, 0) # guard against recursive definitions
+                external_nodes = list(subcircuit._external_nodes) + [subcircuit._ground]
+                sizes[name] = subcircuit._flat_size(subcircuits, sizes, external_nodes)
+            elements, nodes = sizes[name]
+            number_of_elements += elements
+            number_of_nodes += nodes
+
+        return number_of_elements, number_of_nodes
+
+    ##############################################
+
     def element(self, name):
         return self._elements[name]
 
@@ -911,6 +999,9 @@ class Netlist:
     ##############################################
 
     def __getattr__(self, attribute_name):
+        # private and special attributes, e.g. when the instance is unpickled
+        if attribute_name.startswith('_'):
+            raise AttributeError(attribute_name)
         try:
             return self.__getitem__(attribute_name)
         except IndexError:
@@ -1173,8 +1264,10 @@ class Circuit(Netlist):
 
         for include in self._includes:
             circuit.include(include)
+        for lib in self._libs:
+            circuit._libs.append(lib)
         for name, value in self._parameters.items():
-            self.parameter(name, value)
+            circuit.parameter(name, value)
 
         return circuit
 
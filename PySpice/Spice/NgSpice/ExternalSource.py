@@ -0,0 +1,126 @@
+####################################################################################################
+#
+# PySpice - A Spice Package for Python
+# Copyright (C) 2021 Fabrice Salvaire
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+####################################################################################################
+
+"""This module implements array-backed external sources for the Ngspice shared library.
+
+An external source is declared in the netlist using the *external* keyword, e.g.::
+
+    circuit.V('input', 'input', circuit.gnd, 'dc 0 external')
+
+Ngspice then calls the *get_vsrc_data* or *get_isrc_data* callback at each iteration to get the
+value of the source.  Instead of reimplementing these callbacks in Python, an
+:class:`ArraySource` can be registered on a :class:`PySpice.Spice.NgSpice.Shared.NgSpiceShared`
+instance, the callback then only performs a dictionary lookup and a linear interpolation::
+
+    ngspice_shared.add_array_source('vinput', time, values)
+
+"""
+
+####################################################################################################
+
+__all__ = ['ArraySource']
+
+####################################################################################################
+
+from bisect import bisect_right
+import logging
+
+import numpy as np
+
+####################################################################################################
+
+_module_logger = logging.getLogger(__name__)
+
+####################################################################################################
+
+class ArraySource:
+
+    """This class implements a piecewise linear source defined by time and value arrays.
+
+    The values are held constant before the first and after the last time point.  If *period* is
+    set, the waveform is repeated with this period starting at the first time point.
+
+    The slopes are precomputed and the index of the last interval is cached, thus a call for a time
+    in the same interval, or in the next one, does not require a search.  Since Ngspice can reject
+    a time step and go back in time, the interval is otherwise found by bisection.
+
+    """
+
+    _logger = _module_logger.getChild('ArraySource')
+
+    ##############################################
+
+    def __init__(self, time, values, period=None):
+
+        time = np.asarray(time, dtype=np.float64)
+        values = np.asarray(values, dtype=np.float64)
+        if time.ndim != 1 or time.shape != values.shape:
+            raise ValueError('Time and values must be 1D arrays of the same size')
+        if not time.size:
+            raise ValueError('Empty source')
+        if np.any(np.diff(time) <= 0):
+            raise ValueError('Time must be strictly increasing')
+
+        # Python floats are faster than Numpy scalars for scalar arithmetic
+        self._time = time.tolist()
+        self._values = values.tolist()
+        if time.size > 1:
+            self._slopes = (np.diff(values) / np.diff(time)).tolist()
+        else:
+            self._slopes = []
+        self._period = float(period) if period is not None else None
+        self._index = 0
+
+    ##############################################
+
+    @property
+    def time(self):
+        return np.array(self._time)
+
+    @property
+    def values(self):
+        return np.array(self._values)
+
+    @property
+    def period(self):
+        return self._period
+
+    ##############################################
+
+    def __call__(self, time):
+
+        """Return the value at *time*."""
+
+        times = self._time
+        if self._period is not None and time > times[0]:
+            time = times[0] + (time - times[0]) % self._period
+        if time <= times[0]:
+            return self._values[0]
+        if time >= times[-1]:
+            return self._values[-1]
+
+        i = self._index
+        if not times[i] <= time < times[i+1]:
+            if times[i+1] <= time < times[i+2]:
+                i += 1
+            else:
+                i = bisect_right(times, time) - 1
+            self._index = i
+        return self._values[i] + self._slopes[i] * (time - times[i])
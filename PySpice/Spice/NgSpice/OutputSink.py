@@ -0,0 +1,162 @@
+####################################################################################################
+#
+# PySpice - A Spice Package for Python
+# Copyright (C) 2021 Fabrice Salvaire
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+####################################################################################################
+
+"""This module implements sinks for the output sent by the Ngspice shared library through the
+*send_char* callback.
+
+By default, :class:`PySpice.Spice.NgSpice.Shared.NgSpiceShared` stores the output of the last
+command in lists, which grow without limit when a command is verbose, e.g. a run with traces.  An
+output sink can be set to bound the memory or to stream the output to a file::
+
+    NgSpiceShared.new_instance(output_sink=RingBufferSink(1000))
+
+The lines are stored as bytes and are only decoded on access.
+
+"""
+
+####################################################################################################
+
+__all__ = [
+    'DropSink',
+    'FileSink',
+    'ListSink',
+    'OutputSink',
+    'RingBufferSink',
+]
+
+####################################################################################################
+
+from collections import deque
+
+####################################################################################################
+
+STDOUT = 'stdout'
+STDERR = 'stderr'
+
+####################################################################################################
+
+def decode(line):
+    return line.decode('utf8', errors='replace')
+
+####################################################################################################
+
+class OutputSink:
+
+    """Base class for the output sinks.
+
+    The output is cleared before each command, thus the lines returned by :meth:`lines` are the
+    output of the last command.
+
+    """
+
+    ##############################################
+
+    def write(self, stream, line):
+        """Write a line given as bytes, *stream* is ``'stdout'`` or ``'stderr'``."""
+        raise NotImplementedError
+
+    def clear(self):
+        pass
+
+    def lines(self, stream):
+        """Return the list of decoded lines which are still available."""
+        return []
+
+####################################################################################################
+
+class ListSink(OutputSink):
+
+    """This class stores every line, it is the default sink."""
+
+    ##############################################
+
+    def __init__(self):
+        self._lines = {STDOUT: [], STDERR: []}
+
+    ##############################################
+
+    def write(self, stream, line):
+        self._lines[stream].append(line)
+
+    def clear(self):
+        for lines in self._lines.values():
+            lines.clear()
+
+    def lines(self, stream):
+        return [decode(line) for line in self._lines[stream]]
+
+####################################################################################################
+
+class RingBufferSink(ListSink):
+
+    """This class only keeps the last *max_lines* lines of each stream."""
+
+    ##############################################
+
+    def __init__(self, max_lines=1000):
+        self._max_lines = int(max_lines)
+        self._lines = {STDOUT: deque(maxlen=self._max_lines), STDERR: deque(maxlen=self._max_lines)}
+
+    @property
+    def max_lines(self):
+        return self._max_lines
+
+####################################################################################################
+
+class FileSink(OutputSink):
+
+    """This class writes the lines to a file as they come, *file* is a path or a binary file object.
+
+    Each line is prefixed by the stream name like the lines sent by Ngspice.
+
+    """
+
+    ##############################################
+
+    def __init__(self, file, mode='ab'):
+        if hasattr(file, 'write'):
+            self._file = file
+            self._owner = False
+        else:
+            self._file = open(file, mode)
+            self._owner = True
+
+    ##############################################
+
+    def write(self, stream, line):
+        self._file.write(stream.encode('ascii') + b' ' + line + b'\n')
+
+    def clear(self):
+        self._file.flush()
+
+    def close(self):
+        if self._owner:
+            self._file.close()
+
+####################################################################################################
+
+class DropSink(OutputSink):
+
+    """This class discards the output."""
+
+    ##############################################
+
+    def write(self, stream, line):
+        pass
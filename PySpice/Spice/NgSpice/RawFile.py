@@ -22,7 +22,7 @@
 
 import os
 
-from ..RawFile import VariableAbc, RawFileAbc
+from ..RawFile import VariableAbc, RawFileAbc, RawFileWriterAbc
 
 ####################################################################################################
 
@@ -140,6 +140,9 @@ class RawFile(RawFileAbc):
       :attr:`flags`
         'real' or 'complex'
 
+      :attr:`memory_map`
+        the memory map of the raw data or :obj:`None`
+
       :attr:`number_of_points`
 
       :attr:`number_of_variables`
@@ -161,13 +164,35 @@ class RawFile(RawFileAbc):
 
     _variable_cls = Variable
 
+    # The stdout of ngspice in server mode uses the line separator of the platform, unlike the
+    # raw files written by ngspice
+    OUTPUT_LINES = (b'Binary:' + os.linesep.encode('ascii'), b'Values:' + os.linesep.encode('ascii'))
+
     ##############################################
 
-    def __init__(self, stdout, number_of_points):
+    def __init__(self, stdout=None, number_of_points=None, path=None, memory_map=False, variables=None):
+
+        """*stdout* is the output of ngspice in server mode or the content of a raw file written by
+        the *write* command.  For the latter, *number_of_points* is read from the header.
+
+        Alternatively, a raw file written by the *write* command is read from *path*, a path or a
+        binary file object.  If *memory_map* is set, the file is memory-mapped and the data of the
+        variables and of the waveforms are read-only views on the memory map.
+
+        *variables* selects the variables to load by names or patterns, see
+        :class:`PySpice.Spice.RawFile.RawFileAbc`.
+
+        """
 
         self.number_of_points = number_of_points
+        self._set_selection(variables)
 
-        raw_data = self._read_header(stdout)
+        if path is not None:
+            raw_data = self._read_file(path, memory_map)
+        elif stdout is not None:
+            raw_data = self._read_output(stdout)
+        else:
+            raise ValueError('stdout or path is required')
         self._read_variable_data(raw_data)
         # self._to_analysis()
 
@@ -175,15 +200,22 @@ class RawFile(RawFileAbc):
 
     ##############################################
 
+    def _read_output(self, stdout):
+        if stdout.lstrip().startswith(b'Title:'):
+            return self._read_written_header(stdout)
+        else:
+            return self._read_header(stdout)
+
+    ##############################################
+
     def _read_header(self, stdout):
 
         """ Parse the header """
 
-        binary_line = b'Binary:' + os.linesep.encode('ascii')
-        binary_location = stdout.find(binary_line)
-        if binary_location < 0:
+        locations = self._locate_data(stdout, lines=self.OUTPUT_LINES)
+        if locations is None:
             raise NameError('Cannot locate binary data')
-        raw_data_start = binary_location + len(binary_line)
+        binary_location, raw_data_start = locations
         # self._logger.debug(os.linesep + stdout[:raw_data_start].decode('utf-8'))
         header_lines = stdout[:binary_location].splitlines()
         raw_data = stdout[raw_data_start:]
@@ -209,6 +241,79 @@ class RawFile(RawFileAbc):
 
     ##############################################
 
+    def _read_written_header(self, data):
+
+        """Parse the header of a raw file written by the *write* command.
+
+        This header doesn't have the circuit and temperature lines, the number of points is set and
+        some fields can be added, e.g. *Command* and *Option*, thus the fields are parsed as
+        key-value pairs up to the variable list.
+
+        """
+
+        locations = self._locate_data(data)
+        if locations is None:
+            raise NameError('Cannot locate binary data')
+        binary_location, raw_data_start = locations
+        raw_data = data[raw_data_start:]
+        header_lines = iter(data[:binary_location].decode('utf-8').splitlines())
+
+        fields = {}
+        for line in header_lines:
+            self._logger.debug(line)
+            label, _, value = line.partition(':')
+            label = label.strip()
+            if label == 'Variables':
+                break
+            # Option lines can be repeated
+            fields.setdefault(label, value.strip())
+        else:
+            raise NameError('Cannot locate variables')
+
+        self.circuit_name = fields.get('Title')
+        self.temperature = self.nominal_temperature = None
+        self.warnings = []
+        self.title = fields.get('Title')
+        self.date = fields.get('Date')
+        self.plot_name = fields.get('Plotname')
+        self.flags = fields.get('Flags')
+        self.number_of_variables = int(fields['No. Variables'])
+        if self.number_of_points is None:
+            self.number_of_points = int(fields['No. Points'])
+
+        self.variables = {}
+        for i in range(self.number_of_variables):
+            # 0 time time
+            # 1 out voltage
+            # 2 vinput#branch current
+            items = next(header_lines).split()
+            index, name, unit = items[:3]
+            name = self._normalise_name(name, unit)
+            unit = self._name_to_unit.get(unit)
+            self.variables[name] = self._variable_cls(index, name, unit)
+
+        return raw_data
+
+    ##############################################
+
+    @staticmethod
+    def _normalise_name(name, unit):
+
+        """Return the name of a vector as in the server mode output, i.e. the vectors of the plot are
+        not wrapped by *v()* and *i()*.
+
+        """
+
+        if name.endswith('#branch'):
+            return 'i({})'.format(name[:-len('#branch')])
+        elif name.endswith('-sweep') or unit == 'voltage' and not name.startswith('@') and '(' not in name:
+            # v-sweep and i-sweep are named v(v-sweep) and v(i-sweep) in server mode
+            return 'v({})'.format(name)
+        else:
+            return name
+
+    ##############################################
+
     def fix_case(self):
 
         """ Ngspice return lower case names. This method fixes the case of the variable names. """
@@ -232,3 +337,36 @@ class RawFile(RawFileAbc):
             raise NotImplementedError
 
         return super()._to_dc_analysis(sweep_variable)
+
+####################################################################################################
+
+class RawFileWriter(RawFileWriterAbc):
+
+    """This class writes binary raw files as the *write* command of ngspice.
+
+    The vectors are named in lower case, e.g. *out* and *vinput#branch*.
+
+    """
+
+    _logger = _module_logger.getChild('RawFileWriter')
+
+    ##############################################
+
+    def _scale_variable(self, kind, waveform):
+        if kind == 'sweep':
+            type_ = self._variable_type(waveform, 'voltage')
+            name = 'i-sweep' if type_ == 'current' else 'v-sweep'
+            return name, type_, waveform
+        else:
+            return kind, kind, waveform
+
+    ##############################################
+
+    def _node_name(self, name):
+        return name.lower()
+
+    def _branch_name(self, name):
+        return '{}#branch'.format(name.lower())
+
+    def _element_name(self, name):
+        return name.lower()
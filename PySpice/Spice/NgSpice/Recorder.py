@@ -0,0 +1,304 @@
+####################################################################################################
+#
+# PySpice - A Spice Package for Python
+# Copyright (C) 2021 Fabrice Salvaire
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+####################################################################################################
+
+"""This module implements a recorder to stream the vector values sent by the Ngspice shared library
+through the *send_data* callback.
+
+The default :meth:`PySpice.Spice.NgSpice.Shared.NgSpiceShared.send_data` callback receives a
+dictionary of complex values indexed by vector names at each accepted time point, which is costly
+for long transients.  The recorder builds a vector index once when the *send_init_data* callback
+is called, then copies each row of values into preallocated column-major float64 buffers.
+
+Usage::
+
+    recorder = VectorRecorder()
+    ngspice_shared = NgSpiceShared.new_instance(recorder=recorder)
+    ngspice_shared.load_circuit(...)
+    ngspice_shared.run(background=True)
+    # while the simulation is running
+    time = recorder['time']
+
+The recorder can also be used as a ring buffer so as to monitor a window of the last points.
+
+"""
+
+####################################################################################################
+
+__all__ = ['VectorRecorder']
+
+####################################################################################################
+
+import logging
+import threading
+
+import numpy as np
+
+####################################################################################################
+
+from .Shared import ffi, ffi_string_utf8
+
+####################################################################################################
+
+_module_logger = logging.getLogger(__name__)
+
+####################################################################################################
+
+class VectorRecorder:
+
+    """This class records the vector values in growable buffers or in a ring buffer.
+
+    Each vector is stored in a column of a Fortran ordered array, thus the data of a vector is
+    contiguous.  Complex vectors have an additional column for the imaginary part.
+
+    If *ring_buffer* is set, the buffers have a fixed *capacity* and only the last points are
+    kept, else the buffers are doubled when they are full.
+
+    Public Attributes:
+
+      :attr:`names`
+        list of the vector names in the Ngspice order
+
+    """
+
+    _logger = _module_logger.getChild('VectorRecorder')
+
+    ##############################################
+
+    def __init__(self, capacity=1024, ring_buffer=False):
+
+        if capacity < 1:
+            raise ValueError('Capacity must be positive')
+        self._initial_capacity = int(capacity)
+        self._ring_buffer = bool(ring_buffer)
+        self._lock = threading.Lock()
+        self.reset(())
+
+    ##############################################
+
+    def reset(self, names, complex_flags=None):
+
+        """Allocate the buffers for the given vector names."""
+
+        with self._lock:
+            self._reset(names, complex_flags)
+
+    ##############################################
+
+    def _reset(self, names, complex_flags=None):
+
+        names = list(names)
+        if complex_flags is None:
+            complex_flags = [False]*len(names)
+        self._names = names
+        self._column_of = {name:i for i, name in enumerate(names)}
+        # columns having an imaginary part
+        self._complex_columns = [i for i, flag in enumerate(complex_flags) if flag]
+        self._imag_column_of = {column:i for i, column in enumerate(self._complex_columns)}
+        self._capacity = self._initial_capacity
+        self._real = np.zeros((self._capacity, len(names)), dtype=np.float64, order='F')
+        self._imag = np.zeros((self._capacity, len(self._complex_columns)), dtype=np.float64, order='F')
+        self._number_of_points = 0
+        self._check_order = True
+        self._vecsa_layout = None
+
+    ##############################################
+
+    @property
+    def names(self):
+        return list(self._names)
+
+    @property
+    def capacity(self):
+        return self._capacity
+
+    @property
+    def ring_buffer(self):
+        return self._ring_buffer
+
+    @property
+    def number_of_points(self):
+        """Number of points received since the last reset, including the ones dropped by the ring buffer."""
+        return self._number_of_points
+
+    ##############################################
+
+    def __len__(self):
+        """Number of available points"""
+        return min(self._number_of_points, self._capacity)
+
+    def __contains__(self, name):
+        return name in self._column_of
+
+    def __iter__(self):
+        return iter(self._names)
+
+    ##############################################
+
+    def init(self, data):
+
+        """Build the vector index from a *pvecinfoall* structure, cf. *send_init_data* callback."""
+
+        names = []
+        complex_flags = []
+        for i in range(data.veccount):
+            vecinfo = data.vecs[i]
+            names.append(ffi_string_utf8(vecinfo.vecname))
+            complex_flags.append(not vecinfo.is_real)
+        self._logger.debug('Record vectors {}'.format(' '.join(names)))
+        self.reset(names, complex_flags)
+
+    ##############################################
+
+    def record(self, data, number_of_vectors):
+
+        """Record a *pvecvaluesall* structure, cf. *send_data* callback."""
+
+        vecsa = data.vecsa
+        with self._lock:
+            if self._check_order:
+                self._check_vector_order(vecsa, number_of_vectors)
+            layout = self._vecsa_layout
+            if layout is None or layout[0] != vecsa or layout[1] != number_of_vectors:
+                layout = self._get_vecsa_layout(vecsa, number_of_vectors)
+            _, _, pointers, span, strides = layout
+            if strides is not None:
+                # the structures are equally spaced, read the values at once
+                values = np.ndarray((number_of_vectors, 2), dtype=np.float64,
+                                    buffer=ffi.buffer(pointers[0], span),
+                                    offset=ffi.offsetof('vecvalues', 'creal'),
+                                    strides=strides)
+                real = values[:, 0]
+                imag = values[self._complex_columns, 1] if self._complex_columns else None
+            else:
+                real = [_.creal for _ in pointers]
+                imag = [pointers[i].cimag for i in self._complex_columns] if self._complex_columns else None
+            self._append(real, imag)
+
+    ##############################################
+
+    def _get_vecsa_layout(self, vecsa, number_of_vectors):
+
+        # vecsa is an array of pointers to structures which are allocated once per simulation,
+        # when they are equally spaced in memory, a row is read using a strided Numpy array.
+        pointers = ffi.unpack(vecsa, number_of_vectors)
+        addresses = [int(ffi.cast('uintptr_t', _)) for _ in pointers]
+        size = ffi.sizeof('vecvalues')
+        strides = None
+        span = None
+        if number_of_vectors:
+            stride = addresses[1] - addresses[0] if number_of_vectors > 1 else size
+            if stride >= size and all(y - x == stride for x, y in zip(addresses, addresses[1:])):
+                span = stride*(number_of_vectors - 1) + size
+                imag_offset = ffi.offsetof('vecvalues', 'cimag') - ffi.offsetof('vecvalues', 'creal')
+                strides = (stride, imag_offset)
+        self._vecsa_layout = (vecsa, number_of_vectors, pointers, span, strides)
+        return self._vecsa_layout
+
+    ##############################################
+
+    def _check_vector_order(self, vecsa, number_of_vectors):
+
+        # The values are expected in the same order than the initialisation data,
+        # else we reset the buffers using the order of the values.
+        names = [ffi_string_utf8(vecsa[i].name) for i in range(number_of_vectors)]
+        if names != self._names:
+            self._logger.warning('Vector order differs from initialisation data')
+            complex_columns = set(self._complex_columns)
+            complex_flags = [bool(vecsa[i].is_complex) or self._column_of.get(name) in complex_columns
+                             for i, name in enumerate(names)]
+            self._reset(names, complex_flags)
+        self._check_order = False
+
+    ##############################################
+
+    def append(self, real, imag=None):
+
+        """Append a row of values, *imag* are the imaginary parts of the complex vectors."""
+
+        with self._lock:
+            self._append(real, imag)
+
+    ##############################################
+
+    def _append(self, real, imag=None):
+        row = self._number_of_points
+        if row >= self._capacity:
+            if self._ring_buffer:
+                row %= self._capacity
+            else:
+                self._grow()
+        self._real[row] = real
+        if imag is not None:
+            self._imag[row] = imag
+        self._number_of_points += 1
+
+    ##############################################
+
+    def _grow(self):
+
+        capacity = 2*self._capacity
+        self._logger.debug('Grow buffers to {}'.format(capacity))
+        for attribute in ('_real', '_imag'):
+            old_buffer = getattr(self, attribute)
+            buffer = np.zeros((capacity, old_buffer.shape[1]), dtype=np.float64, order='F')
+            buffer[:self._capacity] = old_buffer
+            setattr(self, attribute, buffer)
+        self._capacity = capacity
+
+    ##############################################
+
+    def _ordered_column(self, buffer, column):
+        if self._ring_buffer:
+            # the rows are overwritten by the next points, thus return a copy
+            if self._number_of_points > self._capacity:
+                start = self._number_of_points % self._capacity
+                data = buffer[:, column]
+                return np.concatenate((data[start:], data[:start]))
+            else:
+                return buffer[:self._number_of_points, column].copy()
+        else:
+            return buffer[:self._number_of_points, column]
+
+    ##############################################
+
+    def __getitem__(self, name):
+
+        """Return the data of a vector as a Numpy array.
+
+        For the growable buffers, a real vector is a view on the recorded rows, these rows are never
+        overwritten, but the view doesn't see the next points.  For the ring buffer, a copy is
+        returned since the rows are overwritten.
+
+        """
+
+        column = self._column_of[name]
+        with self._lock:
+            real = self._ordered_column(self._real, column)
+            if column in self._imag_column_of:
+                imag = self._ordered_column(self._imag, self._imag_column_of[column])
+                return real + 1j*imag
+            else:
+                return real
+
+    ##############################################
+
+    def to_dict(self):
+        """Return a dictionary of Numpy arrays indexed by vector names."""
+        return {name:self[name] for name in self._names}
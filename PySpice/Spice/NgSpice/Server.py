@@ -38,17 +38,30 @@ The line "run simulation(s) aborted" in the standard error indicates the simulat
 Any line starting with *Warning* in the standard error indicates non critical error in the
 simulation process.
 
+Since the startup of ngspice, i.e. the loading of the *spinit* file and of the code models, dominates
+the duration of a short analysis, the :class:`PersistentSpiceServer` class keeps an ngspice process
+running in pipe mode and sends it the successive netlists.  The servers shared in the process, see
+:meth:`PersistentSpiceServer.shared`, are closed at exit by :func:`close_persistent_servers`.
+
 """
 
 ####################################################################################################
 
+import atexit
 import logging
 import os
+import queue
 import re
+import shutil
 import subprocess
+import tempfile
+import threading
+import time
 
 ####################################################################################################
 
+from ..AsyncServer import AsyncServerMixin
+from ..ProcessLimits import ProcessLimits
 from .RawFile import RawFile
 
 ####################################################################################################
@@ -69,6 +82,9 @@ class SpiceServer:
 
     It returns a :obj:`PySpice.Spice.RawFile` instance.
 
+    The *timeout*, *cpu_time_limit* and *memory_limit* parameters limit the resources of the
+    ngspice process, see :mod:`PySpice.Spice.ProcessLimits`.
+
     """
 
     _logger = _module_logger.getChild('SpiceServer')
@@ -77,9 +93,45 @@ class SpiceServer:
 
     ##############################################
 
+    # versions indexed by spice command
+    _versions = {}
+
+    ##############################################
+
     def __init__(self, **kwargs):
 
         self._spice_command = kwargs.get('spice_command') or self.SPICE_COMMAND
+        self._limits = ProcessLimits.from_kwargs(kwargs)
+
+    ##############################################
+
+    @property
+    def limits(self):
+        return self._limits
+
+    ##############################################
+
+    @property
+    def version(self):
+
+        """Version string of ngspice, e.g. ``ngspice-34``, or :obj:`None` if it cannot be determined."""
+
+        command = self._spice_command
+        if command not in SpiceServer._versions:
+            version = None
+            try:
+                process = subprocess.run((command, '-v'),
+                                         stdin=subprocess.DEVNULL,
+                                         stdout=subprocess.PIPE,
+                                         stderr=subprocess.STDOUT,
+                                         timeout=30)
+                match = re.search(r'ngspice-\S+', process.stdout.decode('utf-8', errors='replace'))
+                if match is not None:
+                    version = match.group(0)
+            except (OSError, subprocess.TimeoutExpired):
+                pass
+            SpiceServer._versions[command] = version
+        return SpiceServer._versions[command]
 
     ##############################################
 
@@ -143,12 +195,27 @@ class SpiceServer:
 
         self._logger.info("Start the spice subprocess")
 
-        process = subprocess.Popen((self._spice_command, '-s'),
+        process = subprocess.Popen(self._limits.command((self._spice_command, '-s')),
                                    stdin=subprocess.PIPE,
                                    stdout=subprocess.PIPE,
                                    stderr=subprocess.PIPE)
         input_ = str(spice_input).encode('utf-8')
-        stdout, stderr = process.communicate(input_)
+        try:
+            stdout, stderr = process.communicate(input_, timeout=self._limits.timeout)
+        except subprocess.TimeoutExpired:
+            self._logger.warning('Kill ngspice after {} s'.format(self._limits.timeout))
+            process.kill()
+            stdout, stderr = process.communicate()
+            raise self._limits.timeout_error(stderr)
+        self._limits.check_return_code(process.returncode, stderr)
+        return self._to_raw_file(stdout, stderr)
+
+    ##############################################
+
+    def _to_raw_file(self, stdout, stderr):
+
+        """Parse the output of ngspice and return a :obj:`PySpice.RawFile.RawFile` instance."""
+
         # stdout = stdout.decode('utf-8')
         stderr = stderr.decode('utf-8')
 
@@ -160,3 +227,355 @@ class SpiceServer:
                             stderr)
 
         return RawFile(stdout, number_of_points)
+
+####################################################################################################
+
+class AsyncSpiceServer(AsyncServerMixin, SpiceServer):
+
+    """This class runs ngspice in server mode using asyncio, see :mod:`PySpice.Spice.AsyncServer`.
+
+    Example of usage::
+
+      spice_server = AsyncSpiceServer(max_concurrency=16, timeout=60)
+      raw_file = await spice_server(spice_input)
+
+    """
+
+    _logger = _module_logger.getChild('AsyncSpiceServer')
+
+    ##############################################
+
+    async def __call__(self, spice_input, timeout=None):
+
+        """Run ngspice for the given input and return a :obj:`PySpice.RawFile.RawFile` instance.
+
+        *timeout* overrides the default timeout of the server.
+
+        """
+
+        input_ = str(spice_input).encode('utf-8')
+        stdout, stderr = await self._communicate((self._spice_command, '-s'), input_, timeout)
+        return self._to_raw_file(stdout, stderr)
+
+####################################################################################################
+
+class PersistentSpiceServer(SpiceServer):
+
+    """This class runs the simulations in a long-lived ngspice process in pipe mode.
+
+    For each simulation, the netlist is written to a temporary directory, then the commands
+    *source*, *run* and *write* are sent to ngspice followed by an *echo* of a sentinel which marks
+    the end of the output.  The circuit and the plots are then removed from the ngspice memory.
+
+    The process is started on the first call and restarted if it exited, e.g. after a crash.  A call
+    raises :exc:`NameError` if the process exits during the simulation or if the simulation doesn't
+    complete within *timeout* seconds, the process is then killed.  Since the process is reused,
+    the *cpu_time_limit* applies to the cumulated CPU time of the simulations, a process killed on
+    overrun is restarted on the next call.
+
+    Example of usage::
+
+      with PersistentSpiceServer() as spice_server:
+          for circuit in circuits:
+              simulator = circuit.simulator(simulator='ngspice-subprocess', spice_server=spice_server)
+              analysis = simulator.operating_point()
+
+    An instance is thread safe, the simulations are serialised.
+
+    Since the process cannot be pickled, a server is pickled by its settings: the copy, e.g. in a
+    worker process of :func:`PySpice.Spice.Batch.simulate_many`, is the server shared in its
+    process for these settings, see :meth:`shared`.
+
+    """
+
+    _logger = _module_logger.getChild('PersistentSpiceServer')
+
+    SENTINEL = '@@@PYSPICE'
+
+    SETTINGS = ('spice_command', 'timeout', 'cpu_time_limit', 'memory_limit')
+
+    # servers shared in the process, indexed by their settings
+    _shared_servers = {}
+    _shared_servers_lock = threading.Lock()
+
+    ##############################################
+
+    def __init__(self, **kwargs):
+
+        super().__init__(**kwargs)
+
+        self._settings = {key:kwargs[key] for key in self.SETTINGS if key in kwargs}
+        self._lock = threading.RLock()
+        self._process = None
+        self._lines = None
+        self._working_directory = None
+        self._number_of_calls = 0
+        self._number_of_starts = 0
+
+    ##############################################
+
+    @classmethod
+    def shared(cls, **kwargs):
+
+        """Return the server shared in the process by the callers using the same settings, it is
+        created on the first call and closed at exit, see :func:`close_persistent_servers`.
+
+        """
+
+        settings = {key:kwargs[key] for key in cls.SETTINGS if key in kwargs}
+        key = tuple(sorted(settings.items()))
+        with cls._shared_servers_lock:
+            spice_server = cls._shared_servers.get(key)
+            if spice_server is None:
+                spice_server = cls(**settings)
+                cls._shared_servers[key] = spice_server
+            return spice_server
+
+    ##############################################
+
+    def __reduce__(self):
+        return (_shared_persistent_server, (self.__class__, self._settings))
+
+    ##############################################
+
+    @property
+    def number_of_starts(self):
+        """Number of times the ngspice process was started"""
+        return self._number_of_starts
+
+    @property
+    def pid(self):
+        if self._process is not None:
+            return self._process.pid
+        else:
+            return None
+
+    ##############################################
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __del__(self):
+        # the interpreter can be shutting down
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    ##############################################
+
+    def is_alive(self):
+        return self._process is not None and self._process.poll() is None
+
+    ##############################################
+
+    def start(self):
+
+        """Start the ngspice process if it is not running."""
+
+        with self._lock:
+            if self.is_alive():
+                return
+            if self._process is not None:
+                self._logger.warning('ngspice exited with code {}, restart it'.format(self._process.returncode))
+                self._kill()
+            if self._working_directory is None:
+                self._working_directory = tempfile.mkdtemp(prefix='pyspice-')
+            self._logger.info('Start the persistent spice subprocess')
+            self._process = subprocess.Popen(self._limits.command((self._spice_command, '-p')),
+                                             stdin=subprocess.PIPE,
+                                             stdout=subprocess.PIPE,
+                                             stderr=subprocess.STDOUT,
+                                             cwd=self._working_directory)
+            self._number_of_starts += 1
+            # a thread reads the output so as to implement the timeout
+            self._lines = queue.Queue()
+            thread = threading.Thread(target=self._read_output,
+                                      args=(self._process.stdout, self._lines),
+                                      daemon=True)
+            thread.start()
+            self._send('set filetype=binary')
+
+    ##############################################
+
+    @staticmethod
+    def _read_output(stream, lines):
+        for line in iter(stream.readline, b''):
+            lines.put(line)
+        lines.put(None)
+
+    ##############################################
+
+    def close(self):
+
+        """Quit ngspice and remove the working directory."""
+
+        with self._lock:
+            if self.is_alive():
+                try:
+                    self._send('quit')
+                    self._process.stdin.close()
+                    self._process.wait(timeout=5)
+                except (OSError, subprocess.TimeoutExpired):
+                    pass
+            self._kill()
+            if self._working_directory is not None:
+                shutil.rmtree(self._working_directory, ignore_errors=True)
+                self._working_directory = None
+
+    ##############################################
+
+    def _kill(self):
+        process = self._process
+        if process is not None:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            for stream in (process.stdin, process.stdout):
+                try:
+                    stream.close()
+                except OSError:
+                    pass
+        self._process = None
+        self._lines = None
+
+    ##############################################
+
+    def _send(self, *commands):
+        data = ''.join(command + os.linesep for command in commands).encode('utf-8')
+        try:
+            self._process.stdin.write(data)
+            self._process.stdin.flush()
+        except OSError as exception:
+            self._kill()
+            raise NameError('ngspice exited: {}'.format(exception))
+
+    ##############################################
+
+    def _read_until(self, sentinel, timeout):
+
+        """Return the output lines up to the sentinel, the *timeout* applies to the whole output."""
+
+        start_time = time.monotonic()
+        if timeout is not None:
+            deadline = start_time + timeout
+        lines = []
+        while True:
+            try:
+                if timeout is None:
+                    line = self._lines.get()
+                else:
+                    line = self._lines.get(timeout=max(0, deadline - time.monotonic()))
+            except queue.Empty:
+                self._kill()
+                elapsed_time = round(time.monotonic() - start_time, 3)
+                raise self._limits.timeout_error(os.linesep.join(lines), timeout=elapsed_time)
+            if line is None:
+                output = os.linesep.join(lines)
+                return_code = self._process.wait()
+                self._kill()
+                self._limits.check_return_code(return_code, output)
+                raise NameError('ngspice exited during the simulation' + os.linesep + output)
+            line = line.decode('utf-8', errors='replace').rstrip()
+            if line == sentinel:
+                return lines
+            lines.append(line)
+
+    ##############################################
+
+    def ping(self, timeout=5):
+
+        """Check ngspice answers within *timeout* seconds, restart it if needed, and return the
+        number of starts.
+
+        """
+
+        with self._lock:
+            self.start()
+            self._number_of_calls += 1
+            sentinel = '{} {}'.format(self.SENTINEL, self._number_of_calls)
+            self._send('echo {}'.format(sentinel))
+            self._read_until(sentinel, timeout)
+            return self._number_of_starts
+
+    ##############################################
+
+    def _parse_output(self, lines):
+
+        """Parse the output for errors and warnings."""
+
+        for line in lines:
+            if line.startswith('Warning:'):
+                self._logger.warning(line[len('Warning: '):])
+            elif line.startswith('Error') or line == 'run simulation(s) aborted':
+                raise NameError('Errors was found by Spice' + os.linesep + os.linesep.join(lines))
+
+    ##############################################
+
+    def __call__(self, spice_input, timeout=None):
+
+        """Run the simulation of the given input in the ngspice process and return a
+        :obj:`PySpice.RawFile.RawFile` instance.
+
+        """
+
+        if timeout is None:
+            timeout = self._limits.timeout
+
+        with self._lock:
+            self.start()
+            self._number_of_calls += 1
+            input_path = os.path.join(self._working_directory, 'input.cir')
+            raw_path = os.path.join(self._working_directory, 'output.raw')
+            with open(input_path, 'w') as fh:
+                fh.write(str(spice_input))
+            if os.path.exists(raw_path):
+                os.unlink(raw_path)
+
+            sentinel = '{} {}'.format(self.SENTINEL, self._number_of_calls)
+            self._send(
+                'source {}'.format(input_path),
+                'run',
+                'write {}'.format(raw_path),
+                'destroy all',
+                'remcirc',
+                'echo {}'.format(sentinel),
+            )
+            lines = self._read_until(sentinel, timeout)
+            self._logger.debug(os.linesep + os.linesep.join(lines))
+            self._parse_output(lines)
+
+            if not os.path.exists(raw_path):
+                raise NameError('ngspice did not write the raw file, output:' + os.linesep +
+                                os.linesep.join(lines))
+            with open(raw_path, 'rb') as fh:
+                raw_data = fh.read()
+
+        return RawFile(raw_data)
+
+####################################################################################################
+
+def _shared_persistent_server(cls, settings):
+    # unpickle a PersistentSpiceServer
+    return cls.shared(**settings)
+
+####################################################################################################
+
+def close_persistent_servers():
+
+    """Close the servers shared in the process, see :meth:`PersistentSpiceServer.shared`.
+
+    This function is called at exit.
+
+    """
+
+    with PersistentSpiceServer._shared_servers_lock:
+        spice_servers = list(PersistentSpiceServer._shared_servers.values())
+        PersistentSpiceServer._shared_servers.clear()
+    for spice_server in spice_servers:
+        spice_server.close()
+
+atexit.register(close_persistent_servers)
@@ -77,15 +77,27 @@ __all__ = [
     'NgSpiceCircuitError',
     'NgSpiceCommandError',
     'NgSpiceShared',
+    'NgSpiceSharedPool',
 ]
 
 ####################################################################################################
 
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
+import asyncio
+import ctypes.util
 import logging
 import os
 import platform
+import queue
 import re
+import shutil
+import sys
+import tempfile
+import threading
+import weakref
 
 import numpy as np
 
@@ -103,11 +115,29 @@ from PySpice.Probe.WaveForm import (
 from PySpice.Tools.EnumFactory import EnumFactory
 from PySpice.Unit import u_V, u_A, u_s, u_Hz, u_F, u_Degree
 
+from .ExternalSource import ArraySource
+from .OutputSink import ListSink, STDOUT, STDERR, decode
 from .SimulationType import SIMULATION_TYPE
 
 ####################################################################################################
 
-ffi = FFI()
+try:
+    # out-of-line module generated by api_build.py
+    from ._ngspice_cffi import ffi
+    _ffi_api_defined = True
+except ImportError:
+    ffi = FFI()
+    _ffi_api_defined = False
+
+def _define_api():
+    # ffi.cdef fails on duplicated declarations, thus we must parse the API only once
+    global _ffi_api_defined
+    if not _ffi_api_defined:
+        _module_logger.debug('Parse api.h, the precompiled cffi module is not available')
+        api_path = Path(__file__).parent.joinpath('api.h')
+        with open(api_path) as fh:
+            ffi.cdef(fh.read())
+        _ffi_api_defined = True
 
 ####################################################################################################
 
@@ -196,9 +226,12 @@ class Vector:
 
     ##############################################
 
-    def to_waveform(self, abscissa=None, to_real=False, to_float=False):
+    def to_waveform(self, abscissa=None, to_real=False, to_float=False, copy=True):
 
-        """ Return a :obj:`PySpice.Probe.WaveForm` instance. """
+        """ Return a :obj:`PySpice.Probe.WaveForm` instance.
+
+        If *copy* is false, the waveform is a view on the vector data.
+        """
 
         data = self._data
         if to_real:
@@ -208,9 +241,9 @@ class Vector:
         #     data = float(data[0])
 
         if self._unit is not None:
-            return WaveForm.from_unit_values(self.simplified_name, self._unit(data), abscissa=abscissa)
+            return WaveForm.from_unit_values(self.simplified_name, self._unit(data), abscissa=abscissa, copy=copy)
         else:
-            return WaveForm.from_array(self.simplified_name, data, abscissa=abscissa)
+            return WaveForm.from_array(self.simplified_name, data, abscissa=abscissa, copy=copy)
 
 ####################################################################################################
 
@@ -222,42 +255,46 @@ class Plot(dict):
 
       :attr:`plot_name`
 
+      :attr:`zero_copy`
+        if set, vectors are read-only views on the Ngspice memory
+
     """
 
     ##############################################
 
-    def __init__(self, simulation, plot_name):
+    def __init__(self, simulation, plot_name, zero_copy=False):
 
         super().__init__()
 
         self._simulation = simulation
         self.plot_name = plot_name
+        self.zero_copy = zero_copy
 
     ##############################################
 
     def nodes(self, to_float=False, abscissa=None):
-        return [variable.to_waveform(abscissa, to_float=to_float)
+        return [variable.to_waveform(abscissa, to_float=to_float, copy=not self.zero_copy)
                 for variable in self.values()
                 if variable.is_voltage_node]
 
     ##############################################
 
     def branches(self, to_float=False, abscissa=None):
-        return [variable.to_waveform(abscissa, to_float=to_float)
+        return [variable.to_waveform(abscissa, to_float=to_float, copy=not self.zero_copy)
                 for variable in self.values()
                 if variable.is_branch_current]
 
     ##############################################
 
     def internal_parameters(self, to_float=False, abscissa=None):
-        return [variable.to_waveform(abscissa, to_float=to_float)
+        return [variable.to_waveform(abscissa, to_float=to_float, copy=not self.zero_copy)
                 for variable in self.values()
                 if variable.is_interval_parameter]
 
     ##############################################
 
     def elements(self, abscissa=None):
-        return [variable.to_waveform(abscissa, to_float=True)
+        return [variable.to_waveform(abscissa, to_float=True, copy=not self.zero_copy)
                 for variable in self.values()]
 
     ##############################################
@@ -314,7 +351,7 @@ class Plot(dict):
                 break
         else:
             raise NotImplementedError(str(self))
-        sweep = sweep_variable.to_waveform()
+        sweep = sweep_variable.to_waveform(copy=not self.zero_copy)
         return DcAnalysis(
             simulation=self._simulation,
             sweep=sweep,
@@ -326,7 +363,7 @@ class Plot(dict):
     ##############################################
 
     def _to_ac_analysis(self):
-        frequency = self['frequency'].to_waveform(to_real=True)
+        frequency = self['frequency'].to_waveform(to_real=True, copy=not self.zero_copy)
         return AcAnalysis(
             simulation=self._simulation,
             frequency=frequency,
@@ -339,7 +376,7 @@ class Plot(dict):
 
     def _to_transient_analysis(self):
 
-        time = self['time'].to_waveform(to_real=True)
+        time = self['time'].to_waveform(to_real=True, copy=not self.zero_copy)
         return TransientAnalysis(
             simulation=self._simulation,
             time=time,
@@ -371,7 +408,7 @@ class Plot(dict):
     ##############################################
 
     def _to_distortion_analysis(self):
-        frequency = self['frequency'].to_waveform(to_real=True)
+        frequency = self['frequency'].to_waveform(to_real=True, copy=not self.zero_copy)
         return DistortionAnalysis(
             simulation=self._simulation,
             frequency=frequency,
@@ -392,6 +429,170 @@ class Plot(dict):
 
 ####################################################################################################
 
+class LazyWaveForms(Mapping):
+
+    """This class implements a mapping of waveforms which are converted from the plot vectors on
+    first access.
+
+    """
+
+    ##############################################
+
+    def __init__(self, plot, vector_names, abscissa=None, to_float=False):
+
+        self._plot = plot
+        # waveform name -> vector name
+        self._vector_names = vector_names
+        self._abscissa = abscissa
+        self._to_float = to_float
+        self._waveforms = {}
+
+    ##############################################
+
+    def __getitem__(self, name):
+        try:
+            return self._waveforms[name]
+        except KeyError:
+            vector = self._plot.fetch(self._vector_names[name])
+            # the vector data is not shared, excepted in zero-copy mode
+            waveform = vector.to_waveform(self._abscissa, to_float=self._to_float, copy=False)
+            self._waveforms[name] = waveform
+            return waveform
+
+    ##############################################
+
+    def __iter__(self):
+        return iter(self._vector_names)
+
+    def __len__(self):
+        return len(self._vector_names)
+
+    def __contains__(self, name):
+        return name in self._vector_names
+
+####################################################################################################
+
+class LazyPlot(Plot):
+
+    """This class implements a plot whose vectors are only fetched from Ngspice on first access.
+
+    The vector names are enumerated from the plot, and the vectors are classified like
+    :class:`Vector` using their types, which are read from the vector informations without copying
+    the data.  The methods returning waveforms return :class:`LazyWaveForms` mappings, thus
+    :meth:`to_analysis` returns an analysis whose waveforms are converted on demand.
+
+    The plot is pinned as long as it is alive, see :meth:`NgSpiceShared.destroy`.
+
+    """
+
+    def __init__(self, simulation, plot_name, ngspice_shared, vector_names, zero_copy=False):
+
+        super().__init__(simulation, plot_name, zero_copy)
+
+        self._ngspice_shared = ngspice_shared
+        self._vector_names = list(vector_names)
+        self._vector_name_set = set(self._vector_names)
+        self._vector_types = {}
+
+    ##############################################
+
+    @property
+    def vector_names(self):
+        return list(self._vector_names)
+
+    ##############################################
+
+    def fetch(self, vector_name):
+        """Fetch a vector from Ngspice without caching it."""
+        return self._ngspice_shared._get_vector(self.plot_name, vector_name, self.zero_copy)
+
+    ##############################################
+
+    def __missing__(self, name):
+        if name not in self._vector_name_set:
+            raise KeyError(name)
+        vector = self.fetch(name)
+        self[name] = vector
+        return vector
+
+    ##############################################
+
+    def __contains__(self, name):
+        return name in self._vector_name_set
+
+    def __iter__(self):
+        return iter(self._vector_names)
+
+    def __len__(self):
+        return len(self._vector_names)
+
+    def keys(self):
+        return list(self._vector_names)
+
+    def values(self):
+        return [self[name] for name in self._vector_names]
+
+    def items(self):
+        return [(name, self[name]) for name in self._vector_names]
+
+    ##############################################
+
+    def vector_type(self, vector_name):
+        """Return the type of a vector without fetching its data."""
+        try:
+            return self._vector_types[vector_name]
+        except KeyError:
+            vector_type = self._ngspice_shared._get_vector_type(self.plot_name, vector_name)
+            self._vector_types[vector_name] = vector_type
+            return vector_type
+
+    ##############################################
+
+    # same classification as Vector
+
+    @staticmethod
+    def _is_internal_parameter(name):
+        return name.startswith('@')
+
+    def _is_branch_current(self, name):
+        return (self.vector_type(name) == self._ngspice_shared.simulation_type.current and
+                not self._is_internal_parameter(name))
+
+    def _is_voltage_node(self, name):
+        return (self.vector_type(name) == self._ngspice_shared.simulation_type.voltage and
+                not self._is_internal_parameter(name))
+
+    ##############################################
+
+    def _waveforms(self, predicate, abscissa, to_float=False, simplify=True):
+        vector_names = {}
+        for name in self._vector_names:
+            if predicate(name):
+                if simplify and self._is_voltage_node(name) and name.startswith('V('):
+                    simplified_name = name[2:-1]
+                elif simplify and self._is_branch_current(name):
+                    simplified_name = name[:-7]
+                else:
+                    simplified_name = name
+                vector_names[simplified_name] = name
+        return LazyWaveForms(self, vector_names, abscissa, to_float)
+
+    ##############################################
+
+    def nodes(self, to_float=False, abscissa=None):
+        return self._waveforms(self._is_voltage_node, abscissa, to_float)
+
+    def branches(self, to_float=False, abscissa=None):
+        return self._waveforms(self._is_branch_current, abscissa, to_float)
+
+    def internal_parameters(self, to_float=False, abscissa=None):
+        return self._waveforms(self._is_internal_parameter, abscissa, to_float)
+
+    def elements(self, abscissa=None):
+        return self._waveforms(lambda name: True, abscissa, to_float=True, simplify=False)
+
+####################################################################################################
+
 class NgSpiceShared:
 
     _logger = _module_logger.getChild('NgSpiceShared')
@@ -437,7 +638,48 @@ class NgSpiceShared:
     _instances = {}
 
     @classmethod
-    def new_instance(cls, ngspice_id=0, send_data=False, verbose=False):
+    def find_library(cls):
+
+        """Return the path of the Ngspice shared library file without id, e.g. to copy it."""
+
+        path = Path(cls.LIBRARY_PATH.format(''))
+        if path.is_absolute():
+            if path.exists():
+                return path
+            raise NameError("Ngspice library {} doesn't exist".format(path))
+
+        file_names = [path.name]
+        _ = ctypes.util.find_library('ngspice')
+        if _ is not None:
+            if Path(_).is_absolute():
+                return Path(_)
+            file_names.append(_)
+
+        directories = []
+        for variable in ('LD_LIBRARY_PATH', 'DYLD_LIBRARY_PATH'):
+            directories += [_ for _ in os.environ.get(variable, '').split(os.pathsep) if _]
+        if 'CONDA_PREFIX' in os.environ:
+            directories.append(Path(os.environ['CONDA_PREFIX']).joinpath('lib'))
+        directories += [
+            Path(sys.prefix).joinpath('lib'),
+            '/usr/local/lib',
+            '/usr/lib',
+            '/usr/lib64',
+            '/usr/lib/{}-linux-gnu'.format(platform.machine()),
+        ]
+        for directory in directories:
+            for file_name in file_names:
+                path = Path(directory).joinpath(file_name)
+                if path.exists():
+                    return path.resolve()
+
+        raise NameError("Cannot find Ngspice library {}".format(' or '.join(file_names)))
+
+    ##############################################
+
+    @classmethod
+    def new_instance(cls, ngspice_id=0, send_data=False, verbose=False, recorder=None, sync_data=False,
+                     output_sink=None):
         """Create a NgSpiceShared instance"""
 
         # Fixme: send_data
@@ -446,17 +688,31 @@ class NgSpiceShared:
             return cls._instances[ngspice_id]
         else:
             cls._logger.debug("New instance for id {}".format(ngspice_id))
-            instance = cls(ngspice_id=ngspice_id, send_data=send_data, verbose=verbose)
+            instance = cls(ngspice_id=ngspice_id, send_data=send_data, verbose=verbose, recorder=recorder,
+                           sync_data=sync_data, output_sink=output_sink)
             cls._instances[ngspice_id] = instance
             return instance
 
     ##############################################
 
-    def __init__(self, ngspice_id=0, send_data=False, verbose=False):
+    def __init__(self, ngspice_id=0, send_data=False, verbose=False, library_path=None, recorder=None,
+                 sync_data=False, output_sink=None):
 
         """ Set the *send_data* flag if you want to enable the output callback.
 
+        Set *recorder* to a :class:`PySpice.Spice.NgSpice.Recorder.VectorRecorder` instance to
+        stream the vector values in Numpy buffers, it enables the output callback.
+
         Set the *ngspice_id* to an integer value if you want to run NgSpice in parallel.
+
+        Set *library_path* to load another library than the one given by :attr:`LIBRARY_PATH`,
+        e.g. a copy for a parallel instance, see :class:`NgSpiceSharedPool`.
+
+        Set the *sync_data* flag if you want to enable the :meth:`get_sync_data` callback.
+
+        Set *output_sink* to a :class:`PySpice.Spice.NgSpice.OutputSink.OutputSink` instance to
+        bound or redirect the output of the commands, by default every line is stored.  The output
+        of the query commands, e.g. :meth:`show`, is always captured.
         """
 
         self._ngspice_id = ngspice_id
@@ -464,23 +720,51 @@ class NgSpiceShared:
         self._spinit_not_found = False
 
         self._number_of_exec_calls = 0
-
-        self._stdout = []
-        self._stderr = []
+        self._circuit_serial = 0
+
+        if output_sink is None:
+            output_sink = ListSink()
+        self._output_sink = output_sink
+        # Sinks capturing the output of a command in addition to the output sink
+        self._output_lock = threading.Lock()
+        self._capture_sinks = []
         self._error_in_stdout = None
         self._error_in_stderr = None
+        # Prevent to decode each line when send_char is not reimplemented
+        self._send_char_overridden = type(self).send_char is not NgSpiceShared.send_char
 
         self._has_cider = None
         self._has_xspice = None
         self._ngspice_version = None
         self._extensions = []
 
-        self._library_path = None
+        self._recorder = recorder
+        if recorder is not None:
+            send_data = True
+
+        # External sources indexed by lower case bytes name, see :meth:`add_array_source`
+        self._array_sources = {}
+
+        # Event loops waiting for the background thread, see :meth:`run_async`
+        self._async_lock = threading.Lock()
+        self._background_waiters = []
+        self._stat_queues = []
+        self._background_thread_done = threading.Event()
+        self._background_thread_done.set()
+
+        self._library_path = library_path
         self._load_library(verbose)
-        self._init_ngspice(send_data)
+        self._init_ngspice(send_data, sync_data)
 
         self._is_running = False
 
+        # Plots having alive zero-copy views, see :meth:`plot`
+        # A reentrant lock is required since the garbage collector can release a view, and thus
+        # call :meth:`_unpin_plot`, on a thread holding the lock.
+        self._plot_lock = threading.RLock()
+        self._pinned_plots = {}
+        self._plots_to_destroy = set()
+
     ##############################################
 
     @property
@@ -489,6 +773,31 @@ class NgSpiceShared:
 
     ##############################################
 
+    @property
+    def ngspice_id(self):
+        return self._ngspice_id
+
+    ##############################################
+
+    @property
+    def circuit_serial(self):
+        """Serial number incremented each time the loaded circuit is changed by a command."""
+        return self._circuit_serial
+
+    ##############################################
+
+    @property
+    def recorder(self):
+        return self._recorder
+
+    @recorder.setter
+    def recorder(self, value):
+        if value is not None and self._send_data_c == FFI.NULL:
+            raise NameError('The send_data callback is not enabled')
+        self._recorder = value
+
+    ##############################################
+
     @property
     def library_path(self):
         if self._library_path is None:
@@ -528,9 +837,7 @@ class NgSpiceShared:
             import locale
             locale.setlocale(locale.LC_NUMERIC, 'C')
 
-        api_path = Path(__file__).parent.joinpath('api.h')
-        with open(api_path) as fh:
-            ffi.cdef(fh.read())
+        _define_api()
 
         message = 'Load library {}'.format(self.library_path)
         self._logger.debug(message)
@@ -542,23 +849,59 @@ class NgSpiceShared:
 
     ##############################################
 
-    def _init_ngspice(self, send_data):
+    @classmethod
+    def _ffi_callbacks(cls):
+
+        """Return the FFI callbacks of the class.
+
+        The callbacks are static methods which get the instance from the user data handle, thus
+        they are created once per class and shared by the instances.
+
+        """
+
+        # look in the class dictionary, since a subclass can reimplement a callback
+        callbacks = cls.__dict__.get('_ffi_callbacks_cache', None)
+        if callbacks is None:
+            callbacks = {
+                'send_char': ffi.callback('int (char *, int, void *)', cls._send_char),
+                'send_stat': ffi.callback('int (char *, int, void *)', cls._send_stat),
+                'exit': ffi.callback('int (int, bool, bool, int, void *)', cls._exit),
+                'send_init_data': ffi.callback('int (pvecinfoall, int, void *)', cls._send_init_data),
+                'background_thread_running': ffi.callback('int (bool, int, void *)', cls._background_thread_running),
+                'send_data': ffi.callback('int (pvecvaluesall, int, int, void *)', cls._send_data),
+                'get_vsrc_data': ffi.callback('int (double *, double, char *, int, void *)', cls._get_vsrc_data),
+                'get_isrc_data': ffi.callback('int (double *, double, char *, int, void *)', cls._get_isrc_data),
+                'get_sync_data': ffi.callback('int (double, double *, double, int, int, int, void *)',
+                                              cls._get_sync_data),
+            }
+            cls._ffi_callbacks_cache = callbacks
+        return callbacks
+
+    ##############################################
+
+    def _init_ngspice(self, send_data, sync_data=False):
 
         # Ngspice API: ngSpice_Init ngSpice_Init_Sync
 
-        self._send_char_c = ffi.callback('int (char *, int, void *)', self._send_char)
-        self._send_stat_c = ffi.callback('int (char *, int, void *)', self._send_stat)
-        self._exit_c = ffi.callback('int (int, bool, bool, int, void *)', self._exit)
-        self._send_init_data_c = ffi.callback('int (pvecinfoall, int, void *)', self._send_init_data)
-        self._background_thread_running_c = ffi.callback('int (bool, int, void *)', self._background_thread_running)
+        callbacks = self._ffi_callbacks()
+        self._send_char_c = callbacks['send_char']
+        self._send_stat_c = callbacks['send_stat']
+        self._exit_c = callbacks['exit']
+        self._send_init_data_c = callbacks['send_init_data']
+        self._background_thread_running_c = callbacks['background_thread_running']
 
         if send_data:
-            self._send_data_c = ffi.callback('int (pvecvaluesall, int, int, void *)', self._send_data)
+            self._send_data_c = callbacks['send_data']
         else:
             self._send_data_c = FFI.NULL
 
-        self._get_vsrc_data_c = ffi.callback('int (double *, double, char *, int, void *)', self._get_vsrc_data)
-        self._get_isrc_data_c = ffi.callback('int (double *, double, char *, int, void *)', self._get_isrc_data)
+        self._get_vsrc_data_c = callbacks['get_vsrc_data']
+        self._get_isrc_data_c = callbacks['get_isrc_data']
+
+        if sync_data:
+            self._get_sync_data_c = callbacks['get_sync_data']
+        else:
+            self._get_sync_data_c = FFI.NULL
 
         self_c = ffi.new_handle(self)
         self._self_c = self_c  # To prevent garbage collection
@@ -574,10 +917,10 @@ class NgSpiceShared:
             raise NameError("Ngspice_Init returned {}".format(rc))
 
         ngspice_id_c = ffi.new('int *', self._ngspice_id)
-        self._ngspice_id = ngspice_id_c  # To prevent garbage collection
+        self._ngspice_id_c = ngspice_id_c  # To prevent garbage collection
         rc = self._ngspice_shared.ngSpice_Init_Sync(self._get_vsrc_data_c,
                                                     self._get_isrc_data_c,
-                                                    FFI.NULL,  # GetSyncData
+                                                    self._get_sync_data_c,
                                                     ngspice_id_c,
                                                     self_c)
         if rc:
@@ -611,33 +954,41 @@ class NgSpiceShared:
         """Callback for sending output from stdout, stderr to caller"""
 
         self = ffi.from_handle(user_data)
-        _module_logger.debug(str(ffi.string(message_c)))
-        message = ffi_string_utf8(message_c)
+        message = ffi.string(message_c)
+        if _module_logger.isEnabledFor(logging.DEBUG):
+            _module_logger.debug(str(message))
 
         # split message in "<prefix><match = ' '><content>"
-        prefix, _, content = message.partition(' ')
-        if prefix == 'stderr':
-            self._stderr.append(content)
-            if content.startswith('Warning:'):
-                func = self._logger.warning
-            # elif content.startswith('Warning:'):
-            else:
-                self._error_in_stderr = True
-                func = self._logger.error
-                if content.strip() == "Note: can't find init file.":
+        # work on bytes, lines are only decoded when they are logged or read
+        prefix, _, content = message.partition(b' ')
+        if prefix == b'stderr':
+            self._write_output(STDERR, content)
+            if content.startswith(b'Warning:'):
+                level = logging.WARNING
+            elif content.startswith(b'Note:'):
+                # e.g. "Note: run starting" when bg_resume restarts a finished simulation,
+                # it can be sent by the background thread while another command is running
+                level = logging.WARNING
+                if content.strip() == b"Note: can't find init file.":
                     self._spinit_not_found = True
                     self._logger.warning('spinit was not found')
-            func(content)
+            else:
+                self._error_in_stderr = True
+                level = logging.ERROR
+            if self._logger.isEnabledFor(level):
+                self._logger.log(level, decode(content))
         else:
-            self._stdout.append(content)
+            self._write_output(STDOUT, content)
             # Fixme: Ngspice writes error on stdout and stderr ...
-            if 'error' in content.lower():
+            if b'error' in content.lower():
                 self._error_in_stdout = True
             # if self._error_in_stdout:
             #     self._logger.warning(content)
 
         # Fixme: ???
-        return self.send_char(message, ngspice_id)
+        if self._send_char_overridden:
+            return self.send_char(decode(message), ngspice_id)
+        return 0
 
     ##############################################
 
@@ -645,7 +996,10 @@ class NgSpiceShared:
     def _send_stat(message, ngspice_id, user_data):
         """Callback for simulation status to caller"""
         self = ffi.from_handle(user_data)
-        return self.send_stat(ffi_string_utf8(message), ngspice_id)
+        message = ffi_string_utf8(message)
+        if self._stat_queues:
+            self._notify_stat_queues(message)
+        return self.send_stat(message, ngspice_id)
 
     ##############################################
 
@@ -666,6 +1020,10 @@ class NgSpiceShared:
     def _send_data(data, number_of_vectors, ngspice_id, user_data):
         """Callback to send back actual vector data"""
         self = ffi.from_handle(user_data)
+        if self._recorder is not None:
+            # bypass the dictionary of values
+            self._recorder.record(data, number_of_vectors)
+            return 0
         # self._logger.debug('ngspice_id-{} send_data [{}]'.format(ngspice_id, data.vecindex))
         actual_vector_values = {}
         for i in range(int(number_of_vectors)):
@@ -682,6 +1040,8 @@ class NgSpiceShared:
     def _send_init_data(data, ngspice_id, user_data):
         """Callback to send back initialization vector data"""
         self = ffi.from_handle(user_data)
+        if self._recorder is not None:
+            self._recorder.init(data)
         # if self._logger.isEnabledFor(logging.DEBUG):
         #     self._logger.debug('ngspice_id-{} send_init_data'.format(ngspice_id))
         #     number_of_vectors = data.veccount
@@ -692,11 +1052,40 @@ class NgSpiceShared:
     ##############################################
 
     @staticmethod
-    def _background_thread_running(is_running, ngspice_id, user_data):
-        """Callback to indicate if background thread is runnin"""
+    def _background_thread_running(not_running, ngspice_id, user_data):
+        """Callback to indicate if background thread is running"""
+        # Ngspice passes true when the thread exits, contrary to what the manual says
         self = ffi.from_handle(user_data)
-        self._logger.debug('ngspice_id-{} background_thread_running {}'.format(ngspice_id, is_running))
-        self._is_running = is_running
+        self._logger.debug('ngspice_id-{} background_thread_running {}'.format(ngspice_id, not not_running))
+        with self._async_lock:
+            self._is_running = not not_running
+            if not_running:
+                self._background_thread_done.set()
+                for loop, future in self._background_waiters:
+                    self._call_soon_threadsafe(loop, self._set_future_done, future)
+                self._background_waiters = []
+                self._notify_stat_queues(None)
+        return 0
+
+    ##############################################
+
+    @staticmethod
+    def _call_soon_threadsafe(loop, callback, *args):
+        try:
+            loop.call_soon_threadsafe(callback, *args)
+        except RuntimeError:
+            # the event loop is closed
+            pass
+
+    @staticmethod
+    def _set_future_done(future):
+        if not future.done():
+            future.set_result(None)
+
+    def _notify_stat_queues(self, message):
+        # None marks the end of the simulation
+        for loop, message_queue in list(self._stat_queues):
+            self._call_soon_threadsafe(loop, message_queue.put_nowait, message)
 
     ##############################################
 
@@ -704,6 +1093,10 @@ class NgSpiceShared:
     def _get_vsrc_data(voltage, time, node, ngspice_id, user_data):
         """FFI Callback"""
         self = ffi.from_handle(user_data)
+        source = self._array_sources.get(ffi.string(node).lower())
+        if source is not None:
+            voltage[0] = source(time)
+            return 0
         return self.get_vsrc_data(voltage, time, ffi_string_utf8(node), ngspice_id)
 
     ##############################################
@@ -712,10 +1105,26 @@ class NgSpiceShared:
     def _get_isrc_data(current, time, node, ngspice_id, user_data):
         """FFI Callback"""
         self = ffi.from_handle(user_data)
+        source = self._array_sources.get(ffi.string(node).lower())
+        if source is not None:
+            current[0] = source(time)
+            return 0
         return self.get_isrc_data(current, time, ffi_string_utf8(node), ngspice_id)
 
     ##############################################
 
+    @staticmethod
+    def _get_sync_data(actual_time, delta_time, old_delta_time, redo_step, ngspice_id, location, user_data):
+        """FFI Callback"""
+        self = ffi.from_handle(user_data)
+        new_delta_time = self.get_sync_data(actual_time, delta_time[0], old_delta_time, redo_step,
+                                            ngspice_id, location)
+        if new_delta_time is not None:
+            delta_time[0] = new_delta_time
+        return 0
+
+    ##############################################
+
     def send_char(self, message, ngspice_id):
         """ Reimplement this callback in a subclass to process logging messages from the simulator. """
         # self._logger.debug('ngspice-{} send_char {}'.format(ngspice_id, message))
@@ -731,7 +1140,10 @@ class NgSpiceShared:
     ##############################################
 
     def send_data(self, actual_vector_values, number_of_vectors, ngspice_id):
-        """ Reimplement this callback in a subclass to process the vector actual values. """
+        """ Reimplement this callback in a subclass to process the vector actual values.
+
+        This callback is not called when a recorder is set.
+        """
         return 0
 
     ##############################################
@@ -756,6 +1168,49 @@ class NgSpiceShared:
 
     ##############################################
 
+    def get_sync_data(self, time, delta_time, old_delta_time, redo_step, ngspice_id, location):
+
+        """ Reimplement this callback in a subclass to synchronise the time steps with an external
+        simulator.
+
+        It is called with the actual *time*, the proposed *delta_time* and the previous one.
+        *redo_step* is set if Ngspice rejected the last step, and *location* indicates where the
+        call is done in the transient loop (0 or 1).  Return a new time step or :obj:`None` to keep
+        the proposed one.
+
+        The callback is enabled by the *sync_data* flag.
+        """
+
+        return None
+
+    ##############################################
+
+    def add_array_source(self, name, time, values, period=None):
+
+        """Set the values of the external source *name* using time and value arrays, see
+        :class:`PySpice.Spice.NgSpice.ExternalSource.ArraySource`.
+
+        The :meth:`get_vsrc_data` and :meth:`get_isrc_data` callbacks are no longer called for this
+        source.  Return the source.
+        """
+
+        source = ArraySource(time, values, period)
+        self._array_sources[str(name).lower().encode('utf8')] = source
+        return source
+
+    ##############################################
+
+    def remove_array_source(self, name):
+        del self._array_sources[str(name).lower().encode('utf8')]
+
+    ##############################################
+
+    @property
+    def array_sources(self):
+        return {name.decode('utf8'):source for name, source in self._array_sources.items()}
+
+    ##############################################
+
     @staticmethod
     def _convert_string_array(array):
         strings = []
@@ -802,27 +1257,77 @@ class NgSpiceShared:
 
     ##############################################
 
+    def _write_output(self, stream, line):
+        with self._output_lock:
+            self._output_sink.write(stream, line)
+            for sink in self._capture_sinks:
+                sink.write(stream, line)
+
+    ##############################################
+
+    @contextmanager
+    def _capture_output(self):
+        """Context manager which captures the output in a new :class:`ListSink`."""
+        sink = ListSink()
+        with self._output_lock:
+            self._capture_sinks.append(sink)
+        try:
+            yield sink
+        finally:
+            with self._output_lock:
+                self._capture_sinks.remove(sink)
+
+    ##############################################
+
     def clear_output(self):
-        self._stdout = []
-        self._stderr = []
+        with self._output_lock:
+            self._output_sink.clear()
         self._error_in_stdout = False
         self._error_in_stderr = False
 
     ##############################################
 
+    @property
+    def output_sink(self):
+        return self._output_sink
+
     @property
     def stdout(self):
-        return os.linesep.join(self._stdout)
+        return os.linesep.join(self._output_sink.lines(STDOUT))
 
     @property
     def stderr(self):
-        return os.linesep.join(self._stderr)
+        return os.linesep.join(self._output_sink.lines(STDERR))
 
     ##############################################
 
-    def exec_command(self, command, join_lines=True):
+    def exec_command(self, command, join_lines=True, capture=False):
 
-        """ Execute a command and return the output. """
+        """ Execute a command and return the output.
+
+        If *capture* is set, the output is captured whatever the output sink.  Else the output is
+        read from the output sink, see :mod:`PySpice.Spice.NgSpice.OutputSink`, thus it is empty
+        for a drop or file sink and truncated for a ring buffer sink.  The query methods,
+        e.g. :meth:`listing` and :meth:`show`, always capture their output.
+        """
+
+        if capture:
+            # the output sink is left untouched since the background thread can write to it
+            with self._capture_output() as sink:
+                self._exec_command(command)
+        else:
+            sink = self._output_sink
+            self._exec_command(command)
+
+        lines = sink.lines(STDOUT)
+        if join_lines:
+            return os.linesep.join(lines)
+        else:
+            return lines
+
+    ##############################################
+
+    def _exec_command(self, command):
 
         # Ngspice API: ngSpice_Command
 
@@ -850,11 +1355,6 @@ class NgSpiceShared:
         if self._error_in_stdout or self._error_in_stderr:
             raise NgSpiceCommandError("Command '{}' failed".format(command))
 
-        if join_lines:
-            return self.stdout
-        else:
-            return self._stdout
-
     ##############################################
 
     def _get_version(self):
@@ -864,7 +1364,7 @@ class NgSpiceShared:
         self._has_cider = False
         self._extensions = []
 
-        output = self.exec_command('version -f')
+        output = self.exec_command('version -f', capture=True)
         for line in output.split('\n'):
             match = re.match(r'\*\* ngspice\-(\d+)', line)
             if match is not None:
@@ -912,6 +1412,7 @@ class NgSpiceShared:
     ##############################################
 
     def _alter(self, command, device, kwargs):
+        self._circuit_serial += 1
         # Performance optimization: dispatch multiple alter commands jointly
         device_name = device.lower()
         commands = []
@@ -952,14 +1453,70 @@ class NgSpiceShared:
     ##############################################
 
     def destroy(self, plot_name='all'):
-        """Release the memory holding the output data (the given plot or all plots) for the specified runs."""
-        self.exec_command('destroy ' + plot_name)
+
+        """Release the memory holding the output data (the given plot or all plots) for the specified runs.
+
+        Plots having alive zero-copy views are not destroyed, they will be destroyed by a next call
+        once every view is released.
+
+        """
+
+        pinned_plots = self.pinned_plots
+        if plot_name == 'all':
+            if pinned_plots:
+                self._plots_to_destroy |= pinned_plots
+                for name in self.plot_names:
+                    if name != 'const' and name not in pinned_plots:
+                        self.exec_command('destroy ' + name)
+            else:
+                self.exec_command('destroy all')
+            self._plots_to_destroy &= pinned_plots
+        elif plot_name in pinned_plots:
+            self._logger.debug('Defer destroy of pinned plot {}'.format(plot_name))
+            self._plots_to_destroy.add(plot_name)
+        else:
+            self._destroy_released_plots()
+            self.exec_command('destroy ' + plot_name)
+
+    ##############################################
+
+    def _destroy_released_plots(self):
+        """Destroy the deferred plots which are no longer pinned."""
+        released_plots = self._plots_to_destroy - self.pinned_plots
+        for name in released_plots:
+            self.exec_command('destroy ' + name)
+        self._plots_to_destroy -= released_plots
+
+    ##############################################
+
+    @property
+    def pinned_plots(self):
+        """Return the set of plot names having alive zero-copy views."""
+        with self._plot_lock:
+            return set(self._pinned_plots)
+
+    ##############################################
+
+    def _pin_plot(self, plot_name, array):
+        """Prevent the destruction of the plot as long as *array* is alive."""
+        with self._plot_lock:
+            self._pinned_plots[plot_name] = self._pinned_plots.get(plot_name, 0) + 1
+        weakref.finalize(array, self._unpin_plot, plot_name)
+
+    def _unpin_plot(self, plot_name):
+        # Called by the garbage collector, thus we cannot send a command to Ngspice here
+        with self._plot_lock:
+            count = self._pinned_plots[plot_name] - 1
+            if count:
+                self._pinned_plots[plot_name] = count
+            else:
+                del self._pinned_plots[plot_name]
 
     ##############################################
 
     def device_help(self, device):
         """Shows the user information about the devices available in the simulator. """
-        return self.exec_command('devhelp ' + device.lower())
+        return self.exec_command('devhelp ' + device.lower(), capture=True)
 
     ##############################################
 
@@ -969,7 +1526,7 @@ class NgSpiceShared:
     ##############################################
 
     def _show(self, command):
-        lines = self.exec_command(command, join_lines=False)
+        lines = self.exec_command(command, join_lines=False, capture=True)
         if lines:
             values = self._lines_to_dicts(lines)
             return values
@@ -990,6 +1547,7 @@ class NgSpiceShared:
 
     def source(self, file_path):
         """Read a ngspice input file"""
+        self._circuit_serial += 1
         self.exec_command('source ' + file_path)
 
     ##############################################
@@ -1001,14 +1559,36 @@ class NgSpiceShared:
 
     ##############################################
 
+    def _warn_pinned_plots(self, command):
+        pinned_plots = self.pinned_plots
+        if pinned_plots:
+            self._logger.warning('{} invalidates the zero-copy views of the plots {}'.format(
+                command, ' '.join(sorted(pinned_plots))))
+
+    ##############################################
+
     def quit(self):
+        """Quit Ngspice.
+
+        The memory of the pinned plots is released, thus the zero-copy views must not be used
+        afterwards.
+
+        """
+        self._warn_pinned_plots('quit')
         self.set('noaskquit')
         return self.exec_command('quit')
 
     ##############################################
 
     def remove_circuit(self):
-        """Removes the current circuit from the list of circuits sourced into ngspice."""
+        """Removes the current circuit from the list of circuits sourced into ngspice.
+
+        Like :meth:`reset` and :meth:`quit`, this command doesn't respect the pinned plots, the
+        zero-copy views on their vectors must not be used afterwards.
+
+        """
+        self._warn_pinned_plots('remcirc')
+        self._circuit_serial += 1
         self.exec_command('remcirc')
 
     ##############################################
@@ -1018,7 +1598,12 @@ class NgSpiceShared:
         analyses have been done already), and re-parse the input file. The circuit can then be
         re-run from it’s initial state, overriding the affect of any set or alter commands.
 
+        The memory behind the zero-copy views of the pinned plots can be released, they must not
+        be used afterwards.
+
         """
+        self._warn_pinned_plots('reset')
+        self._circuit_serial += 1
         self.exec_command('reset')
 
     ##############################################
@@ -1060,7 +1645,7 @@ class NgSpiceShared:
             ressources = ['everything']
 
         command = 'rusage ' + ' '.join(ressources)
-        lines = self.exec_command(command, join_lines=False)
+        lines = self.exec_command(command, join_lines=False, capture=True)
         values = {}
         for line in lines:
             if '=' in line:
@@ -1083,13 +1668,14 @@ class NgSpiceShared:
 
     def set_circuit(self, name):
         """Change the current circuit"""
+        self._circuit_serial += 1
         self.exec_command('setcirc {}'.format(name))
 
     ##############################################
 
     def status(self):
         """Display breakpoint information"""
-        return self.exec_command('status')
+        return self.exec_command('status', capture=True)
 
     ##############################################
 
@@ -1138,7 +1724,7 @@ class NgSpiceShared:
 
     def where(self):
         """Identify troublesome node or device"""
-        return self.exec_command('where')
+        return self.exec_command('where', capture=True)
 
     ##############################################
 
@@ -1147,6 +1733,7 @@ class NgSpiceShared:
         """Load the given circuit string."""
 
         # Ngspice API: ngSpice_Circ
+        self._circuit_serial += 1
         circuit_lines = [line for line in str(circuit).splitlines() if line]
         self._logger.debug('ngSpice_Circ\n' + str(circuit))
 
@@ -1158,7 +1745,8 @@ class NgSpiceShared:
         circuit_lines_keepalive += [FFI.NULL]
         circuit_array = ffi.new("char *[]", circuit_lines_keepalive)
         self.clear_output()
-        rc = self._ngspice_shared.ngSpice_Circ(circuit_array)
+        with self._capture_output() as sink:
+            rc = self._ngspice_shared.ngSpice_Circ(circuit_array)
 
         if rc:  # Fixme: when not 0 ???
             raise NameError("ngSpice_Circ returned {}".format(rc))
@@ -1166,7 +1754,8 @@ class NgSpiceShared:
         # Fixme: when Ngspice found an error in the circuit, it reports the error in stdout
         # Fixme: https://sourceforge.net/p/ngspice/bugs/496/
         if self._error_in_stdout:
-            self._logger.error('\n' + self.stdout)
+            # log the captured output, since the output sink can drop it
+            self._logger.error('\n' + os.linesep.join(sink.lines(STDOUT)))
             raise NgSpiceCircuitError('')
 
         # for line in circuit_lines:
@@ -1178,7 +1767,7 @@ class NgSpiceShared:
 
     def listing(self):
         command = 'listing'
-        return self.exec_command(command)
+        return self.exec_command(command, capture=True)
 
     ##############################################
 
@@ -1189,11 +1778,13 @@ class NgSpiceShared:
         #  in the background thread and wait until the simulation is done
 
         command = 'bg_run' if background else 'run'
-        self.exec_command(command)
-
         if background:
+            # set before the background thread could have finished
             self._is_running = True
-        else:
+            self._background_thread_done.clear()
+        self.exec_command(command)
+
+        if not background:
             self._logger.debug("Simulation is done")
 
         # time.sleep(.1) # required before to test if the simulation is running
@@ -1203,6 +1794,68 @@ class NgSpiceShared:
 
     ##############################################
 
+    async def run_async(self):
+
+        """Run the simulation in the background thread and wait until it is done, without blocking
+        the event loop.
+
+        If the coroutine is cancelled, the simulation is halted.
+
+        Example::
+
+            async def simulate(ngspice_shared):
+                ngspice_shared.load_circuit(...)
+                task = asyncio.create_task(ngspice_shared.run_async())
+                async for message in ngspice_shared.stat_messages():
+                    print(message)
+                await task
+
+        """
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._async_lock:
+            self._background_waiters.append((loop, future))
+        try:
+            self.run(background=True)
+            await future
+        except asyncio.CancelledError:
+            self._logger.debug('Cancelled, halt the simulation')
+            self.halt()
+            raise
+        finally:
+            with self._async_lock:
+                if (loop, future) in self._background_waiters:
+                    self._background_waiters.remove((loop, future))
+
+    ##############################################
+
+    async def stat_messages(self):
+
+        """Asynchronous iterator on the messages sent by the *send_stat* callback, e.g. the simulation
+        progress, until the end of the current or the next simulation run in the background thread.
+
+        The iteration must be started before the simulation is done, else it waits for the next run.
+
+        """
+
+        loop = asyncio.get_running_loop()
+        message_queue = asyncio.Queue()
+        item = (loop, message_queue)
+        with self._async_lock:
+            self._stat_queues.append(item)
+        try:
+            while True:
+                message = await message_queue.get()
+                if message is None:
+                    break
+                yield message
+        finally:
+            with self._async_lock:
+                self._stat_queues.remove(item)
+
+    ##############################################
+
     def halt(self):
         """ Halt the simulation in the background thread. """
         self.exec_command('bg_halt')
@@ -1210,12 +1863,139 @@ class NgSpiceShared:
     ##############################################
 
     def resume(self, background=True):
-        """ Halt the simulation in the background thread. """
+        """ Resume the simulation, in the background thread if *background* is set. """
         command = 'bg_resume' if background else 'resume'
+        if background:
+            self._is_running = True
+            self._background_thread_done.clear()
         self.exec_command(command)
 
     ##############################################
 
+    def wait(self, timeout=None):
+        """Wait until the background thread exits, return :obj:`False` if *timeout* expired."""
+        return self._background_thread_done.wait(timeout)
+
+    ##############################################
+
+    def set_breakpoint(self, time):
+        """Set a breakpoint at the given simulated time, i.e. force the transient simulation to compute a
+        time point at this exact time.
+
+        Note a breakpoint doesn't halt the simulation, use :meth:`stop` for this purpose.
+
+        """
+        # Ngspice API: ngSpice_SetBkpt
+        if not self._ngspice_shared.ngSpice_SetBkpt(float(time)):
+            raise NameError("ngSpice_SetBkpt failed, is a circuit loaded?")
+
+    ##############################################
+
+    def _set_chunk_breakpoint(self, time):
+        # the breakpoint ensures a time point at the end of the chunk, and the stop condition
+        # halts the simulation at this time point
+        self.set_breakpoint(time)
+        self.stop('time >= {!r}'.format(time))
+
+    ##############################################
+
+    def run_chunked(self, chunk_time, end_time=None, vector_names=None):
+
+        """Run a transient simulation in the background thread by chunks of *chunk_time* seconds of
+        simulated time and return an iterator on the new samples of each chunk.
+
+        The simulation is halted at the end of each chunk by a ``stop when time >= t`` condition, a
+        breakpoint forces a time point at this exact time.  When the simulation is halted, the
+        samples computed since the previous chunk are copied from the current plot and yielded as
+        a dictionary of Numpy arrays indexed by vector names, then the simulation is resumed.  Thus
+        the Python side only holds the data of a chunk.  *vector_names* selects the vectors, by
+        default all the vectors of the plot are returned.
+
+        *end_time* should be the end time of the transient analysis: since Ngspice starts a new run
+        when a done simulation is resumed, the iteration stops when the chunk reaches it.  Without
+        it, the end of the simulation is only detected when it doesn't coincide with the end of a
+        chunk, else the new run is detected afterwards and discarded.
+
+        The simulation is then left halted, as well if the iterator is closed before.  Note the stop
+        conditions are removed using ``delete all``, which removes also the other breakpoints and
+        traces.
+
+        Example::
+
+            ngspice_shared.load_circuit(...)  # with a .tran analysis
+            for chunk in ngspice_shared.run_chunked(chunk_time=100e-6, end_time=10e-3):
+                process(chunk['time'], chunk['out'])
+
+        """
+
+        chunk_time = float(chunk_time)
+        if chunk_time <= 0:
+            raise ValueError('Chunk time must be positive')
+        if end_time is not None:
+            end_time = float(end_time)
+        # time points are compared with a tolerance
+        tolerance = chunk_time * 1e-9
+
+        number_of_chunks = 1
+        breakpoint_time = chunk_time
+        self._set_chunk_breakpoint(breakpoint_time)
+        self.run(background=True)
+        plot_name = None
+        offset = 0
+        try:
+            while True:
+                self.wait()
+                if plot_name is None:
+                    plot_name = self.last_plot
+                elif self.last_plot != plot_name:
+                    self._logger.warning('Simulation was done, discard the new run {}'.format(self.last_plot))
+                    self.destroy(self.last_plot)
+                    break
+                if vector_names is None:
+                    vector_names = self.plot_vector_names(plot_name)
+                chunk = self._plot_chunk(plot_name, vector_names, offset)
+                if 'time' in chunk:
+                    time = chunk['time']
+                else:
+                    time = self._plot_chunk(plot_name, ('time',), offset)['time']
+                if not time.size:
+                    self._logger.debug('Simulation is done')
+                    break
+                offset += time.size
+                self._logger.debug('Chunk {} points up to {}'.format(time.size, time[-1]))
+                yield chunk
+                last_time = time[-1]
+                if (last_time < breakpoint_time - tolerance or
+                    (end_time is not None and last_time >= end_time - tolerance)):
+                    break
+                while breakpoint_time <= last_time + tolerance:
+                    number_of_chunks += 1
+                    breakpoint_time = number_of_chunks * chunk_time
+                # the stop condition would halt the simulation at each time point
+                self.delete('all')
+                self._set_chunk_breakpoint(breakpoint_time)
+                self.resume(background=True)
+        finally:
+            self.delete('all')
+
+    ##############################################
+
+    def _plot_chunk(self, plot_name, vector_names, offset):
+
+        """Return a copy of the vector data from *offset*."""
+
+        chunk = {}
+        for vector_name in vector_names:
+            vector_info = self._get_vector_info(plot_name, vector_name)
+            length = vector_info.v_length
+            if length > offset:
+                chunk[vector_name] = np.array(self._vector_view(vector_info, length)[offset:])
+            else:
+                chunk[vector_name] = np.zeros(0)
+        return chunk
+
+    ##############################################
+
     @property
     def plot_names(self):
         """ Return the list of plot names. """
@@ -1266,55 +2046,244 @@ class NgSpiceShared:
 
     ##############################################
 
-    def plot(self, simulation, plot_name):
+    def plot(self, simulation, plot_name, zero_copy=False, lazy=False):
+
+        """ Return the corresponding plot.
+
+        If *zero_copy* is set, vectors are read-only views on the Ngspice memory, complex vectors
+        use a `complex128` dtype.  The plot is then pinned, :meth:`destroy` is deferred until every
+        view is released.  However :meth:`reset`, :meth:`remove_circuit` and :meth:`quit` don't
+        respect the pins and can release the memory behind the views.
 
-        """ Return the corresponding plot. """
+        If *lazy* is set, return a :class:`LazyPlot` which only fetches a vector on first access.
+
+        """
 
         # Ngspice API: ngSpice_AllVecs ngGet_Vec_Info
 
         # plot_name is for example dc with an integer suffix which is increment for each run
 
-        plot = Plot(simulation, plot_name)
+        vector_names = self.plot_vector_names(plot_name)
+        if lazy:
+            plot = LazyPlot(simulation, plot_name, self, vector_names, zero_copy)
+            # the vectors must survive until they are fetched
+            self._pin_plot(plot_name, plot)
+        else:
+            plot = Plot(simulation, plot_name, zero_copy)
+            for vector_name in vector_names:
+                plot[vector_name] = self._get_vector(plot_name, vector_name, zero_copy)
+        return plot
+
+    ##############################################
+
+    def plot_vector_names(self, plot_name):
+
+        """Return the list of the vector names of a plot."""
+
+        # Ngspice API: ngSpice_AllVecs
+        vector_names = []
         all_vectors_c = self._ngspice_shared.ngSpice_AllVecs(plot_name.encode('utf8'))
         i = 0
         while True:
             if all_vectors_c[i] == FFI.NULL:
                 break
+            vector_names.append(ffi_string_utf8(all_vectors_c[i]))
+            i += 1
+        return vector_names
 
-            vector_name = ffi_string_utf8(all_vectors_c[i])
-            name = '.'.join((plot_name, vector_name))
-            vector_info = self._ngspice_shared.ngGet_Vec_Info(name.encode('utf8'))
-            vector_type = self._simulation_type[vector_info.v_type]
-            length = vector_info.v_length
-            # template = 'vector[{}] {} type {} flags {} length {}'
-            # self._logger.debug(template.format(
-            #     i,
-            #     vector_name,
-            #     vector_type,
-            #     self._flags_to_str(vector_info.v_flags),
-            #     length,
-            # ))
-            if vector_info.v_compdata == FFI.NULL:
-                # for k in range(length):
-                #     print("  [{}] {}".format(k, vector_info.v_realdata[k]))
-                tmp_array = np.frombuffer(ffi.buffer(vector_info.v_realdata, length*8), dtype=np.float64)
-                array = np.array(tmp_array, dtype=tmp_array.dtype)  # copy data
-                # import json
-                # with open(name + '.json', 'w') as fh:
-                #     json.dump(list(array), fh)
-            else:
-                # for k in range(length):
-                #     value = vector_info.v_compdata[k]
-                #     print(ffi.addressof(value, field='cx_real'), ffi.addressof(value, field='cx_imag'))
-                #     print("  [{}] {} + i {}".format(k, value.cx_real, value.cx_imag))
-                tmp_array = np.frombuffer(ffi.buffer(vector_info.v_compdata, length*8*2), dtype=np.float64)
-                array = np.array(tmp_array[0::2], dtype=np.complex128)
-                array.imag = tmp_array[1::2]
-            plot[vector_name] = Vector(self, vector_name, vector_type, array)
+    ##############################################
 
-            i += 1
+    def _get_vector_info(self, plot_name, vector_name):
 
-        return plot
+        # Ngspice API: ngGet_Vec_Info
+
+        name = '.'.join((plot_name, vector_name))
+        vector_info = self._ngspice_shared.ngGet_Vec_Info(name.encode('utf8'))
+        if vector_info == FFI.NULL:
+            raise NameError("Vector {} not found".format(name))
+        return vector_info
+
+    ##############################################
+
+    def _get_vector_type(self, plot_name, vector_name):
+        return self._simulation_type[self._get_vector_info(plot_name, vector_name).v_type]
+
+    ##############################################
+
+    def _get_vector(self, plot_name, vector_name, zero_copy=False):
+
+        vector_info = self._get_vector_info(plot_name, vector_name)
+        vector_type = self._simulation_type[vector_info.v_type]
+        length = vector_info.v_length
+        # template = 'vector {} type {} flags {} length {}'
+        # self._logger.debug(template.format(
+        #     vector_name,
+        #     vector_type,
+        #     self._flags_to_str(vector_info.v_flags),
+        #     length,
+        # ))
+        if zero_copy:
+            array = self._vector_view(vector_info, length)
+            self._pin_plot(plot_name, array)
+        elif vector_info.v_compdata == FFI.NULL:
+            # for k in range(length):
+            #     print("  [{}] {}".format(k, vector_info.v_realdata[k]))
+            tmp_array = np.frombuffer(ffi.buffer(vector_info.v_realdata, length*8), dtype=np.float64)
+            array = np.array(tmp_array, dtype=tmp_array.dtype)  # copy data
+        else:
+            # for k in range(length):
+            #     value = vector_info.v_compdata[k]
+            #     print(ffi.addressof(value, field='cx_real'), ffi.addressof(value, field='cx_imag'))
+            #     print("  [{}] {} + i {}".format(k, value.cx_real, value.cx_imag))
+            tmp_array = np.frombuffer(ffi.buffer(vector_info.v_compdata, length*8*2), dtype=np.float64)
+            array = np.array(tmp_array[0::2], dtype=np.complex128)
+            array.imag = tmp_array[1::2]
+        return Vector(self, vector_name, vector_type, array)
+
+    ##############################################
+
+    @staticmethod
+    def _vector_view(vector_info, length):
+        """Return a read-only Numpy array on the vector data."""
+        # ngcomplex_t is a pair of double which matches the complex128 memory layout
+        if vector_info.v_compdata == FFI.NULL:
+            array = np.frombuffer(ffi.buffer(vector_info.v_realdata, length*8), dtype=np.float64)
+        else:
+            array = np.frombuffer(ffi.buffer(vector_info.v_compdata, length*8*2), dtype=np.complex128)
+        array.flags.writeable = False
+        return array
+
+####################################################################################################
+
+class NgSpiceSharedPool:
+
+    """This class implements a pool of isolated :class:`NgSpiceShared` instances.
+
+    Ngspice relies on global variables, thus each instance must load its own copy of the shared
+    library.  The pool copies the library to numbered files, e.g. :file:`libngspice1.so`, in its own
+    directory and creates an instance for each copy.  Since the dynamic loader returns the library
+    already loaded from a path, two pools must not share their copies.
+
+    Instances are checked out and in using::
+
+        pool = NgSpiceSharedPool(number_of_instances=4)
+        with pool.instance() as ngspice_shared:
+            simulator = circuit.simulator(simulator='ngspice-shared', ngspice_shared=ngspice_shared)
+            analysis = simulator.transient(...)
+
+    See :meth:`PySpice.Spice.NgSpice.Simulation.NgSpiceSharedCircuitSimulator.map` to spread
+    simulations over the pool.
+
+    """
+
+    _logger = _module_logger.getChild('NgSpiceSharedPool')
+
+    ##############################################
+
+    def __init__(self, number_of_instances=None, cache_path=None, library_path=None,
+                 ngspice_shared_cls=NgSpiceShared, **kwargs):
+
+        """Create *number_of_instances* instances, default to the number of CPU cores.
+
+        The library copies are stored in a directory of the pool created in *cache_path*, default to
+        a directory in the temporary directory.  It is removed when the pool is garbage collected.  *library_path* is the library to copy, default to
+        :meth:`NgSpiceShared.find_library`.  Remaining *kwargs* are passed to the
+        *ngspice_shared_cls* constructor.
+
+        """
+
+        if number_of_instances is None:
+            number_of_instances = os.cpu_count() or 1
+        if cache_path is None:
+            cache_path = Path(tempfile.gettempdir()).joinpath('PySpice', 'ngspice')
+        self._cache_path = Path(cache_path)
+        self._cache_path.mkdir(parents=True, exist_ok=True)
+        self._directory = Path(tempfile.mkdtemp(prefix='pool-', dir=str(self._cache_path)))
+        # the copies can still be loaded, which is allowed on POSIX systems
+        weakref.finalize(self, shutil.rmtree, str(self._directory), True)
+
+        if library_path is None:
+            library_path = ngspice_shared_cls.find_library()
+        library_path = Path(library_path)
+
+        self._instances = []
+        self._queue = queue.Queue()
+        for ngspice_id in range(1, number_of_instances + 1):
+            copy_path = self._copy_library(library_path, ngspice_id)
+            self._logger.debug('Create instance {} using {}'.format(ngspice_id, copy_path))
+            instance = ngspice_shared_cls(ngspice_id=ngspice_id, library_path=str(copy_path), **kwargs)
+            self._instances.append(instance)
+            self._queue.put(instance)
+
+        self._executor = None
+
+    ##############################################
+
+    def _copy_library(self, library_path, ngspice_id):
+
+        file_name = Path(NgSpiceShared.LIBRARY_PATH.format(ngspice_id)).name
+        copy_path = self._directory.joinpath(file_name)
+        shutil.copy2(library_path, copy_path)
+        return copy_path
+
+    ##############################################
+
+    def __len__(self):
+        return len(self._instances)
+
+    def __iter__(self):
+        return iter(self._instances)
+
+    @property
+    def cache_path(self):
+        return self._cache_path
+
+    @property
+    def directory(self):
+        """Directory of the library copies"""
+        return self._directory
+
+    ##############################################
+
+    def acquire(self, timeout=None):
+        """Check out an instance, wait if all instances are busy."""
+        return self._queue.get(timeout=timeout)
+
+    ##############################################
+
+    def release(self, instance):
+        """Check in an instance."""
+        if instance not in self._instances:
+            raise ValueError('Instance {} is not owned by this pool'.format(instance.ngspice_id))
+        self._queue.put(instance)
+
+    ##############################################
+
+    @contextmanager
+    def instance(self, timeout=None):
+        """Context manager to check out and check in an instance."""
+        instance = self.acquire(timeout)
+        try:
+            yield instance
+        finally:
+            self.release(instance)
+
+    ##############################################
+
+    @property
+    def executor(self):
+        """Thread pool executor having a worker per instance."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=len(self._instances),
+                                                thread_name_prefix='ngspice')
+        return self._executor
+
+    ##############################################
+
+    def shutdown(self, wait=True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
 
 ####################################################################################################
 #
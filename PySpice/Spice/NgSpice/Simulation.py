@@ -24,12 +24,15 @@
 ####################################################################################################
 
 import logging
+import os
 
 ####################################################################################################
 
-from ..Simulation import CircuitSimulator
-from .Server import SpiceServer
-from .Shared import NgSpiceShared
+from ..BasicElement import Capacitor, CurrentSource, Inductor, Resistor, VoltageSource
+from ..Simulation import CircuitSimulation, CircuitSimulator
+from ...Unit.Unit import UnitValue
+from .Server import PersistentSpiceServer, SpiceServer
+from .Shared import NgSpiceShared, NgSpiceCommandError
 
 ####################################################################################################
 
@@ -55,6 +58,19 @@ class NgSpiceCircuitSimulator(CircuitSimulator):
 
 class NgSpiceSubprocessCircuitSimulator(NgSpiceCircuitSimulator):
 
+    """This class implements a simulator running ngspice as a subprocess.
+
+    By default, a new ngspice process is started for each analysis.  Set *persistent* to run the
+    analyses in a long-lived ngspice process shared by the simulators using the same
+    *spice_command* and limits, see
+    :meth:`PySpice.Spice.NgSpice.Server.PersistentSpiceServer.shared`, or pass a
+    :class:`PySpice.Spice.NgSpice.Server.PersistentSpiceServer` instance as *spice_server*.
+
+    The *timeout*, *cpu_time_limit* and *memory_limit* parameters limit the resources of the ngspice
+    process, see :mod:`PySpice.Spice.ProcessLimits`.
+
+    """
+
     _logger = _module_logger.getChild('NgSpiceSubprocessCircuitSimulator')
 
     ##############################################
@@ -64,14 +80,36 @@ class NgSpiceSubprocessCircuitSimulator(NgSpiceCircuitSimulator):
         super().__init__(circuit, pipe=True, **kwargs)
 
         # Fixme: to func ?
-        server_kwargs = {x:kwargs[x] for x in ('spice_command',) if x in kwargs}
-        self._spice_server = SpiceServer(**server_kwargs)
+        server_kwargs = {x:kwargs[x]
+                         for x in ('spice_command', 'timeout', 'cpu_time_limit', 'memory_limit')
+                         if x in kwargs}
+        spice_server = kwargs.get('spice_server', None)
+        if spice_server is not None:
+            self._spice_server = spice_server
+        elif kwargs.get('persistent', False):
+            self._spice_server = PersistentSpiceServer.shared(**server_kwargs)
+        else:
+            self._spice_server = SpiceServer(**server_kwargs)
 
     ##############################################
 
-    def _run(self, analysis_method, *args, **kwargs):
+    @property
+    def spice_server(self):
+        return self._spice_server
 
+    @property
+    def simulator_version(self):
+        return getattr(self._spice_server, 'version', None)
+
+    ##############################################
+
+    def _run(self, analysis_method, *args, **kwargs):
         super()._run(analysis_method, *args, **kwargs)
+        return self._simulate()
+
+    ##############################################
+
+    def _simulate(self):
 
         raw_file = self._spice_server(spice_input=str(self))
         self.reset_analysis()
@@ -86,8 +124,34 @@ class NgSpiceSubprocessCircuitSimulator(NgSpiceCircuitSimulator):
 
 class NgSpiceSharedCircuitSimulator(NgSpiceCircuitSimulator):
 
+    """This class implements a simulator using the Ngspice shared library.
+
+    Set *zero_copy* to get waveforms which are read-only views on the Ngspice memory, see
+    :meth:`PySpice.Spice.NgSpice.Shared.NgSpiceShared.plot`.  Set *lazy* to get an analysis
+    whose waveforms are only fetched from Ngspice on first access, the plot is then kept in the
+    Ngspice memory as long as the analysis is alive.
+
+    When the simulator is run again and only the values of passive elements, of independent DC
+    sources or the numeric parameters of the models have changed, the circuit is not reloaded but
+    updated using the *alter* and *altermod* commands, which avoids to parse the netlist and to
+    setup the matrix again.  Set *incremental* to :obj:`False` to always reload the circuit.
+
+    """
+
     _logger = _module_logger.getChild('NgSpiceSharedCircuitSimulator')
 
+    # sweep points alter the loaded circuit
+    SWEEP_IN_PLACE = True
+
+    # Spice parameter to alter the value of the first positional parameter, for these exact classes
+    _ALTERABLE_VALUE = {
+        Resistor: 'resistance',
+        Capacitor: 'capacitance',
+        Inductor: 'inductance',
+        VoltageSource: 'dc',
+        CurrentSource: 'dc',
+    }
+
     ##############################################
 
     def __init__(self, circuit, **kwargs):
@@ -100,6 +164,12 @@ class NgSpiceSharedCircuitSimulator(NgSpiceCircuitSimulator):
         else:
             self._ngspice_shared = ngspice_shared
 
+        self._zero_copy = kwargs.get('zero_copy', False)
+        self._lazy = kwargs.get('lazy', False)
+        self._incremental = kwargs.get('incremental', True)
+        self._loaded_state = None
+        self._loaded_serial = None
+
     ##############################################
 
     @property
@@ -108,14 +178,210 @@ class NgSpiceSharedCircuitSimulator(NgSpiceCircuitSimulator):
 
     ##############################################
 
-    def _run(self, analysis_method, *args, **kwargs):
+    def clone(self, circuit=None, ngspice_shared=None):
+
+        """Return a copy of the simulation for *circuit*, using the *ngspice_shared* instance if it
+        is given, else the same instance.
+
+        """
+
+        simulator = super().clone(circuit)
+        if ngspice_shared is not None:
+            simulator._ngspice_shared = ngspice_shared
+            simulator._loaded_state = None
+            simulator._loaded_serial = None
+        return simulator
+
+    @property
+    def simulator_version(self):
+        return self._ngspice_shared.ngspice_version
+
+    ##############################################
+
+    @classmethod
+    def _simulate_on_pool(cls, pool, circuit, analysis_method, args, kwargs, simulator_kwargs):
+        with pool.instance() as ngspice_shared:
+            simulator = cls(circuit, ngspice_shared=ngspice_shared, **simulator_kwargs)
+            return getattr(simulator, analysis_method)(*args, **kwargs)
+
+    ##############################################
+
+    @classmethod
+    def submit(cls, pool, circuit, analysis_method, *args, simulator_kwargs=None, **kwargs):
+
+        """Schedule the analysis of a circuit on a :class:`PySpice.Spice.NgSpice.Shared.NgSpiceSharedPool`
+        and return a :class:`concurrent.futures.Future`.
+
+        *analysis_method* is the name of the simulator method, e.g. ``'transient'``, and *args*,
+        *kwargs* its parameters.  *simulator_kwargs* are passed to the simulator constructor.
+
+        """
+
+        if simulator_kwargs is None:
+            simulator_kwargs = {}
+        return pool.executor.submit(cls._simulate_on_pool, pool, circuit, analysis_method,
+                                    args, kwargs, simulator_kwargs)
+
+    ##############################################
+
+    @classmethod
+    def map(cls, pool, circuits, analysis_method, *args, simulator_kwargs=None, **kwargs):
+
+        """Run the same analysis on each circuit using the instances of the pool in parallel, and
+        return an iterator on the analyses in the circuit order.
+
+        Example::
+
+            pool = NgSpiceSharedPool(4)
+            circuits = [make_circuit(resistance) for resistance in resistances]
+            for analysis in NgSpiceSharedCircuitSimulator.map(pool, circuits, 'operating_point'):
+                ...
+
+        """
+
+        futures = [cls.submit(pool, circuit, analysis_method, *args, simulator_kwargs=simulator_kwargs, **kwargs)
+                   for circuit in circuits]
+        return (future.result() for future in futures)
+
+    ##############################################
+
+    @staticmethod
+    def _numeric_value(value):
+        if isinstance(value, (int, float, UnitValue)) and not isinstance(value, bool):
+            return repr(float(value))
+        else:
+            return None
+
+    ##############################################
+
+    def _netlist_state(self):
+
+        """Return a tuple *(structure, element_values, model_values)* where *structure* describes
+        everything in the desk which cannot be altered, and the values dictionaries map an element
+        or a model name to a dictionary of Spice parameter values.
+
+        """
+
+        circuit = self._circuit
+        structure = [
+            circuit._str_title(),
+            circuit._str_includes(self.SIMULATOR),
+            circuit._str_libs(self.SIMULATOR),
+            circuit._str_globals(),
+            circuit._str_parameters(),
+            circuit._str_raw_spice(),
+            circuit._str_subcircuits(),
+            self.str_simulation(),
+        ]
+
+        element_values = {}
+        for element in circuit.elements:
+            if not element.enabled:
+                continue
+            spice_name = self._ALTERABLE_VALUE.get(type(element), None)
+            parameters = list(element.parameter_iterator())
+            value = None
+            if spice_name is not None and parameters and parameters[0].position == 0:
+                value = self._numeric_value(parameters[0].__get__(element))
+            if value is None:
+                structure.append(str(element))
+            else:
+                element_values[element.name] = {spice_name: value}
+                structure.append((
+                    element.name,
+                    tuple(element.node_names),
+                    tuple(parameter.to_str(element) for parameter in parameters[1:]),
+                    element.raw_spice,
+                ))
+
+        model_values = {}
+        for model in circuit.models:
+            values = {}
+            others = []
+            for key in sorted(model.parameters):
+                value = self._numeric_value(model[key])
+                if value is None:
+                    others.append((key, str(model[key])))
+                else:
+                    values[key] = value
+            model_values[model.name] = values
+            structure.append((model.name, model.model_type, tuple(sorted(values)), tuple(others)))
+
+        return tuple(structure), element_values, model_values
+
+    ##############################################
+
+    def _alter_circuit(self, state):
+
+        """Alter the loaded circuit to match *state*, return :obj:`False` if the circuit must be
+        reloaded.
+
+        """
+
+        if (self._loaded_state is None or
+            self._loaded_serial != self._ngspice_shared.circuit_serial or
+            self._loaded_state[0] != state[0]):
+            return False
+
+        _, loaded_element_values, loaded_model_values = self._loaded_state
+        _, element_values, model_values = state
+        try:
+            for name, values in element_values.items():
+                changed = {key:value for key, value in values.items()
+                           if loaded_element_values[name][key] != value}
+                if changed:
+                    self._ngspice_shared.alter_device(name, **changed)
+            for name, values in model_values.items():
+                changed = {key:value for key, value in values.items()
+                           if loaded_model_values[name][key] != value}
+                if changed:
+                    self._ngspice_shared.alter_model(name, **changed)
+        except NgSpiceCommandError as exception:
+            self._logger.warning('Alter failed, reload the circuit: {}'.format(exception))
+            return False
+
+        return True
+
+    ##############################################
+
+    def _load(self, analysis_method, *args, **kwargs):
+
+        """Declare the analysis and load the simulation in Ngspice."""
 
         super()._run(analysis_method, *args, **kwargs)
+        self._load_simulation()
+
+    ##############################################
+
+    def _load_simulation(self):
+
+        """Load the simulation, i.e. the circuit and the declared analyses, in Ngspice."""
 
         self._ngspice_shared.destroy()
         # load circuit and simulation
         # Fixme: Error: circuit not parsed.
-        self._ngspice_shared.load_circuit(str(self))
+        if self._incremental:
+            state = self._netlist_state()
+            if self._alter_circuit(state):
+                self._logger.debug('Circuit altered')
+            else:
+                self._ngspice_shared.load_circuit(str(self))
+            self._loaded_state = state
+            self._loaded_serial = self._ngspice_shared.circuit_serial
+        else:
+            self._ngspice_shared.load_circuit(str(self))
+
+    ##############################################
+
+    def _run(self, analysis_method, *args, **kwargs):
+        super()._run(analysis_method, *args, **kwargs)
+        return self._simulate()
+
+    ##############################################
+
+    def _simulate(self):
+
+        self._load_simulation()
         self._ngspice_shared.run()
         self._logger.debug(str(self._ngspice_shared.plot_names))
         self.reset_analysis()
@@ -124,4 +390,73 @@ class NgSpiceSharedCircuitSimulator(NgSpiceCircuitSimulator):
         if plot_name == 'const':
             raise NameError('Simulation failed')
 
-        return self._ngspice_shared.plot(self, plot_name).to_analysis()
+        return self._ngspice_shared.plot(self, plot_name, self._zero_copy, self._lazy).to_analysis()
+
+    ##############################################
+
+    def run_analyses(self, analyses):
+
+        """Load the circuit once, run several analyses in the same Ngspice session and return a
+        dictionary of analyses indexed by plot names, in the order of the simulation.
+
+        *analyses* maps analysis method names to dictionaries of parameters, e.g.::
+
+            analyses = simulator.run_analyses({
+                'operating_point': {},
+                'ac': dict(start_frequency=1@u_Hz, stop_frequency=1@u_MHz, number_of_points=10, variation='dec'),
+                'transient': dict(step_time=1@u_us, end_time=1@u_ms),
+            })
+            analyses['op1'], analyses['ac1'], analyses['tran1']
+
+        Note a noise analysis produces two plots, *noise1* and *noise2*.
+
+        """
+
+        self.reset_analysis()
+        for analysis_method, parameters in analyses.items():
+            parameters = dict(parameters)
+            if 'probes' in parameters:
+                self.save(*parameters.pop('probes'))
+            method = getattr(CircuitSimulation, analysis_method, None)
+            if method is None:
+                raise NameError("Unknown analysis {}".format(analysis_method))
+            method(self, **parameters)
+        if self._logger.isEnabledFor(logging.DEBUG):
+            self._logger.debug('desk' + os.linesep + str(self))
+
+        self._load_simulation()
+        # the plots of a previous simulation can be kept in Ngspice
+        previous_plot_names = set(self._ngspice_shared.plot_names)
+        self._ngspice_shared.run()
+        self.reset_analysis()
+
+        # the last plot is the first one
+        plot_names = [plot_name for plot_name in reversed(self._ngspice_shared.plot_names)
+                      if plot_name not in previous_plot_names and plot_name != 'const']
+        if not plot_names:
+            raise NameError('Simulation failed')
+        return {plot_name:self._ngspice_shared.plot(self, plot_name, self._zero_copy, self._lazy).to_analysis()
+                for plot_name in plot_names}
+
+    ##############################################
+
+    def transient_chunked(self, chunk_time, step_time, end_time, *args, vector_names=None, **kwargs):
+
+        """Perform a transient analysis and return an iterator on the new samples of each chunk of
+        *chunk_time* seconds of simulated time, see
+        :meth:`PySpice.Spice.NgSpice.Shared.NgSpiceShared.run_chunked`.
+
+        The other parameters are the ones of :meth:`transient`.
+
+        Example::
+
+            for chunk in simulator.transient_chunked(100@u_us, step_time=1@u_us, end_time=10@u_ms):
+                process(chunk['time'], chunk['out'])
+
+        """
+
+        self._load('transient', step_time, end_time, *args, **kwargs)
+        try:
+            yield from self._ngspice_shared.run_chunked(chunk_time, end_time=end_time, vector_names=vector_names)
+        finally:
+            self.reset_analysis()
@@ -0,0 +1,66 @@
+####################################################################################################
+#
+# PySpice - A Spice Package for Python
+# Copyright (C) 2021 Fabrice Salvaire
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+####################################################################################################
+
+"""This module builds the out-of-line cffi module for the Ngspice shared library API.
+
+The generated module :mod:`PySpice.Spice.NgSpice._ngspice_cffi` holds the API declarations in a
+precompiled form, thus :mod:`PySpice.Spice.NgSpice.Shared` doesn't have to parse :file:`api.h` at
+runtime.  If the module is not available, the declarations are parsed at runtime.
+
+The module is built at install time by the *cffi_modules* setup hook, or manually using::
+
+    python PySpice/Spice/NgSpice/api_build.py
+
+The ABI mode is used, since the library is loaded at runtime from a path which is only known at
+this time, and :class:`PySpice.Spice.NgSpice.Shared.NgSpiceSharedPool` loads several copies of
+it.  Thus the build doesn't require a compiler nor the Ngspice headers.
+
+"""
+
+####################################################################################################
+
+from pathlib import Path
+
+from cffi import FFI
+
+####################################################################################################
+
+MODULE_NAME = 'PySpice.Spice.NgSpice._ngspice_cffi'
+
+API_PATH = Path(__file__).parent.joinpath('api.h')
+
+####################################################################################################
+
+def make_ffi_builder():
+    ffi_builder = FFI()
+    with open(API_PATH) as fh:
+        ffi_builder.cdef(fh.read())
+    ffi_builder.set_source(MODULE_NAME, None)
+    return ffi_builder
+
+ffibuilder = make_ffi_builder()
+
+####################################################################################################
+
+if __name__ == '__main__':
+
+    # generate the module in the source tree
+    source_path = Path(__file__).resolve().parents[3]
+    ffibuilder.compile(tmpdir=str(source_path), verbose=True)
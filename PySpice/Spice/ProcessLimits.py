@@ -0,0 +1,177 @@
+####################################################################################################
+#
+# PySpice - A Spice Package for Python
+# Copyright (C) 2021 Fabrice Salvaire
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+####################################################################################################
+
+"""This module implements the resource limits of the simulator subprocesses.
+
+A pathological deck, e.g. a transient analysis where the time step becomes too small, can run
+forever or consume all the memory.  The servers accept these parameters, which can also be passed
+to :meth:`PySpice.Spice.Simulation.CircuitSimulator.factory`:
+
+  *timeout*
+    wall-clock time limit of a simulation in seconds
+
+  *cpu_time_limit*
+    CPU time limit of the process in seconds, the process receives *SIGXCPU* then *SIGKILL*
+
+  *memory_limit*
+    address space limit of the process in bytes, the allocations fail beyond it
+
+The CPU time and memory limits are set by the *ulimit* builtin of a shell which then executes the
+simulator, thus no Python code runs in the child process between the fork and the exec, which is
+unsafe in a multi-threaded process.  These limits are only supported on POSIX systems and the memory
+limit is rounded down to a multiple of 1024 bytes.  When a limit is reached, the process is killed
+and :exc:`NameError` is raised with the end of the simulator output.
+
+"""
+
+####################################################################################################
+
+__all__ = ['ProcessLimits']
+
+####################################################################################################
+
+import logging
+import os
+import signal
+
+try:
+    import resource
+except ImportError:
+    # Windows
+    resource = None
+
+####################################################################################################
+
+_module_logger = logging.getLogger(__name__)
+
+####################################################################################################
+
+class ProcessLimits:
+
+    """This class holds the resource limits of a process, :obj:`None` means unlimited."""
+
+    _logger = _module_logger.getChild('ProcessLimits')
+
+    # number of characters of the output reported on error
+    OUTPUT_TAIL = 2000
+
+    SHELL = '/bin/sh'
+
+    ##############################################
+
+    @classmethod
+    def from_kwargs(cls, kwargs):
+        return cls(
+            timeout=kwargs.get('timeout', None),
+            cpu_time=kwargs.get('cpu_time_limit', None),
+            memory=kwargs.get('memory_limit', None),
+        )
+
+    ##############################################
+
+    def __init__(self, timeout=None, cpu_time=None, memory=None):
+
+        for name, value in (('timeout', timeout), ('CPU time', cpu_time), ('memory', memory)):
+            if value is not None and value <= 0:
+                raise ValueError('The {} limit must be positive'.format(name))
+        self._timeout = timeout
+        self._cpu_time = None if cpu_time is None else int(max(1, cpu_time))
+        self._memory = None if memory is None else int(memory)
+        if resource is None and (self._cpu_time or self._memory):
+            self._logger.warning('Resource limits are not supported on this platform')
+            self._cpu_time = self._memory = None
+
+    ##############################################
+
+    @property
+    def timeout(self):
+        return self._timeout
+
+    @property
+    def cpu_time(self):
+        return self._cpu_time
+
+    @property
+    def memory(self):
+        return self._memory
+
+    ##############################################
+
+    def command(self, command):
+
+        """Return the command running *command* with the limits, i.e. wrapped in a shell setting
+        them, or *command* if there is no limit.
+
+        """
+
+        command = tuple(command)
+        if self._cpu_time is None and self._memory is None:
+            return command
+        limits = []
+        if self._cpu_time is not None:
+            # SIGXCPU at the soft limit, SIGKILL at the hard limit
+            limits.append('ulimit -S -t {}'.format(self._cpu_time))
+            limits.append('ulimit -H -t {}'.format(self._cpu_time + 1))
+        if self._memory is not None:
+            # in kibibytes
+            limits.append('ulimit -v {}'.format(max(1, self._memory // 1024)))
+        script = ' && '.join(limits + ['exec "$0" "$@"'])
+        return (self.SHELL, '-c', script) + command
+
+    ##############################################
+
+    def _tail(self, output):
+        if isinstance(output, bytes):
+            output = output.decode('utf-8', errors='replace')
+        output = output or ''
+        if len(output) > self.OUTPUT_TAIL:
+            output = '...' + output[-self.OUTPUT_TAIL:]
+        return output
+
+    ##############################################
+
+    def timeout_error(self, output='', timeout=None):
+        """Return the exception for a simulation which exceeded the timeout."""
+        if timeout is None:
+            timeout = self._timeout
+        return NameError('Simulation timeout after {} s'.format(timeout) + os.linesep + self._tail(output))
+
+    ##############################################
+
+    def check_return_code(self, return_code, output=''):
+
+        """Raise :exc:`NameError` if the process was killed by a signal, e.g. when it exceeded the
+        CPU time limit.
+
+        """
+
+        if return_code is None or return_code >= 0:
+            return
+        signal_number = -return_code
+        try:
+            signal_name = signal.Signals(signal_number).name
+        except ValueError:
+            signal_name = str(signal_number)
+        message = 'Simulator killed by signal {}'.format(signal_name)
+        if self._cpu_time is not None and signal_name in ('SIGXCPU', 'SIGKILL'):
+            message += ', CPU time limit of {} s exceeded'.format(self._cpu_time)
+        elif self._memory is not None:
+            message += ', the memory limit of {} bytes may have been exceeded'.format(self._memory)
+        raise NameError(message + os.linesep + self._tail(output))
@@ -33,7 +33,10 @@ from PySpice.Unit import u_Degree, u_V, u_A, u_s, u_Hz
 
 ####################################################################################################
 
+import fnmatch
+import io
 import logging
+import time
 import numpy as np
 
 ####################################################################################################
@@ -142,9 +145,12 @@ class VariableAbc:
 
     ##############################################
 
-    def to_waveform(self, abscissa=None, to_real=False, to_float=False):
+    def to_waveform(self, abscissa=None, to_real=False, to_float=False, copy=True):
 
-        """ Return a :obj:`PySpice.Probe.WaveForm` instance. """
+        """ Return a :obj:`PySpice.Probe.WaveForm` instance.
+
+        If *copy* is not set, the waveform is a view on the data.
+        """
 
         data = self.data
         if to_real:
@@ -154,19 +160,46 @@ class VariableAbc:
         #     data = float(data[0])
 
         if self._unit is not None:
-            return WaveForm.from_unit_values(self.simplified_name, self._unit(data), abscissa=abscissa)
+            return WaveForm.from_unit_values(self.simplified_name, self._unit(data), abscissa=abscissa, copy=copy)
         else:
-            return WaveForm.from_array(self.simplified_name, data, abscissa=abscissa)
+            return WaveForm.from_array(self.simplified_name, data, abscissa=abscissa, copy=copy)
 
 ####################################################################################################
 
 class RawFileAbc:
 
     """ This class parse the stdout of ngspice and the raw data output.
+
+    The data can be in binary or ASCII format, the ASCII values are parsed in bulk using Numpy.
+
+    A raw file can be read from a path or from a binary file object.  If it is memory-mapped, the
+    data of the variables are strided views on the binary section of the file, thus the file is
+    only read on demand and can be larger than the memory.  The points can also be iterated by
+    chunks using :meth:`iter_chunks`.
+
+    The variables to load can be selected by names or :mod:`fnmatch` patterns, e.g. ``('v(out)',
+    'i(*)')``, matched case insensitively against the name and the simplified name.  The scale,
+    i.e. the first variable, is always loaded.  Unless the file is memory-mapped, only the selected
+    columns are kept in memory.
     """
 
     _logger = _module_logger.getChild('RawFileAbc')
 
+    # Set to build waveforms which are copies of the raw data, else views
+    copy_data = True
+
+    # the memory map of the raw data, if any
+    memory_map = None
+
+    BINARY_LINE = b'Binary:\n'
+    VALUES_LINE = b'Values:\n'
+
+    # Set if the data are in binary format, else ASCII
+    binary = True
+
+    # lower case patterns of the variables to load, None means all
+    _selection = None
+
     ##############################################
 
     @property
@@ -283,33 +316,305 @@ class RawFileAbc:
 
     ##############################################
 
+    def _set_selection(self, variables):
+        if variables is None:
+            self._selection = None
+        else:
+            if isinstance(variables, str):
+                variables = (variables,)
+            self._selection = [pattern.lower() for pattern in variables]
+
+    ##############################################
+
+    def _select_variables(self):
+
+        """Remove the variables which don't match the selection."""
+
+        if self._selection is None:
+            return
+        variables = {}
+        for name, variable in self.variables.items():
+            names = (name.lower(), variable.simplified_name.lower())
+            if variable.index == 0 or any(fnmatch.fnmatchcase(x, pattern)
+                                          for pattern in self._selection
+                                          for x in names):
+                variables[name] = variable
+        self._logger.debug('Select {} variables out of {}'.format(len(variables), len(self.variables)))
+        self.variables = variables
+
+    ##############################################
+
+    def _read_output(self, output):
+        """Parse the header of the output and return the binary data."""
+        return self._read_header(output)
+
+    ##############################################
+
+    def _locate_data(self, output, start=0, lines=None):
+
+        """Return the location of the first *Binary* or *Values* line in *output* and the location of
+        the data, or :obj:`None` if there is no such line.  Set the :attr:`binary` attribute.
+
+        *lines* is a pair of binary and values lines, by default :attr:`BINARY_LINE` and
+        :attr:`VALUES_LINE`.
+
+        """
+
+        if lines is None:
+            lines = (self.BINARY_LINE, self.VALUES_LINE)
+        locations = []
+        for line, binary in zip(lines, (True, False)):
+            location = output.find(line, start)
+            if location >= 0:
+                locations.append((location, location + len(line), binary))
+        if not locations:
+            return None
+        location, data_location, self.binary = min(locations)
+        return location, data_location
+
+    ##############################################
+
+    def _read_file_header(self, path, chunk_size=2**16):
+
+        """Return the header of the file up to the binary or values line, and the offset of the data.
+
+        *path* can be a path or a seekable binary file object, the offset is then relative to the
+        current position.
+
+        """
+
+        if hasattr(path, 'read'):
+            fh = path
+            start = fh.tell()
+        else:
+            fh = open(path, 'rb')
+        try:
+            header = b''
+            while True:
+                chunk = fh.read(chunk_size)
+                # the binary line can overlap two chunks
+                position = max(0, len(header) - len(self.BINARY_LINE))
+                header += chunk
+                locations = self._locate_data(header, position)
+                if locations is not None:
+                    offset = locations[1]
+                    return header[:offset], offset
+                if not chunk:
+                    raise NameError('Cannot locate binary data')
+        finally:
+            if fh is path:
+                fh.seek(start)
+            else:
+                fh.close()
+
+    ##############################################
+
+    @classmethod
+    def _read_plot_header(cls, fh):
+
+        """Parse the header of the plot at the current position of the binary file object *fh* and
+        return a raw file without data and the offset of the data relative to this position.
+
+        """
+
+        raw_file = cls.__new__(cls)
+        raw_file.number_of_points = None
+        raw_file._simulation = None
+        header, offset = raw_file._read_file_header(fh)
+        raw_file._read_output(header)
+        return raw_file, offset
+
+    ##############################################
+
+    @classmethod
+    def index(cls, path, memory_map=False, simulation=None, variables=None):
+        """Return a :class:`RawFileIndex` instance for the plots of the file *path*."""
+        return RawFileIndex(cls, path, memory_map, simulation, variables)
+
+    ##############################################
+
+    @property
+    def data_size(self):
+        """Size of the binary data in bytes"""
+        if not self.binary:
+            raise NameError('The size of ASCII data is unknown')
+        if self.flags == 'real':
+            itemsize = 8
+        elif self.flags == 'complex':
+            itemsize = 16
+        else:
+            raise NotImplementedError
+        return itemsize * self.number_of_variables * self.number_of_points
+
+    ##############################################
+
+    @staticmethod
+    def _has_file_descriptor(path):
+        """Return :obj:`True` if *path* is a path or a file object having a file descriptor."""
+        if not hasattr(path, 'read'):
+            return True
+        try:
+            path.fileno()
+        except (AttributeError, OSError):
+            # io.UnsupportedOperation is an OSError
+            return False
+        return True
+
+    ##############################################
+
+    def _read_file(self, path, memory_map=False):
+
+        """Read the header of the file *path*, a path or a binary file object, and return the binary
+        data.
+
+        If *memory_map* is set, the binary data is a read-only memory map, else it is read in memory.
+        The binary data of a file object can only be memory-mapped if it has a file descriptor, else
+        :exc:`ValueError` is raised.
+
+        """
+
+        header, offset = self._read_file_header(path)
+        self._read_output(header)
+        if hasattr(path, 'read'):
+            offset += path.tell()
+        if not self.binary:
+            # the parser stops after the values of the plot
+            size = -1
+        else:
+            size = self.data_size
+        can_map = self._has_file_descriptor(path)
+        if memory_map and size > 0 and not can_map:
+            raise ValueError('Cannot memory-map a file object without a file descriptor')
+        if memory_map and size > 0:
+            self.copy_data = False
+            # only map the binary section of this plot
+            self.memory_map = np.memmap(path, dtype=np.uint8, mode='r', offset=offset, shape=(size,))
+            return self.memory_map
+        elif self._selection is not None and can_map and size > 0:
+            # the selected columns are copied from a transient memory map
+            self.memory_map = None
+            return np.memmap(path, dtype=np.uint8, mode='r', offset=offset, shape=(size,))
+        else:
+            self.memory_map = None
+            if hasattr(path, 'read'):
+                path.seek(offset)
+                return path.read(size)
+            with open(path, 'rb') as fh:
+                fh.seek(offset)
+                return fh.read(size)
+
+    ##############################################
+
     def _read_variable_data(self, raw_data):
 
-        """ Read the raw data and set the variable values. """
+        """ Read the raw data and set the variable values.
+
+        *raw_data* can be any object supporting the buffer protocol, e.g. a memory map.  The data of
+        a variable is a strided view on the raw data, thus the raw data is not copied.
+
+        """
+
+        if not self.binary:
+            return self._read_ascii_data(raw_data)
+
+        # points are stored row by row, complex values as (real, imaginary) pairs
+        if self.flags == 'real':
+            dtype = np.float64
+        elif self.flags == 'complex':
+            dtype = np.complex128
+        else:
+            raise NotImplementedError
+
+        count = self.number_of_variables*self.number_of_points
+        if count:
+            input_data = np.frombuffer(raw_data, count=count, dtype=dtype)
+        else:
+            input_data = np.zeros(0, dtype=dtype)
+        input_data = input_data.reshape((self.number_of_points, self.number_of_variables))
+        self._set_variable_data(input_data)
+
+    ##############################################
+
+    def _read_ascii_data(self, raw_data):
+
+        """Read the ASCII values and set the variable values.
+
+        The values are listed point by point, a point starts by its index followed by the values of
+        the variables, a complex value is written as *real,imaginary*.  The values are split in bulk
+        and converted by Numpy.
+
+        """
 
         if self.flags == 'real':
-            number_of_columns = self.number_of_variables
+            number_of_columns = 1 + self.number_of_variables
         elif self.flags == 'complex':
-            number_of_columns = 2*self.number_of_variables
+            raw_data = raw_data.replace(b',', b' ')
+            number_of_columns = 1 + 2*self.number_of_variables
         else:
             raise NotImplementedError
 
-        input_data = np.fromstring(raw_data, count=number_of_columns*self.number_of_points, dtype='f8')
-        input_data = input_data.reshape((self.number_of_points, number_of_columns))
-        input_data = input_data.transpose()
-        # np.savetxt('raw.txt', input_data)
+        if self.number_of_points is None:
+            tokens = raw_data.split()
+            self.number_of_points = len(tokens) // number_of_columns
+        count = self.number_of_points * number_of_columns
+        # the values can be followed by another plot
+        tokens = raw_data.split(None, count)[:count]
+        if len(tokens) < count:
+            raise NameError('Expected {} values instead of {}'.format(count, len(tokens)))
+
+        if count:
+            input_data = np.array(tokens).astype(np.float64)
+        else:
+            input_data = np.zeros(0, dtype=np.float64)
+        input_data = input_data.reshape((self.number_of_points, number_of_columns))[:, 1:]
         if self.flags == 'complex':
-            raw_data = input_data
-            input_data = np.array(raw_data[0::2], dtype='complex128')
-            input_data.imag = raw_data[1::2]
-        for variable in self.variables.values():
-            variable.data = input_data[variable.index]
+            input_data = np.ascontiguousarray(input_data).view(np.complex128)
+        self._set_variable_data(input_data)
+
+    ##############################################
+
+    def _set_variable_data(self, input_data):
+
+        """Set the variable values from the matrix of points, the columns are indexed by the variable
+        indexes.
+
+        """
+
+        self._select_variables()
+        columns = [variable.index for variable in self.variables.values()]
+        if self._selection is not None and self.memory_map is None:
+            # copy the selected columns, thus the raw data can be released
+            input_data = input_data[:, columns]
+            columns = range(len(columns))
+        self._data = input_data
+        self._column_of = {}
+        for column, (name, variable) in zip(columns, self.variables.items()):
+            self._column_of[name] = column
+            variable.data = input_data[:, column]
+
+    ##############################################
+
+    def iter_chunks(self, number_of_points=2**16):
+
+        """Iterate over the points by chunks of *number_of_points* and yield dictionaries of arrays
+        indexed by variable names.
+
+        The arrays are copies, thus for a memory-mapped raw file only the pages of the current
+        chunk are loaded in memory.
+
+        """
+
+        if number_of_points < 1:
+            raise ValueError('The number of points must be positive')
+        for start in range(0, self.number_of_points, number_of_points):
+            rows = self._data[start:start + number_of_points]
+            yield {name:np.array(rows[:, column]) for name, column in self._column_of.items()}
 
     ##############################################
 
     def nodes(self, to_float=False, abscissa=None):
 
-        return [variable.to_waveform(abscissa, to_float=to_float)
+        return [variable.to_waveform(abscissa, to_float=to_float, copy=self.copy_data)
                 for variable in self.variables.values()
                 if variable.is_voltage_node()]
 
@@ -317,7 +622,7 @@ class RawFileAbc:
 
     def branches(self, to_float=False, abscissa=None):
 
-        return [variable.to_waveform(abscissa, to_float=to_float)
+        return [variable.to_waveform(abscissa, to_float=to_float, copy=self.copy_data)
                 for variable in self.variables.values()
                 if variable.is_branch_current()]
 
@@ -325,7 +630,7 @@ class RawFileAbc:
 
     def internal_parameters(self, to_float=False, abscissa=None):
 
-        return [variable.to_waveform(abscissa, to_float=to_float)
+        return [variable.to_waveform(abscissa, to_float=to_float, copy=self.copy_data)
                 for variable in self.variables.values()
                 if variable.is_interval_parameter]
 
@@ -333,7 +638,7 @@ class RawFileAbc:
 
     def elements(self, abscissa=None):
 
-        return [variable.to_waveform(abscissa, to_float=True)
+        return [variable.to_waveform(abscissa, to_float=True, copy=self.copy_data)
                 for variable in self.variables.values()]
 
     ##############################################
@@ -381,7 +686,7 @@ class RawFileAbc:
 
     def _to_dc_analysis(self, sweep_variable):
 
-        sweep = sweep_variable.to_waveform()
+        sweep = sweep_variable.to_waveform(copy=self.copy_data)
         return DcAnalysis(
             simulation=self.simulation,
             sweep=sweep,
@@ -394,7 +699,7 @@ class RawFileAbc:
 
     def _to_ac_analysis(self):
 
-        frequency = self.variables['frequency'].to_waveform(to_real=True)
+        frequency = self.variables['frequency'].to_waveform(to_real=True, copy=self.copy_data)
         return AcAnalysis(
             simulation=self.simulation,
             frequency=frequency,
@@ -407,7 +712,7 @@ class RawFileAbc:
 
     def _to_transient_analysis(self):
 
-        time = self.variables['time'].to_waveform(to_real=True)
+        time = self.variables['time'].to_waveform(to_real=True, copy=self.copy_data)
         return TransientAnalysis(
             simulation=self.simulation,
             time=time,
@@ -415,3 +720,428 @@ class RawFileAbc:
             branches=self.branches(abscissa=time),
             internal_parameters=self.internal_parameters(),
         )
+
+####################################################################################################
+
+class RawFilePlot:
+
+    """This class stores the header of a plot in a raw file.
+
+    Public Attributes:
+
+      :attr:`index`
+        index of the plot in the file
+
+      :attr:`title`
+
+      :attr:`plot_name`
+
+      :attr:`flags`
+
+      :attr:`number_of_points`
+
+      :attr:`variables`
+        list of the variable names
+
+      :attr:`offset`
+        offset of the header in the file
+
+      :attr:`data_offset`
+        offset of the binary data in the file
+
+      :attr:`binary`
+        set if the data are in binary format, else ASCII
+
+      :attr:`data_size`
+        size of the data in bytes
+
+    """
+
+    ##############################################
+
+    def __init__(self, index, raw_file, offset, data_offset, data_size):
+
+        self.index = index
+        self.title = raw_file.title
+        self.plot_name = raw_file.plot_name
+        self.flags = raw_file.flags
+        self.number_of_points = raw_file.number_of_points
+        self.variables = list(raw_file.variables)
+        self.offset = offset
+        self.data_offset = data_offset
+        self.binary = raw_file.binary
+        self.data_size = data_size
+
+    ##############################################
+
+    def __repr__(self):
+        return 'plot[{0.index}]: {0.plot_name} {0.flags} {0.number_of_points} points @{0.offset}'.format(self)
+
+####################################################################################################
+
+class RawFileIndex:
+
+    """This class indexes the plots of a raw file, e.g. written by the *write* command of a control
+    loop, and loads them lazily.
+
+    The file is scanned once to read the headers, the binary data are skipped.  A plot is loaded
+    when it is accessed by its index, and the raw files are cached.
+
+    Example of usage::
+
+      plots = RawFile.index('output.raw', simulation=simulation)
+      for plot in plots:
+          print(plot.plot_name, plot.variables)
+      analysis = plots.to_analysis(-1)
+
+    *path* can be a path or a seekable binary file object, the latter must stay open.  The
+    *variables* selection applies to all the plots, see :class:`RawFileAbc`.
+
+    """
+
+    _logger = _module_logger.getChild('RawFileIndex')
+
+    # size of the block read to check for trailing blank data
+    _TAIL_SIZE = 4096
+
+    # the header of a plot starts with the title
+    TITLE_LINE = b'\nTitle:'
+
+    ##############################################
+
+    def __init__(self, raw_file_cls, path, memory_map=False, simulation=None, variables=None):
+
+        self._raw_file_cls = raw_file_cls
+        self._path = path
+        self._memory_map = memory_map
+        self._variables = variables
+        self._simulation = simulation
+        self._raw_files = {}
+        self._plots = self._scan()
+
+    ##############################################
+
+    def _open(self):
+        if hasattr(self._path, 'read'):
+            return self._path
+        else:
+            return open(self._path, 'rb')
+
+    def _close(self, fh):
+        if fh is not self._path:
+            fh.close()
+
+    ##############################################
+
+    def _scan(self):
+
+        plots = []
+        fh = self._open()
+        try:
+            if fh is self._path:
+                position = fh.tell()
+            else:
+                position = 0
+            fh.seek(0, os.SEEK_END)
+            size = fh.tell()
+            while position < size:
+                fh.seek(position)
+                tail = fh.read(self._TAIL_SIZE)
+                if len(tail) < self._TAIL_SIZE and not tail.strip():
+                    break
+                fh.seek(position)
+                raw_file, offset = self._raw_file_cls._read_plot_header(fh)
+                data_offset = position + offset
+                if raw_file.binary:
+                    data_size = raw_file.data_size
+                else:
+                    data_size = self._find_next_plot(fh, data_offset, size) - data_offset
+                plot = RawFilePlot(len(plots), raw_file, position, data_offset, data_size)
+                self._logger.debug(repr(plot))
+                end = plot.data_offset + plot.data_size
+                if end > size:
+                    raise NameError('Plot {} "{}" is truncated'.format(plot.index, plot.plot_name))
+                plots.append(plot)
+                position = end
+        finally:
+            self._close(fh)
+        return plots
+
+    ##############################################
+
+    def _find_next_plot(self, fh, position, size, chunk_size=2**16):
+
+        """Return the offset of the plot following the ASCII values at *position*, or the size of the
+        file.
+
+        """
+
+        fh.seek(position)
+        data = b''
+        while True:
+            chunk = fh.read(chunk_size)
+            if not chunk:
+                return size
+            # the title line can overlap two chunks
+            overlap = data[-len(self.TITLE_LINE):]
+            data = overlap + chunk
+            location = data.find(self.TITLE_LINE)
+            if location >= 0:
+                return position - len(overlap) + location + 1
+            position += len(chunk)
+
+    ##############################################
+
+    @property
+    def simulation(self):
+        return self._simulation
+
+    @simulation.setter
+    def simulation(self, value):
+        self._simulation = value
+
+    ##############################################
+
+    def __len__(self):
+        return len(self._plots)
+
+    def __iter__(self):
+        return iter(self._plots)
+
+    ##############################################
+
+    @property
+    def plots(self):
+        return list(self._plots)
+
+    @property
+    def plot_names(self):
+        return [plot.plot_name for plot in self._plots]
+
+    ##############################################
+
+    def __getitem__(self, index):
+
+        """Return the raw file of the plot at *index*."""
+
+        plot = self._plots[index]
+        raw_file = self._raw_files.get(plot.index)
+        if raw_file is None:
+            self._logger.info('Load {}'.format(plot))
+            fh = self._open()
+            try:
+                fh.seek(plot.offset)
+                if plot.binary:
+                    path = fh
+                else:
+                    # the size of the ASCII values is only known by the index, only read this plot
+                    path = io.BytesIO(fh.read(plot.data_offset + plot.data_size - plot.offset))
+                raw_file = self._raw_file_cls(path=path, memory_map=self._memory_map, variables=self._variables)
+            finally:
+                self._close(fh)
+            raw_file.simulation = self._simulation
+            self._raw_files[plot.index] = raw_file
+        return raw_file
+
+    ##############################################
+
+    def to_analysis(self, index):
+        """Return the analysis of the plot at *index*."""
+        return self[index].to_analysis()
+
+####################################################################################################
+
+class RawFileWriterAbc:
+
+    """This class writes analyses, or plots of arrays, in a binary raw file.
+
+    Several plots can be written in the same file, they can be read using :class:`RawFileIndex`.
+    The points are written by chunks of :attr:`CHUNK_SIZE` points from the arrays of the waveforms,
+    thus the data are not copied as a whole.
+
+    Example of usage::
+
+      with RawFileWriter('output.raw') as writer:
+          writer.write_analysis(transient_analysis)
+          writer.write_analysis(ac_analysis)
+
+    *path* can be a path or a binary file object, the latter is not closed by the writer.
+
+    The subclasses set the naming of the variables of the simulator.
+
+    """
+
+    _logger = _module_logger.getChild('RawFileWriterAbc')
+
+    LINE_SEPARATOR = '\n'
+
+    # number of points written at once
+    CHUNK_SIZE = 2**16
+
+    DEFAULT_TITLE = 'PySpice'
+
+    _plot_names = (
+        (OperatingPoint, 'Operating Point'),
+        (SensitivityAnalysis, 'Sensitivity Analysis'),
+        (DcAnalysis, 'DC transfer characteristic'),
+        (AcAnalysis, 'AC Analysis'),
+        (TransientAnalysis, 'Transient Analysis'),
+    )
+
+    # variable types indexed by unit names
+    _unit_to_type = {
+        'second': 'time',
+        'volt': 'voltage',
+        'ampere': 'current',
+        'frequency': 'frequency',
+    }
+
+    ##############################################
+
+    def __init__(self, path):
+
+        if hasattr(path, 'write'):
+            self._fh = path
+            self._close_file = False
+        else:
+            self._fh = open(path, 'wb')
+            self._close_file = True
+        self._number_of_plots = 0
+
+    ##############################################
+
+    @property
+    def number_of_plots(self):
+        return self._number_of_plots
+
+    ##############################################
+
+    def close(self):
+        if self._close_file:
+            self._fh.close()
+        else:
+            self._fh.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    ##############################################
+
+    @classmethod
+    def plot_name(cls, analysis):
+        for analysis_cls, plot_name in cls._plot_names:
+            if isinstance(analysis, analysis_cls):
+                return plot_name
+        raise NotImplementedError("Unsupported analysis {}".format(type(analysis).__name__))
+
+    ##############################################
+
+    @classmethod
+    def _variable_type(cls, waveform, default):
+        prefixed_unit = getattr(waveform, 'prefixed_unit', None)
+        if prefixed_unit is not None:
+            return cls._unit_to_type.get(prefixed_unit.unit.unit_name, default)
+        else:
+            return default
+
+    ##############################################
+
+    def _scale_variable(self, kind, waveform):
+        raise NotImplementedError
+
+    def _node_name(self, name):
+        raise NotImplementedError
+
+    def _branch_name(self, name):
+        raise NotImplementedError
+
+    def _element_name(self, name):
+        raise NotImplementedError
+
+    ##############################################
+
+    def _analysis_variables(self, analysis):
+
+        """Return the list of the (name, type, waveform) tuples of an analysis, the scale first."""
+
+        variables = []
+        if isinstance(analysis, TransientAnalysis):
+            variables.append(self._scale_variable('time', analysis.time))
+        elif isinstance(analysis, AcAnalysis):
+            variables.append(self._scale_variable('frequency', analysis.frequency))
+        elif isinstance(analysis, DcAnalysis):
+            variables.append(self._scale_variable('sweep', analysis.sweep))
+        for name, waveform in analysis.nodes.items():
+            variables.append((self._node_name(name), 'voltage', waveform))
+        for name, waveform in analysis.branches.items():
+            variables.append((self._branch_name(name), 'current', waveform))
+        for name, waveform in analysis.elements.items():
+            variables.append((self._element_name(name), self._variable_type(waveform, 'voltage'), waveform))
+        for name, waveform in analysis.internal_parameters.items():
+            variables.append((name, self._variable_type(waveform, 'voltage'), waveform))
+        return variables
+
+    ##############################################
+
+    def write_analysis(self, analysis, title=None, date=None):
+
+        """Write an analysis as a plot.  By default, the title is the title of the circuit."""
+
+        if title is None:
+            try:
+                title = analysis.simulation.circuit.title
+            except AttributeError:
+                pass
+        self.write_plot(self.plot_name(analysis), self._analysis_variables(analysis), title, date)
+
+    ##############################################
+
+    def write_plot(self, plot_name, variables, title=None, date=None):
+
+        """Write a plot, *variables* is a list of (name, type, array) tuples, the scale first.  The type
+        is *time*, *frequency*, *voltage* or *current*.
+
+        The plot is complex if an array is complex.
+
+        """
+
+        arrays = [np.asarray(array).reshape(-1) for name, type_, array in variables]
+        sizes = set(array.size for array in arrays)
+        if len(sizes) > 1:
+            raise ValueError('The variables must have the same number of points')
+        number_of_points = sizes.pop() if sizes else 0
+        if any(np.iscomplexobj(array) for array in arrays):
+            flags = 'complex'
+            dtype = np.complex128
+        else:
+            flags = 'real'
+            dtype = np.float64
+
+        lines = [
+            'Title: {}'.format(title or self.DEFAULT_TITLE),
+            'Date: {}'.format(date or time.asctime()),
+            'Plotname: {}'.format(plot_name),
+            'Flags: {}'.format(flags),
+            'No. Variables: {}'.format(len(variables)),
+            'No. Points: {}'.format(number_of_points),
+            'Variables:',
+        ]
+        for index, (name, type_, array) in enumerate(variables):
+            lines.append('\t{}\t{}\t{}'.format(index, name, type_))
+        lines.append('Binary:')
+        header = self.LINE_SEPARATOR.join(lines) + self.LINE_SEPARATOR
+        self._logger.debug(header)
+        self._fh.write(header.encode('utf-8'))
+
+        # points are stored row by row
+        for start in range(0, number_of_points, self.CHUNK_SIZE):
+            stop = min(start + self.CHUNK_SIZE, number_of_points)
+            chunk = np.empty((stop - start, len(arrays)), dtype=dtype)
+            for column, array in enumerate(arrays):
+                chunk[:, column] = array[start:stop]
+            self._fh.write(chunk.tobytes())
+
+        self._number_of_plots += 1
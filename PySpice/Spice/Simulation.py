@@ -23,6 +23,7 @@
 
 ####################################################################################################
 
+import copy
 import logging
 import os
 
@@ -31,6 +32,9 @@ import os
 from ..Config import ConfigInstall
 from ..Tools.StringTools import join_list, join_dict, str_spice
 from ..Unit import Unit, as_V, as_A, as_s, as_Hz, as_Degree, u_Degree
+from .Cache import SimulationCache
+from .MonteCarlo import MonteCarlo
+from .Sweep import ParameterSweep
 
 ####################################################################################################
 
@@ -547,6 +551,26 @@ class CircuitSimulation:
 
     ##############################################
 
+    def clone(self, circuit=None):
+
+        """Return a copy of the simulation for *circuit*, by default for the same circuit.
+
+        The settings are copied, but the simulator backend, e.g. a server, is shared.
+        """
+
+        simulation = copy.copy(self)
+        if circuit is not None:
+            simulation._circuit = circuit
+        simulation._options = dict(self._options)
+        simulation._measures = list(self._measures)
+        simulation._initial_condition = dict(self._initial_condition)
+        simulation._node_set = dict(self._node_set)
+        simulation._saved_nodes = set(self._saved_nodes)
+        simulation._analyses = dict(self._analyses)
+        return simulation
+
+    ##############################################
+
     def options(self, *args, **kwargs):
         for item in args:
             self._options[str(item)] = None
@@ -1086,9 +1110,15 @@ class CircuitSimulation:
     ##############################################
 
     def __str__(self):
+        return self._circuit.str(simulator=self.SIMULATOR) + self.str_simulation()
 
-        netlist = self._circuit.str(simulator=self.SIMULATOR)
-        netlist += self.str_options()
+    ##############################################
+
+    def str_simulation(self):
+
+        """Return the simulation part of the desk, i.e. what follows the circuit."""
+
+        netlist = self.str_options()
         if self._initial_condition:
             netlist += '.ic ' + join_dict(self._initial_condition) + os.linesep
         if self._node_set:
@@ -1096,7 +1126,7 @@ class CircuitSimulation:
 
         if self._saved_nodes:
             # Place 'all' first
-            saved_nodes = self._saved_nodes
+            saved_nodes = set(self._saved_nodes)
             if 'all' in saved_nodes:
                 all_str = 'all '
                 saved_nodes.remove('all')
@@ -1123,6 +1153,9 @@ class CircuitSimulator(CircuitSimulation):
 
     _logger = _module_logger.getChild('CircuitSimulator')
 
+    #: Set if the points of a sweep must be run sequentially on the simulator itself
+    SWEEP_IN_PLACE = False
+
     if ConfigInstall.OS.on_windows:
         DEFAULT_SIMULATOR = 'ngspice-shared'
     else:
@@ -1133,6 +1166,29 @@ class CircuitSimulator(CircuitSimulation):
 
     ##############################################
 
+    def __init__(self, circuit, **kwargs):
+
+        super().__init__(circuit, **kwargs)
+
+        cache = kwargs.get('cache', None)
+        if cache is not None and not isinstance(cache, SimulationCache):
+            cache = SimulationCache(cache)
+        self._cache = cache
+
+    ##############################################
+
+    @property
+    def cache(self):
+        """:class:`PySpice.Spice.Cache.SimulationCache` instance or :obj:`None`"""
+        return self._cache
+
+    @property
+    def simulator_version(self):
+        """Version of the simulator, :obj:`None` if it is unknown"""
+        return None
+
+    ##############################################
+
     @classmethod
     def factory(cls, circuit, *args, **kwargs):
 
@@ -1161,7 +1217,8 @@ class CircuitSimulator(CircuitSimulation):
             from .Xyce.Simulation import XyceCircuitSimulator
             sub_cls = XyceCircuitSimulator
             if simulator == 'xyce-parallel':
-                kwargs['parallel'] = True
+                # can be 'auto'
+                kwargs.setdefault('parallel', True)
 
         if sub_cls is not None:
             return sub_cls(circuit, *args, **kwargs)
@@ -1182,55 +1239,130 @@ class CircuitSimulator(CircuitSimulation):
         method = getattr(CircuitSimulation, analysis_method)
         method(self, *args, **_kwargs)
 
-        message = 'desk' + os.linesep + str(self)
-        if kwargs.get('log_desk', False):
-            self._logger.info(message)
-        else:
-            self._logger.debug(message)
+        # don't render the desk if it is not logged
+        level = logging.INFO if kwargs.get('log_desk', False) else logging.DEBUG
+        if self._logger.isEnabledFor(level):
+            self._logger.log(level, 'desk' + os.linesep + str(self))
+
+    ##############################################
+
+    def _run_analysis(self, analysis_method, *args, **kwargs):
+
+        """Run the analysis, or return it from the cache if the simulation was already done."""
+
+        if self._cache is None:
+            return self._run(analysis_method, *args, **kwargs)
+
+        # declare the analysis once to compute the key, then simulate it on a miss
+        CircuitSimulator._run(self, analysis_method, *args, **kwargs)
+        key, analysis = self._cache.lookup(self)
+        if analysis is not None:
+            self.reset_analysis()
+            return analysis
+        analysis = self._simulate()
+        self._cache.put(key, analysis)
+        return analysis
+
+    ##############################################
+
+    def _simulate(self):
+        """Run the simulation of the declared analysis and return the analysis."""
+        raise NotImplementedError
+
+    ##############################################
+
+    def prepare(self, analysis_method, *args, **kwargs):
+
+        """Return a copy of the simulator where the analysis *analysis_method*, e.g. ``'transient'``,
+        is declared but not run, see :func:`PySpice.Spice.Batch.simulate_many`.
+
+        The circuit is shared with the simulator and the netlist is only rendered when the
+        simulation is run.
+
+        """
+
+        simulation = self.clone()
+        CircuitSimulator._run(simulation, analysis_method, *args, **kwargs)
+        return simulation
+
+    ##############################################
+
+    def sweep(self, grid, analysis, *args, mode='product', max_workers=None, pool=None, **kwargs):
+
+        """Run the analysis *analysis*, e.g. ``'transient'``, for each point of a parameter grid and
+        return a :class:`PySpice.Spice.Sweep.SweepAnalysis` where the waveforms are stacked into
+        arrays having an axis per parameter, see :mod:`PySpice.Spice.Sweep`.
+
+        *grid* maps parameter keys like ``'R1.resistance'`` or ``'Dmod.IS'`` to lists of values,
+        *mode* is ``'product'`` or ``'zip'``.  *args* and *kwargs* are the analysis parameters.
+        For the shared library simulator, *pool* is a
+        :class:`PySpice.Spice.NgSpice.Shared.NgSpiceSharedPool` to run the points in parallel.
+
+        Example::
+
+            analysis = simulator.sweep({'R1.resistance': [1@u_kΩ, 2@u_kΩ]}, 'operating_point')
+
+        """
+
+        sweep = ParameterSweep(grid, mode)
+        return sweep.run(self, analysis, *args, max_workers=max_workers, pool=pool, **kwargs)
+
+    ##############################################
+
+    def monte_carlo(self, number_of_samples, analysis, *args, seed=None, max_workers=None, pool=None, **kwargs):
+
+        """Run the analysis *analysis* for *number_of_samples* random draws of the tolerances of
+        the circuit and return a :class:`PySpice.Spice.MonteCarlo.MonteCarloAnalysis`, see
+        :mod:`PySpice.Spice.MonteCarlo`.  *pool* is the same as for :meth:`sweep`.
+
+        """
+
+        monte_carlo = MonteCarlo(self, number_of_samples, seed)
+        return monte_carlo.run(analysis, *args, max_workers=max_workers, pool=pool, **kwargs)
 
     ##############################################
 
     def operating_point(self, *args, **kwargs):
-        return self._run('operating_point', *args, **kwargs)
+        return self._run_analysis('operating_point', *args, **kwargs)
 
     ##############################################
 
     def dc(self, *args, **kwargs):
-        return self._run('dc', *args, **kwargs)
+        return self._run_analysis('dc', *args, **kwargs)
 
     ##############################################
 
     def dc_sensitivity(self, *args, **kwargs):
-        return self._run('dc_sensitivity', *args, **kwargs)
+        return self._run_analysis('dc_sensitivity', *args, **kwargs)
 
     ##############################################
 
     def ac(self, *args, **kwargs):
-        return self._run('ac', *args, **kwargs)
+        return self._run_analysis('ac', *args, **kwargs)
 
     ##############################################
 
     def transient(self, *args, **kwargs):
-        return self._run('transient', *args, **kwargs)
+        return self._run_analysis('transient', *args, **kwargs)
 
     ##############################################
 
     def polezero(self, *args, **kwargs):
-        return self._run('polezero', *args, **kwargs)
+        return self._run_analysis('polezero', *args, **kwargs)
 
     ##############################################
 
     def noise(self, *args, **kwargs):
-        return self._run('noise', *args, **kwargs)
+        return self._run_analysis('noise', *args, **kwargs)
 
     ##############################################
 
     def distortion(self, *args, **kwargs):
-        return self._run('distortion', *args, **kwargs)
+        return self._run_analysis('distortion', *args, **kwargs)
 
     ##############################################
 
     def transfer_function(self, *args, **kwargs):
-        return self._run('transfer_function', *args, **kwargs)
+        return self._run_analysis('transfer_function', *args, **kwargs)
 
     tf = transfer_function   # shorcut
@@ -0,0 +1,387 @@
+####################################################################################################
+#
+# PySpice - A Spice Package for Python
+# Copyright (C) 2021 Fabrice Salvaire
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+####################################################################################################
+
+"""This module implements parameter sweeps of element and model parameters.
+
+A sweep is defined by a grid which maps parameter keys to lists of values.  A key is a string
+``'<element name>.<parameter>'`` for an element parameter, e.g. ``'R1.resistance'``, or ``'<model
+name>.<parameter>'`` for a model parameter, e.g. ``'Dmod.IS'``.  The grid is a Cartesian product
+of the lists, or the lists are zipped.
+
+Usage::
+
+    simulator = circuit.simulator()
+    analysis = simulator.sweep({'R1.resistance': [1@u_kΩ, 2@u_kΩ, 5@u_kΩ],
+                                'C1.capacitance': [1@u_uF, 10@u_uF]},
+                               'transient', step_time=1@u_us, end_time=1@u_ms)
+    analysis.out.shape  # (3, 2, number of time points)
+
+The points are run with the best strategy for the simulator: sequentially on the simulator itself
+for the shared library, which alters the loaded circuit, else in parallel using worker threads
+which spawn the simulator subprocesses.  The shared library runs the points in parallel when a
+:class:`PySpice.Spice.NgSpice.Shared.NgSpiceSharedPool` is given.
+
+"""
+
+####################################################################################################
+
+__all__ = ['ParameterSweep', 'SweepAnalysis']
+
+####################################################################################################
+
+from concurrent.futures import ThreadPoolExecutor
+import itertools
+import logging
+import os
+
+import numpy as np
+
+####################################################################################################
+
+from ..Unit.Unit import UnitValues
+
+####################################################################################################
+
+_module_logger = logging.getLogger(__name__)
+
+####################################################################################################
+
+class ParameterSweep:
+
+    """This class implements a parameter grid.
+
+    *mode* is ``'product'`` for a Cartesian product of the value lists, then the sweep has an axis
+    per parameter in the grid order, or ``'zip'`` to zip lists of the same length, then the sweep
+    has a single axis.
+
+    """
+
+    _logger = _module_logger.getChild('ParameterSweep')
+
+    MODES = ('product', 'zip')
+
+    ##############################################
+
+    def __init__(self, grid, mode='product'):
+
+        if mode not in self.MODES:
+            raise ValueError('Unknown sweep mode {}'.format(mode))
+        self._mode = mode
+        self._parameters = [str(key) for key in grid.keys()]
+        self._values = [list(values) for values in grid.values()]
+        if not self._parameters:
+            raise ValueError('Empty grid')
+        if mode == 'product':
+            self._shape = tuple(len(values) for values in self._values)
+        else:
+            lengths = set(len(values) for values in self._values)
+            if len(lengths) != 1:
+                raise ValueError('Zipped value lists must have the same length')
+            self._shape = (lengths.pop(),)
+
+    ##############################################
+
+    @property
+    def mode(self):
+        return self._mode
+
+    @property
+    def parameters(self):
+        return list(self._parameters)
+
+    @property
+    def shape(self):
+        return self._shape
+
+    def __len__(self):
+        return int(np.prod(self._shape))
+
+    def values(self, parameter):
+        """Return the list of values of a parameter."""
+        return list(self._values[self._parameters.index(parameter)])
+
+    ##############################################
+
+    def points(self):
+        """Return the list of points, a point is a tuple of values in the grid order."""
+        if self._mode == 'product':
+            return list(itertools.product(*self._values))
+        else:
+            return list(zip(*self._values))
+
+    ##############################################
+
+    @staticmethod
+    def _resolve(circuit, key):
+
+        """Return a pair of functions to get and set the parameter *key* of a circuit."""
+
+        name, _, attribute = key.rpartition('.')
+        if not name:
+            raise NameError("Invalid sweep parameter {}, expected <element or model>.<parameter>".format(key))
+        if name in circuit._elements:
+            element = circuit._elements[name]
+            element_class = type(element)
+            if not (attribute in element_class.positional_parameters or
+                    attribute in element_class.optional_parameters or
+                    attribute in element_class.spice_to_parameters):
+                raise NameError("Element {} doesn't have a parameter {}".format(name, attribute))
+            return (lambda: getattr(element, attribute),
+                    lambda value: setattr(element, attribute, value))
+        elif name in circuit._models:
+            model = circuit._models[name]
+            return (lambda: model[attribute],
+                    lambda value: model.__setitem__(attribute, value))
+        else:
+            raise NameError("Unknown element or model {}".format(name))
+
+    ##############################################
+
+    def apply(self, circuit, point):
+        """Set the values of a point on the circuit."""
+        for key, value in zip(self._parameters, point):
+            self._resolve(circuit, key)[1](value)
+
+    ##############################################
+
+    def run(self, simulator, analysis_method, *args, max_workers=None, pool=None, **kwargs):
+
+        """Run the analysis for each point and return a :class:`SweepAnalysis`.
+
+        If the simulator class sets :attr:`SWEEP_IN_PLACE`, the points are run sequentially by
+        altering the simulator circuit, which is restored at the end, excepted if a *pool* of
+        Ngspice shared instances is given: the points are then run in parallel on clones of the
+        circuit, using an instance of the pool for each point.  Else the points are run in parallel
+        using up to *max_workers* threads on clones of the circuit.
+
+        """
+
+        analyses = self.execute(simulator, analysis_method, *args, max_workers=max_workers, pool=pool, **kwargs)
+        return SweepAnalysis(self, analyses)
+
+    ##############################################
+
+    def execute(self, simulator, analysis_method, *args, max_workers=None, pool=None, **kwargs):
+        """Run the analysis for each point and return the list of analyses in the point order."""
+        points = self.points()
+        if pool is not None:
+            if not simulator.SWEEP_IN_PLACE:
+                raise ValueError('A pool is only supported by the ngspice-shared simulator')
+            return self._run_on_pool(simulator, points, analysis_method, args, kwargs, pool)
+        elif simulator.SWEEP_IN_PLACE:
+            return self._run_in_place(simulator, points, analysis_method, args, kwargs)
+        else:
+            return self._run_in_parallel(simulator, points, analysis_method, args, kwargs, max_workers)
+
+    ##############################################
+
+    def _run_in_place(self, simulator, points, analysis_method, args, kwargs):
+
+        circuit = simulator.circuit
+        accessors = [self._resolve(circuit, key) for key in self._parameters]
+        saved_values = [getter() for getter, setter in accessors]
+        analyses = []
+        try:
+            for point in points:
+                self._logger.debug('Run point {}'.format(point))
+                for (getter, setter), value in zip(accessors, point):
+                    setter(value)
+                analyses.append(getattr(simulator, analysis_method)(*args, **kwargs))
+        finally:
+            for (getter, setter), value in zip(accessors, saved_values):
+                setter(value)
+        return analyses
+
+    ##############################################
+
+    def _run_point(self, simulator, point, analysis_method, args, kwargs):
+        circuit = simulator.circuit.clone()
+        self.apply(circuit, point)
+        point_simulator = simulator.clone(circuit)
+        self._logger.debug('Run point {}'.format(point))
+        return getattr(point_simulator, analysis_method)(*args, **kwargs)
+
+    def _run_in_parallel(self, simulator, points, analysis_method, args, kwargs, max_workers):
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(self._run_point, simulator, point, analysis_method, args, kwargs)
+                       for point in points]
+            return [future.result() for future in futures]
+
+    ##############################################
+
+    def _run_point_on_pool(self, simulator, point, pool, analysis_method, args, kwargs):
+        circuit = simulator.circuit.clone()
+        self.apply(circuit, point)
+        with pool.instance() as ngspice_shared:
+            point_simulator = simulator.clone(circuit, ngspice_shared=ngspice_shared)
+            self._logger.debug('Run point {} on instance {}'.format(point, ngspice_shared.ngspice_id))
+            return getattr(point_simulator, analysis_method)(*args, **kwargs)
+
+    def _run_on_pool(self, simulator, points, analysis_method, args, kwargs, pool):
+        futures = [pool.executor.submit(self._run_point_on_pool, simulator, point, pool, analysis_method, args, kwargs)
+                   for point in points]
+        return [future.result() for future in futures]
+
+####################################################################################################
+
+class SweepAnalysis:
+
+    """This class stacks the analyses of a sweep.
+
+    The waveforms are stacked into Numpy arrays of shape ``sweep.shape + (number of points,)``.
+    If the number of points differs, e.g. for transient analyses with adaptive time steps, the
+    arrays are padded with NaN.  The abscissa, e.g. the time, is stacked the same way.
+
+    Waveforms are accessible like for an analysis, i.e. ``sweep_analysis.out`` or
+    ``sweep_analysis['out']``.
+
+    Public Attributes:
+
+      :attr:`sweep`
+        the :class:`ParameterSweep` instance
+
+      :attr:`analyses`
+        list of the analyses in the point order
+
+      :attr:`abscissa`
+        stacked abscissa or :obj:`None`
+
+      :attr:`nodes`, :attr:`branches`, :attr:`elements`, :attr:`internal_parameters`
+        dictionaries of stacked waveforms
+
+    """
+
+    ABSCISSA_ATTRIBUTES = ('time', 'frequency', 'sweep')
+
+    ##############################################
+
+    def __init__(self, sweep, analyses):
+
+        self._sweep = sweep
+        self._analyses = list(analyses)
+        shape = sweep.shape
+
+        self._abscissa = None
+        for attribute in self.ABSCISSA_ATTRIBUTES:
+            if all(isinstance(getattr(type(analysis), attribute, None), property)
+                   for analysis in self._analyses):
+                self._abscissa = self._stack(shape, [getattr(analysis, attribute) for analysis in self._analyses])
+                break
+
+        self._nodes = self._stack_dict(shape, 'nodes')
+        self._branches = self._stack_dict(shape, 'branches')
+        self._elements = self._stack_dict(shape, 'elements')
+        self._internal_parameters = self._stack_dict(shape, 'internal_parameters')
+
+    ##############################################
+
+    @staticmethod
+    def _to_array(waveform):
+        if isinstance(waveform, UnitValues):
+            # unit less waveforms don't have a scale
+            return waveform.as_ndarray(waveform.prefixed_unit is not None)
+        else:
+            return np.asarray(waveform)
+
+    ##############################################
+
+    @classmethod
+    def _stack(cls, shape, waveforms):
+
+        arrays = [None if waveform is None else np.atleast_1d(cls._to_array(waveform))
+                  for waveform in waveforms]
+        present = [array for array in arrays if array is not None]
+        length = max(array.size for array in present)
+        dtype = np.result_type(np.float64, *present)
+        stacked = np.full((len(arrays), length), np.nan, dtype=dtype)
+        for i, array in enumerate(arrays):
+            if array is not None:
+                stacked[i, :array.size] = array
+        return stacked.reshape(tuple(shape) + (length,))
+
+    ##############################################
+
+    def _stack_dict(self, shape, attribute):
+        dicts = [getattr(analysis, attribute) for analysis in self._analyses]
+        names = []
+        for waveforms in dicts:
+            for name in waveforms:
+                if name not in names:
+                    names.append(name)
+        return {name:self._stack(shape, [waveforms.get(name, None) for waveforms in dicts])
+                for name in names}
+
+    ##############################################
+
+    @property
+    def sweep(self):
+        return self._sweep
+
+    @property
+    def analyses(self):
+        return self._analyses
+
+    @property
+    def shape(self):
+        return self._sweep.shape
+
+    @property
+    def abscissa(self):
+        return self._abscissa
+
+    @property
+    def nodes(self):
+        return self._nodes
+
+    @property
+    def branches(self):
+        return self._branches
+
+    @property
+    def elements(self):
+        return self._elements
+
+    @property
+    def internal_parameters(self):
+        return self._internal_parameters
+
+    ##############################################
+
+    def __getitem__(self, name):
+        for waveforms in (self._nodes, self._branches, self._elements, self._internal_parameters):
+            if name in waveforms:
+                return waveforms[name]
+        name = name.lower()
+        for waveforms in (self._nodes, self._branches, self._elements, self._internal_parameters):
+            if name in waveforms:
+                return waveforms[name]
+        raise IndexError(name)
+
+    ##############################################
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        try:
+            return self.__getitem__(name)
+        except IndexError:
+            raise AttributeError(name)
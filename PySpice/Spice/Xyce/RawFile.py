@@ -22,7 +22,7 @@
 
 import os
 
-from ..RawFile import VariableAbc, RawFileAbc
+from ..RawFile import VariableAbc, RawFileAbc, RawFileWriterAbc
 
 ####################################################################################################
 
@@ -93,6 +93,9 @@ class RawFile(RawFileAbc):
       :attr:`flags`
         'real' or 'complex'
 
+      :attr:`memory_map`
+        the memory map of the raw data or :obj:`None`
+
       :attr:`number_of_points`
 
       :attr:`number_of_variables`
@@ -112,29 +115,49 @@ class RawFile(RawFileAbc):
 
     ##############################################
 
-    def __init__(self, output):
+    # see https://github.com/FabriceSalvaire/PySpice/issues/132
+    #   Xyce open the file in binary mode and print using: os << "Binary:" << std::endl;
+    #   endl is thus \n
+    BINARY_LINE = b'Binary:\n'
+    VALUES_LINE = b'Values:\n'
+
+    ##############################################
+
+    def __init__(self, output=None, path=None, memory_map=False, variables=None):
+
+        """The raw data is read from the bytes *output* or from *path*, a path or a binary file
+        object.
+
+        If *memory_map* is set, the file is memory-mapped and the data of the variables and of the
+        waveforms are read-only views on the memory map, thus the file is only read on demand.
+
+        *variables* selects the variables to load by names or patterns, see
+        :class:`PySpice.Spice.RawFile.RawFileAbc`.
 
-        raw_data = self._read_header(output)
+        """
+
+        self._set_selection(variables)
+        if path is not None:
+            raw_data = self._read_file(path, memory_map)
+        elif output is not None:
+            raw_data = self._read_output(output)
+        else:
+            raise ValueError('output or path is required')
         self._read_variable_data(raw_data)
         # self._to_analysis()
 
         self._simulation = None
 
-
     ##############################################
 
     def _read_header(self, output):
 
         """ Parse the header """
 
-        # see https://github.com/FabriceSalvaire/PySpice/issues/132
-        #   Xyce open the file in binary mode and print using: os << "Binary:" << std::endl;
-        #   endl is thus \n
-        binary_line = b'Binary:\n'
-        binary_location = output.find(binary_line)
-        if binary_location < 0:
+        locations = self._locate_data(output)
+        if locations is None:
             raise NameError('Cannot locate binary data')
-        raw_data_start = binary_location + len(binary_line)
+        binary_location, raw_data_start = locations
         self._logger.debug(os.linesep + output[:raw_data_start].decode('utf-8'))
         header_lines = output[:binary_location].splitlines()
         raw_data = output[raw_data_start:]
@@ -173,3 +196,34 @@ class RawFile(RawFileAbc):
             raise NotImplementedError
 
         return super()._to_dc_analysis(sweep_variable)
+
+####################################################################################################
+
+class RawFileWriter(RawFileWriterAbc):
+
+    """This class writes binary raw files as Xyce.
+
+    The variables are named in upper case, e.g. *V(OUT)* and *VINPUT#branch*.
+
+    """
+
+    _logger = _module_logger.getChild('RawFileWriter')
+
+    ##############################################
+
+    def _scale_variable(self, kind, waveform):
+        if kind == 'sweep':
+            return kind, self._variable_type(waveform, 'voltage'), waveform
+        else:
+            return kind, kind, waveform
+
+    ##############################################
+
+    def _node_name(self, name):
+        return 'V({})'.format(name.upper())
+
+    def _branch_name(self, name):
+        return '{}#branch'.format(name.upper())
+
+    def _element_name(self, name):
+        return name.upper()
@@ -27,11 +27,15 @@ output.
 
 import logging
 import os
+import shlex
 import shutil
 import subprocess
 import tempfile
+import weakref
 
 from PySpice.Config import ConfigInstall
+from ..AsyncServer import AsyncServerMixin
+from ..ProcessLimits import ProcessLimits
 from .RawFile import RawFile
 
 ####################################################################################################
@@ -53,6 +57,21 @@ class XyceServer:
 
     Default Xyce path is set in `XyceServer.XYCE_COMMAND`.
 
+    A parallel build of Xyce is run by the MPI launcher *mpi_command*, by default ``mpirun``, when
+    the number of processes passed to :meth:`__call__` is greater than one.
+
+    The deck and the raw file are written in a temporary directory created in *working_directory*,
+    by default the system temporary directory.  A tmpfs, e.g. ``/dev/shm``, avoids disk writes.
+
+    If *memory_map* is set, the raw file is memory-mapped and the waveforms are read-only views on
+    the file, thus multi-GB outputs are not loaded in memory.  The temporary directory is then
+    removed when the memory map is released, i.e. when the analysis and all the waveforms were
+    garbage collected.
+
+    The *timeout*, *cpu_time_limit* and *memory_limit* parameters limit the resources of the Xyce
+    process, see :mod:`PySpice.Spice.ProcessLimits`.  Under MPI, the CPU time and memory limits
+    apply to each process.
+
     """
 
     if ConfigInstall.OS.on_linux:
@@ -64,13 +83,62 @@ class XyceServer:
     else:
         raise NotImplementedError
 
+    MPI_COMMAND = 'mpirun'
+    # option of mpirun and mpiexec to set the number of processes
+    MPI_NUMBER_OF_PROCESSES_OPTION = '-np'
+
     _logger = _module_logger.getChild('XyceServer')
 
     ##############################################
 
+    # versions indexed by Xyce command
+    _versions = {}
+
+    ##############################################
+
     def __init__(self, **kwargs):
 
         self._xyce_command = kwargs.get('xyce_command') or self.XYCE_COMMAND
+        mpi_command = kwargs.get('mpi_command') or self.MPI_COMMAND
+        if isinstance(mpi_command, str):
+            mpi_command = shlex.split(mpi_command)
+        self._mpi_command = list(mpi_command)
+        self._working_directory = kwargs.get('working_directory', None)
+        self._memory_map = kwargs.get('memory_map', False)
+        self._limits = ProcessLimits.from_kwargs(kwargs)
+
+    ##############################################
+
+    @property
+    def limits(self):
+        return self._limits
+
+    ##############################################
+
+    @property
+    def version(self):
+
+        """Version string of Xyce, e.g. ``Xyce Release 7.2``, or :obj:`None` if it cannot be
+        determined.
+
+        """
+
+        command = self._xyce_command
+        if command not in XyceServer._versions:
+            version = None
+            try:
+                process = subprocess.run((command, '-v'),
+                                         stdin=subprocess.DEVNULL,
+                                         stdout=subprocess.PIPE,
+                                         stderr=subprocess.STDOUT,
+                                         timeout=30)
+                lines = process.stdout.decode('utf-8', errors='replace').strip().splitlines()
+                if lines:
+                    version = lines[0].strip()
+            except (OSError, subprocess.TimeoutExpired):
+                pass
+            XyceServer._versions[command] = version
+        return XyceServer._versions[command]
 
     ##############################################
 
@@ -103,38 +171,121 @@ class XyceServer:
 
     ##############################################
 
-    def __call__(self, spice_input):
+    def _command(self, input_filename, output_filename, number_of_processes):
+
+        command = [self._xyce_command, '-r', output_filename, input_filename]
+        if number_of_processes > 1:
+            command = self._mpi_command + [self.MPI_NUMBER_OF_PROCESSES_OPTION, str(number_of_processes)] + command
+        return command
+
+    ##############################################
 
-        """Run SPICE in server mode as a subprocess for the given input and return a
-        :obj:`PySpice.RawFile.RawFile` instance.
+    def __call__(self, spice_input, number_of_processes=1):
+
+        """Run Xyce as a subprocess for the given input and return a :obj:`PySpice.RawFile.RawFile`
+        instance.
+
+        If *number_of_processes* is greater than one, Xyce is run in parallel using MPI.
 
         """
 
+        if number_of_processes < 1:
+            raise ValueError('The number of processes must be positive')
+
         self._logger.debug('Start the xyce subprocess')
 
-        tmp_dir = tempfile.mkdtemp()
+        tmp_dir, input_filename, output_filename = self._write_input(spice_input)
+        raw_file = None
+        try:
+            command = self._command(input_filename, output_filename, number_of_processes)
+            self._logger.info('Run {}'.format(' '.join(command)))
+            process = subprocess.Popen(
+                self._limits.command(command),
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+            )
+            try:
+                stdout, stderr = process.communicate(timeout=self._limits.timeout)
+            except subprocess.TimeoutExpired:
+                self._logger.warning('Kill Xyce after {} s'.format(self._limits.timeout))
+                process.kill()
+                stdout, stderr = process.communicate()
+                raise self._limits.timeout_error(stdout)
+            self._limits.check_return_code(process.returncode, stdout)
+            raw_file = self._read_output(stdout, output_filename)
+        finally:
+            self._remove_working_directory(tmp_dir, raw_file)
+
+        return raw_file
+
+    ##############################################
+
+    def _write_input(self, spice_input):
+
+        """Create a temporary directory, write the deck and return the directory and the paths of the
+        deck and of the raw file.
+
+        """
+
+        tmp_dir = tempfile.mkdtemp(prefix='pyspice-xyce-', dir=self._working_directory)
         input_filename = os.path.join(tmp_dir, 'input.cir')
         output_filename = os.path.join(tmp_dir, 'output.raw')
         with open(input_filename, 'w') as f:
             f.write(str(spice_input))
+        return tmp_dir, input_filename, output_filename
 
-        command = (self._xyce_command, '-r', output_filename, input_filename)
-        self._logger.info('Run {}'.format(' '.join(command)))
-        process = subprocess.Popen(
-            command,
-            stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-        )
-        stdout, stderr = process.communicate()
+    ##############################################
 
+    def _read_output(self, stdout, output_filename):
         self._parse_stdout(stdout)
+        return RawFile(path=output_filename, memory_map=self._memory_map)
+
+    ##############################################
+
+    @staticmethod
+    def _remove_working_directory(tmp_dir, raw_file):
+        if raw_file is not None and raw_file.memory_map is not None:
+            # the views on the memory map keep a reference to it
+            weakref.finalize(raw_file.memory_map, shutil.rmtree, tmp_dir, ignore_errors=True)
+        else:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+####################################################################################################
+
+class AsyncXyceServer(AsyncServerMixin, XyceServer):
 
-        with open(output_filename, 'rb') as f:
-            output = f.read()
-        # self._logger.debug(output)
+    """This class runs Xyce using asyncio, see :mod:`PySpice.Spice.AsyncServer`.
+
+    Example of usage::
+
+      xyce_server = AsyncXyceServer(max_concurrency=4, timeout=3600)
+      raw_file = await xyce_server(spice_input)
+
+    """
+
+    _logger = _module_logger.getChild('AsyncXyceServer')
+
+    ##############################################
+
+    async def __call__(self, spice_input, number_of_processes=1, timeout=None):
+
+        """Run Xyce for the given input and return a :obj:`PySpice.RawFile.RawFile` instance.
+
+        *timeout* overrides the default timeout of the server.
+
+        """
 
-        raw_file = RawFile(output)
-        shutil.rmtree(tmp_dir)
+        if number_of_processes < 1:
+            raise ValueError('The number of processes must be positive')
+
+        tmp_dir, input_filename, output_filename = self._write_input(spice_input)
+        raw_file = None
+        try:
+            command = self._command(input_filename, output_filename, number_of_processes)
+            stdout, stderr = await self._communicate(command, timeout=timeout)
+            raw_file = self._read_output(stdout, output_filename)
+        finally:
+            self._remove_working_directory(tmp_dir, raw_file)
 
         return raw_file
@@ -24,6 +24,7 @@
 ####################################################################################################
 
 import logging
+import os
 
 ####################################################################################################
 
@@ -38,18 +39,77 @@ _module_logger = logging.getLogger(__name__)
 
 class XyceCircuitSimulator(CircuitSimulator):
 
+    """This class implements a simulator running Xyce as a subprocess.
+
+    The *parallel* parameter selects a serial run, :obj:`False`, a parallel run using MPI,
+    :obj:`True`, or lets the simulator choose from the size of the circuit, ``'auto'``.  A parallel
+    run uses *number_of_processes* processes, by default the number of CPUs, the MPI launcher is set
+    by *mpi_command*.
+
+    For ``'auto'``, a circuit is run in parallel if its number of elements and nodes, once the
+    subcircuits are expanded, is larger than :attr:`PARALLEL_SIZE_THRESHOLD`, using a process per
+    :attr:`SIZE_PER_PROCESS`.  The elements of the included files and libraries are not counted.
+
+    The *timeout*, *cpu_time_limit* and *memory_limit* parameters limit the resources of the Xyce
+    process, see :mod:`PySpice.Spice.ProcessLimits`.
+
+    """
+
     _logger = _module_logger.getChild('XyceCircuitSimulator')
 
     SIMULATOR = 'xyce'
 
+    PARALLEL_SIZE_THRESHOLD = 10000
+    SIZE_PER_PROCESS = 5000
+
     ##############################################
 
     def __init__(self, circuit, **kwargs):
 
         super().__init__(circuit, **kwargs)
 
-        xyce_command = kwargs.get('xyce_command', None)
-        self._xyce_server = XyceServer(xyce_command=xyce_command)
+        server_kwargs = {x:kwargs[x]
+                         for x in ('xyce_command', 'mpi_command', 'working_directory', 'memory_map',
+                                   'timeout', 'cpu_time_limit', 'memory_limit')
+                         if x in kwargs}
+        self._xyce_server = XyceServer(**server_kwargs)
+
+        parallel = kwargs.get('parallel', False)
+        if parallel not in (True, False, 'auto'):
+            raise ValueError("Invalid parallel value {}".format(parallel))
+        self._parallel = parallel
+        number_of_processes = kwargs.get('number_of_processes', None)
+        if number_of_processes is not None and number_of_processes < 1:
+            raise ValueError('The number of processes must be positive')
+        self._number_of_processes = number_of_processes
+
+    ##############################################
+
+    @property
+    def parallel(self):
+        return self._parallel
+
+    ##############################################
+
+    def number_of_processes(self):
+
+        """Return the number of Xyce processes to simulate the circuit."""
+
+        if not self._parallel:
+            return 1
+        maximum = self._number_of_processes or os.cpu_count() or 1
+        if self._parallel == 'auto':
+            size = sum(self.circuit.flat_size())
+            if size < self.PARALLEL_SIZE_THRESHOLD:
+                return 1
+            return max(1, min(maximum, size // self.SIZE_PER_PROCESS))
+        return maximum
+
+    ##############################################
+
+    @property
+    def simulator_version(self):
+        return self._xyce_server.version
 
     ##############################################
 
@@ -60,10 +120,16 @@ class XyceCircuitSimulator(CircuitSimulator):
     ##############################################
 
     def _run(self, analysis_method, *args, **kwargs):
-
         super()._run(analysis_method, *args, **kwargs)
+        return self._simulate()
+
+    ##############################################
+
+    def _simulate(self):
 
-        raw_file = self._xyce_server(spice_input=str(self))
+        number_of_processes = self.number_of_processes()
+        self._logger.debug('Run Xyce using {} processes'.format(number_of_processes))
+        raw_file = self._xyce_server(spice_input=str(self), number_of_processes=number_of_processes)
         self.reset_analysis()
         raw_file.simulation = self
 
@@ -74,4 +74,7 @@ else:
 
 setup_dict = dict(
     long_description=long_description,
+    # out-of-line cffi module for the Ngspice shared library, cf. PySpice.Spice.NgSpice.Shared
+    setup_requires=['cffi>=1.14'],
+    cffi_modules=['PySpice/Spice/NgSpice/api_build.py:ffibuilder'],
 )
@@ -137,6 +137,25 @@ class TestUnits(unittest.TestCase):
         self.assertEqual(waveform_mean.unit, _.unit)
         self.assertEqual(waveform_mean.power, _.power)
 
+    ##############################################
+
+    def test_view(self):
+
+        np_array = np.arange(10, dtype=np.float64)
+        np_array.flags.writeable = False
+        abscissa = np.arange(10)
+
+        waveform = WaveForm.from_unit_values('out', u_V(np_array), abscissa=abscissa, copy=False)
+        self.assertTrue(np.shares_memory(waveform, np_array))
+        self.assertFalse(waveform.flags.writeable)
+        self.assertEqual(waveform.name, 'out')
+        self.assertEqual(waveform.prefixed_unit, u_V(1).prefixed_unit)
+        self.assertIs(waveform.abscissa, abscissa)
+        self._test_unit_values(waveform, np_array)
+
+        waveform = WaveForm.from_array('out', np_array, copy=False)
+        self.assertTrue(np.shares_memory(waveform, np_array))
+
 ####################################################################################################
 
 if __name__ == '__main__':
@@ -0,0 +1,100 @@
+####################################################################################################
+#
+# PySpice - A Spice Package for Python
+# Copyright (C) 2021 Fabrice Salvaire
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+####################################################################################################
+
+"""This module implements a simulator which computes a voltage divider analytically, in order to
+test the features built on :class:`PySpice.Spice.Simulation.CircuitSimulator` without a simulator.
+
+The circuit returned by :func:`make_divider_simulator` has a 10 V source on the node *in* and the
+resistors *R1* from *in* to *out* and *R2* from *out* to the ground.  The operating point and the
+transient analyses are supported.  The transient analysis ends at *R1* / 1 kΩ seconds if it is
+earlier than the end time, thus the number of time points depends on *R1*.
+
+"""
+
+####################################################################################################
+
+import numpy as np
+
+####################################################################################################
+
+from PySpice.Probe.WaveForm import OperatingPoint, TransientAnalysis, WaveForm
+from PySpice.Spice.Netlist import Circuit
+from PySpice.Spice.Simulation import CircuitSimulator, TransientAnalysisParameters
+from PySpice.Unit import *
+
+####################################################################################################
+
+class DividerSimulator(CircuitSimulator):
+
+    """Compute the voltage divider analytically in place of a simulator.
+
+    The class attribute :attr:`number_of_runs` counts the simulations.
+    """
+
+    SIMULATOR = 'ngspice'
+
+    number_of_runs = 0
+
+    ##############################################
+
+    @property
+    def simulator_version(self):
+        return 'divider-1'
+
+    ##############################################
+
+    def _run(self, analysis_method, *args, **kwargs):
+        super()._run(analysis_method, *args, **kwargs)
+        return self._simulate()
+
+    ##############################################
+
+    def _simulate(self):
+
+        DividerSimulator.number_of_runs += 1
+        circuit = self.circuit
+        r1 = float(circuit.R1.resistance)
+        r2 = float(circuit.R2.resistance)
+        output = 10 * r2 / (r1 + r2)
+
+        for analysis_parameters in self.analysis_iter():
+            if isinstance(analysis_parameters, TransientAnalysisParameters):
+                step_time = float(analysis_parameters.step_time)
+                end_time = min(float(analysis_parameters.end_time), r1 / 1000)
+                number_of_points = int(round(end_time / step_time)) + 1
+                time = WaveForm.from_unit_values('time', u_s(np.arange(number_of_points) * step_time))
+                out = WaveForm.from_unit_values('out', u_V(np.full(number_of_points, output)), abscissa=time)
+                return TransientAnalysis(self, time=time, nodes=[out], branches=[], internal_parameters=[])
+
+        return OperatingPoint(self, nodes=[WaveForm.from_unit_values('out', u_V(np.array([output])))])
+
+####################################################################################################
+
+def make_divider_simulator(r1=1@u_kΩ, r2=1@u_kΩ, **kwargs):
+
+    """Return a :class:`DividerSimulator` for a new divider circuit, *kwargs* are passed to the
+    simulator.
+    """
+
+    circuit = Circuit('Divider')
+    circuit.V('input', 'in', circuit.gnd, 10@u_V)
+    circuit.R(1, 'in', 'out', r1)
+    circuit.R(2, 'out', circuit.gnd, r2)
+    return DividerSimulator(circuit, **kwargs)
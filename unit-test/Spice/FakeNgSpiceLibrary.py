@@ -0,0 +1,597 @@
+####################################################################################################
+#
+# PySpice - A Spice Package for Python
+# Copyright (C) 2021 Fabrice Salvaire
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+####################################################################################################
+
+
+"""This module implements a fake Ngspice shared library in Python, in order to test
+:mod:`PySpice.Spice.NgSpice.Shared` without Ngspice.
+
+The fake library provides the functions of the Ngspice API used by :class:`NgSpiceShared` and calls
+the callbacks given to ``ngSpice_Init`` like Ngspice does.  It only simulates a tiny subset of
+Ngspice: the nodes are found in the element lines, the voltage of a node is the value of the
+voltage source connecting it to the ground, else zero, and only the ``.op``, ``.tran`` and ``.ac``
+analyses are supported.  The AC analysis uses equally spaced frequencies and the complex voltage of
+a node is *v - jv*.  A subcircuit instance of an undefined subcircuit is reported as an error, like
+Ngspice does.
+
+The vector data stay alive when a plot is destroyed, so the zero-copy views are safe in the tests.
+
+The value of a source declared with the *external* keyword is queried at each time point of a
+transient analysis using the ``get_vsrc_data`` or ``get_isrc_data`` callback, and the
+``get_sync_data`` callback, if set, is called before each step and can change the time step.
+
+The transient analysis runs a time point per step and honours the breakpoints set by
+``ngSpice_SetBkpt`` as forced time points, and the ``stop when time >= t`` commands, like Ngspice.
+In particular a stop condition halts the simulation at each time point until it is deleted, and
+resuming a finished simulation starts a new run.
+
+"""
+
+####################################################################################################
+
+import re
+import threading
+
+import numpy as np
+
+####################################################################################################
+
+from PySpice.Spice.NgSpice.Shared import NgSpiceShared, ffi, _define_api
+from PySpice.Spice.NgSpice.SimulationType import SIMULATION_TYPE
+
+####################################################################################################
+
+VECTOR_TYPE = {name:i for i, name in enumerate(SIMULATION_TYPE['last'])}
+
+NUMBER_RE = re.compile(r'([+-]?(?:\d+\.?\d*|\.\d+)(?:e[+-]?\d+)?)(meg|[fpnumkgt])?', re.IGNORECASE)
+SCALE = {
+    None: 1,
+    'f': 1e-15,
+    'p': 1e-12,
+    'n': 1e-9,
+    'u': 1e-6,
+    'm': 1e-3,
+    'k': 1e3,
+    'meg': 1e6,
+    'g': 1e9,
+    't': 1e12,
+}
+
+def parse_number(string):
+    """Parse a Spice number, e.g. ``10us``."""
+    match = NUMBER_RE.match(string)
+    if match is None:
+        raise ValueError("Invalid number {}".format(string))
+    suffix = match.group(2)
+    if suffix is not None:
+        suffix = suffix.lower()
+    return float(match.group(1)) * SCALE[suffix]
+
+####################################################################################################
+
+class FakeVector:
+
+    """This class implements a growable vector of a plot."""
+
+    ##############################################
+
+    def __init__(self, name, type_, value=0, capacity=16, is_complex=False):
+        self.name = name
+        self.type = VECTOR_TYPE[type_]
+        self.value = value
+        self.is_complex = is_complex
+        self.length = 0
+        self._data = np.zeros(capacity, dtype=np.complex128 if is_complex else np.float64)
+        # Ngspice reallocates the vector memory, but we keep the previous buffers alive
+        self._buffers = [self._data]
+
+    ##############################################
+
+    @property
+    def data(self):
+        return self._data[:self.length]
+
+    ##############################################
+
+    def append(self, value):
+        if self.length == self._data.size:
+            data = np.zeros(2*self._data.size, dtype=self._data.dtype)
+            data[:self.length] = self._data
+            self._data = data
+            self._buffers.append(data)
+        self._data[self.length] = value
+        self.length += 1
+
+####################################################################################################
+
+class FakePlot:
+
+    ##############################################
+
+    def __init__(self, name, vectors):
+        self.name = name
+        self.vectors = {vector.name:vector for vector in vectors}
+
+    ##############################################
+
+    def append(self, scale=None):
+        for vector in self.vectors.values():
+            if vector.name in ('time', 'frequency'):
+                vector.append(scale)
+            else:
+                vector.append(vector.value)
+
+####################################################################################################
+
+class FakeTransient:
+
+    """This class implements the state of a transient analysis in progress."""
+
+    ##############################################
+
+    def __init__(self, plot, step_time, end_time):
+        self.plot = plot
+        self.step_time = step_time
+        self.end_time = end_time
+        self.delta_time = step_time
+        self.time = None
+
+    ##############################################
+
+    @property
+    def done(self):
+        return self.time is not None and self.time >= self.end_time
+
+    ##############################################
+
+    def next_time(self, breakpoints):
+        if self.time is None:
+            return 0.
+        # a breakpoint forces a time point
+        epsilon = self.step_time * 1e-9
+        time = min(self.time + self.delta_time, self.end_time)
+        forced_times = [_ for _ in breakpoints if _ > self.time + epsilon]
+        if forced_times:
+            forced_time = min(forced_times)
+            if forced_time <= time + epsilon:
+                time = forced_time
+        if self.end_time - time < epsilon:
+            time = self.end_time
+        return time
+
+####################################################################################################
+
+class FakeNgSpiceLibrary:
+
+    """This class implements the functions of the Ngspice API used by :class:`NgSpiceShared`.
+
+    Public Attributes:
+
+      :attr:`breakpoints`
+        times set by ``ngSpice_SetBkpt``
+
+      :attr:`commands`
+        list of the executed commands
+
+      :attr:`destroyed_plots`
+        the destroyed plots, which are kept alive
+
+      :attr:`external_values`
+        values of the external sources returned by the callbacks, indexed by source name
+
+      :attr:`number_of_runs`
+        number of runs, including the runs started by a resume command
+
+    """
+
+    NGSPICE_VERSION = 34
+
+    ##############################################
+
+    def __init__(self, library_path):
+
+        self.library_path = library_path
+        self.ngspice_id = None
+
+        self.breakpoints = []
+        self.commands = []
+        self.destroyed_plots = []
+        self.external_values = {}
+        self.number_of_runs = 0
+
+        self._analyses = None
+        self._circuit_lines = ()
+        self._nodes = ()
+        self._branches = ()
+        self._external_sources = ()
+        self._plots = []   # last plot first
+        self._plot_counters = {}
+        self._stop_times = []
+
+        self._pending_analyses = []
+        self._transient = None
+        self._in_progress = False
+        self._halt = threading.Event()
+        self._thread = None
+
+        self._keepalive = {}
+
+    ##############################################
+
+    def _print(self, stream, line):
+        message_c = ffi.new('char[]', '{} {}'.format(stream, line).encode('utf8'))
+        self._send_char(message_c, self.ngspice_id, self._user_data)
+
+    def _send_stat_message(self, message):
+        self._send_stat(ffi.new('char[]', message.encode('utf8')), self.ngspice_id, self._user_data)
+
+    def _bg_thread_running(self, not_running):
+        self._background_thread_running(not_running, self.ngspice_id, self._user_data)
+
+    ##############################################
+
+    def ngSpice_Init(self, send_char, send_stat, exit_, send_data, send_init_data, background_thread_running,
+                     user_data):
+        self._send_char = send_char
+        self._send_stat = send_stat
+        self._background_thread_running = background_thread_running
+        self._user_data = user_data
+        return 0
+
+    ##############################################
+
+    def ngSpice_Init_Sync(self, get_vsrc_data, get_isrc_data, get_sync_data, ngspice_id, user_data):
+        self._get_vsrc_data = get_vsrc_data
+        self._get_isrc_data = get_isrc_data
+        self._get_sync_data = get_sync_data
+        self.ngspice_id = ngspice_id[0]
+        return 0
+
+    ##############################################
+
+    def ngSpice_Circ(self, circuit_array):
+
+        lines = []
+        i = 0
+        while circuit_array[i] != ffi.NULL:
+            lines.append(ffi.string(circuit_array[i]).decode('utf8'))
+            i += 1
+
+        self._analyses = None
+        self._circuit_lines = lines
+        analyses = []
+        nodes = []
+        branches = []
+        sources = {}
+        external_sources = []
+        subcircuits = set()
+        # the first line is the title
+        for line in lines[1:]:
+            words = line.lower().split()
+            if not words or words[0].startswith('*'):
+                continue
+            keyword = words[0]
+            if keyword == '.subckt':
+                subcircuits.add(words[1])
+            elif keyword == '.op':
+                analyses.append(('op',))
+            elif keyword == '.tran':
+                analyses.append(('tran', parse_number(words[1]), parse_number(words[2])))
+            elif keyword == '.ac':
+                # .ac dec|oct|lin points start stop
+                analyses.append(('ac', int(words[2]), parse_number(words[3]), parse_number(words[4])))
+            elif keyword.startswith('.'):
+                continue
+            else:
+                if keyword.startswith('x') and words[-1] not in subcircuits:
+                    # Ngspice reports the errors of the circuit on stdout
+                    self._print('stdout', 'Error: unknown subckt: {}'.format(line))
+                    return 0
+                for node in words[1:3]:
+                    if node != '0' and node not in nodes:
+                        nodes.append(node)
+                if keyword.startswith('v'):
+                    branches.append(keyword + '#branch')
+                if keyword[0] in 'vi' and 'external' in words[3:]:
+                    # the node of an external voltage source is set to the value of the source
+                    node = words[1] if keyword.startswith('v') and words[2] == '0' else None
+                    external_sources.append((keyword, node))
+                elif keyword.startswith('v') and words[2] == '0':
+                    value = words[-1] if words[3] == 'dc' else words[3]
+                    sources[words[1]] = parse_number(value)
+
+        self._analyses = analyses
+        self._nodes = [(node, sources.get(node, 0)) for node in nodes]
+        self._branches = branches
+        self._external_sources = external_sources
+        self.external_values = {name:[] for name, node in external_sources}
+        self._in_progress = False
+        self._stop_times = []
+        return 0
+
+    ##############################################
+
+    def ngSpice_Command(self, command):
+
+        if not isinstance(command, bytes):
+            # NULL clears the history
+            return 0
+        command = command.decode('ascii')
+        self.commands.append(command)
+        name, _, arguments = command.partition(' ')
+        method = getattr(self, '_command_' + name, None)
+        if method is not None:
+            method(arguments.strip())
+        return 0
+
+    ##############################################
+
+    def ngSpice_AllPlots(self):
+        plot_names = [plot.name for plot in self._plots] + ['const']
+        return self._string_array('plots', plot_names)
+
+    ##############################################
+
+    def ngSpice_CurPlot(self):
+        plot_name = self._plots[0].name if self._plots else 'const'
+        plot_name_c = ffi.new('char[]', plot_name.encode('utf8'))
+        self._keepalive['current_plot'] = plot_name_c
+        return plot_name_c
+
+    ##############################################
+
+    def ngSpice_AllVecs(self, plot_name):
+        plot = self._find_plot(plot_name.decode('utf8'))
+        vector_names = list(plot.vectors) if plot is not None else []
+        return self._string_array('vectors', vector_names)
+
+    ##############################################
+
+    def ngGet_Vec_Info(self, name):
+        plot_name, _, vector_name = name.decode('utf8').rpartition('.')
+        if plot_name:
+            plot = self._find_plot(plot_name)
+        else:
+            plot = self._plots[0] if self._plots else None
+        vector = plot.vectors.get(vector_name) if plot is not None else None
+        if vector is None:
+            return ffi.NULL
+        vector_info = ffi.new('vector_info *')
+        name_c = ffi.new('char[]', vector.name.encode('utf8'))
+        vector_info.v_name = name_c
+        vector_info.v_type = vector.type
+        data_c = ffi.from_buffer(vector._data)
+        if vector.is_complex:
+            vector_info.v_flags = 2
+            vector_info.v_realdata = ffi.NULL
+            vector_info.v_compdata = ffi.cast('ngcomplex_t *', data_c)
+        else:
+            vector_info.v_flags = 1
+            vector_info.v_realdata = ffi.cast('double *', data_c)
+            vector_info.v_compdata = ffi.NULL
+        vector_info.v_length = vector.length
+        self._keepalive[name] = (vector_info, name_c)
+        return vector_info
+
+    ##############################################
+
+    def ngSpice_SetBkpt(self, time):
+        if self._analyses is None:
+            return False
+        self.breakpoints.append(time)
+        return True
+
+    ##############################################
+
+    def ngSpice_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    ##############################################
+
+    def _string_array(self, key, strings):
+        strings_c = [ffi.new('char[]', _.encode('utf8')) for _ in strings] + [ffi.NULL]
+        array = ffi.new('char *[]', strings_c)
+        self._keepalive[key] = (strings_c, array)
+        return array
+
+    ##############################################
+
+    def _find_plot(self, plot_name):
+        for plot in self._plots:
+            if plot.name == plot_name:
+                return plot
+        return None
+
+    ##############################################
+
+    def _new_plot(self, plot_type, scale=None, is_complex=False):
+        number = self._plot_counters.get(plot_type, 0) + 1
+        self._plot_counters[plot_type] = number
+        vectors = []
+        if scale is not None:
+            vectors.append(FakeVector(scale, scale, is_complex=is_complex))
+        for node, value in self._nodes:
+            if is_complex:
+                value = complex(value, -value)
+            vectors.append(FakeVector(node, 'voltage', value, is_complex=is_complex))
+        vectors += [FakeVector(branch, 'current', is_complex=is_complex) for branch in self._branches]
+        plot = FakePlot('{}{}'.format(plot_type, number), vectors)
+        self._plots.insert(0, plot)
+        return plot
+
+    ##############################################
+
+    def _start(self):
+        self.number_of_runs += 1
+        self._pending_analyses = list(self._analyses or ())
+        self._transient = None
+        self._in_progress = True
+
+    ##############################################
+
+    def _simulate(self):
+
+        """Run the pending analyses until they are done or the simulation is halted."""
+
+        while True:
+            if self._transient is None:
+                if not self._pending_analyses:
+                    self._in_progress = False
+                    return
+                analysis = self._pending_analyses.pop(0)
+                if analysis[0] == 'op':
+                    self._new_plot('op').append()
+                    continue
+                if analysis[0] == 'ac':
+                    _, number_of_points, start_frequency, stop_frequency = analysis
+                    plot = self._new_plot('ac', 'frequency', is_complex=True)
+                    for frequency in np.linspace(start_frequency, stop_frequency, number_of_points):
+                        plot.append(frequency)
+                    continue
+                _, step_time, end_time = analysis
+                self._transient = FakeTransient(self._new_plot('tran', 'time'), step_time, end_time)
+            if not self._run_transient():
+                return
+            self._transient = None
+
+    ##############################################
+
+    def _run_transient(self):
+
+        """Return :obj:`False` if the simulation is halted."""
+
+        transient = self._transient
+        while not transient.done:
+            if self._halt.is_set():
+                return False
+            if transient.time is not None and self._get_sync_data != ffi.NULL:
+                delta_time_c = ffi.new('double *', transient.step_time)
+                self._get_sync_data(transient.time, delta_time_c, transient.delta_time, 0,
+                                    self.ngspice_id, 0, self._user_data)
+                transient.delta_time = delta_time_c[0]
+            time = transient.next_time(self.breakpoints)
+            self._update_external_sources(transient.plot, time)
+            transient.plot.append(time)
+            transient.time = time
+            self._send_stat_message('tran: {:.1f}%'.format(100 * time / transient.end_time))
+            # Ngspice checks the stop conditions after each time point
+            if any(time >= _ for _ in self._stop_times):
+                self._print('stdout', 'Simulation interrupted at time {}'.format(time))
+                return False
+        return True
+
+    ##############################################
+
+    def _update_external_sources(self, plot, time):
+        for name, node in self._external_sources:
+            get_data = self._get_vsrc_data if name.startswith('v') else self._get_isrc_data
+            value_c = ffi.new('double *')
+            get_data(value_c, time, ffi.new('char[]', name.encode('utf8')), self.ngspice_id, self._user_data)
+            self.external_values[name].append(value_c[0])
+            if node is not None:
+                plot.vectors[node].value = value_c[0]
+
+    ##############################################
+
+    def _run_in_background(self, resume=False):
+        def target():
+            self._bg_thread_running(False)
+            if resume:
+                self._resume()
+            self._simulate()
+            self._bg_thread_running(True)
+        self._halt.clear()
+        self._thread = threading.Thread(target=target)
+        self._thread.start()
+
+    ##############################################
+
+    def _resume(self):
+        if not self._in_progress:
+            # like Ngspice, resume starts a new run when no simulation is in progress
+            self._print('stderr', 'Note: run starting')
+            self._start()
+
+    ##############################################
+
+    def _command_version(self, arguments):
+        self._print('stdout', '******')
+        self._print('stdout', '** ngspice-{} : Circuit level simulation program'.format(self.NGSPICE_VERSION))
+        self._print('stdout', '******')
+
+    def _command_listing(self, arguments):
+        for line in self._circuit_lines:
+            if line:
+                self._print('stdout', line)
+
+    def _command_run(self, arguments):
+        self._start()
+        self._halt.clear()
+        self._simulate()
+
+    def _command_bg_run(self, arguments):
+        self._start()
+        self._run_in_background()
+
+    def _command_resume(self, arguments):
+        self._resume()
+        self._halt.clear()
+        self._simulate()
+
+    def _command_bg_resume(self, arguments):
+        self._run_in_background(resume=True)
+
+    def _command_bg_halt(self, arguments):
+        self._halt.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _command_stop(self, arguments):
+        match = re.match(r'when\s+time\s*>=?\s*(\S+)$', arguments)
+        if match is None:
+            raise NotImplementedError("Unsupported stop command {}".format(arguments))
+        self._stop_times.append(float(match.group(1)))
+
+    def _command_delete(self, arguments):
+        if arguments == 'all':
+            self._stop_times = []
+
+    def _command_destroy(self, arguments):
+        for plot in self._plots:
+            if arguments in ('all', plot.name):
+                self.destroyed_plots.append(plot)
+        self._plots = [plot for plot in self._plots if arguments not in ('all', plot.name)]
+
+####################################################################################################
+
+class FakeNgSpiceShared(NgSpiceShared):
+
+    """This class implements a :class:`NgSpiceShared` using a :class:`FakeNgSpiceLibrary`."""
+
+    ##############################################
+
+    def _load_library(self, verbose):
+        _define_api()
+        self._ngspice_shared = FakeNgSpiceLibrary(self.library_path)
+
+    ##############################################
+
+    @property
+    def library(self):
+        return self._ngspice_shared
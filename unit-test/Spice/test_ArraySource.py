@@ -0,0 +1,69 @@
+####################################################################################################
+#
+# PySpice - A Spice Package for Python
+# Copyright (C) 2021 Fabrice Salvaire
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+####################################################################################################
+
+
+####################################################################################################
+
+import unittest
+
+import numpy as np
+from numpy import testing as np_test
+
+####################################################################################################
+
+from PySpice.Spice.NgSpice.ExternalSource import ArraySource
+
+####################################################################################################
+
+class TestArraySource(unittest.TestCase):
+
+    ##############################################
+
+    def test_interpolation(self):
+
+        time = [0., 1., 2., 3.]
+        values = [0., 10., 0., 5.]
+        source = ArraySource(time, values)
+        # forward, then backward as for a rejected time step
+        times = np.concatenate((np.linspace(-1, 4, 51), np.linspace(2.9, .1, 15)))
+        np_test.assert_almost_equal([source(x) for x in times], np.interp(times, time, values))
+
+    ##############################################
+
+    def test_period(self):
+
+        source = ArraySource([0., 1.], [0., 1.], period=1)
+        self.assertAlmostEqual(source(.25), .25)
+        self.assertAlmostEqual(source(3.25), .25)
+
+    ##############################################
+
+    def test_invalid(self):
+
+        with self.assertRaises(ValueError):
+            ArraySource([0., 1., 1.], [0., 1., 2.])
+        with self.assertRaises(ValueError):
+            ArraySource([0., 1.], [0.])
+
+####################################################################################################
+
+if __name__ == '__main__':
+
+    unittest.main()
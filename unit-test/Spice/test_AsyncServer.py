@@ -0,0 +1,191 @@
+####################################################################################################
+#
+# PySpice - A Spice Package for Python
+# Copyright (C) 2021 Fabrice Salvaire
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+####################################################################################################
+
+
+####################################################################################################
+
+import asyncio
+import os
+import stat
+import sys
+import tempfile
+import unittest
+
+####################################################################################################
+
+from PySpice.Config import ConfigInstall
+from PySpice.Spice.NgSpice.Server import AsyncSpiceServer
+from PySpice.Spice.Xyce.Server import AsyncXyceServer
+
+####################################################################################################
+
+# This script mimics ngspice in server mode, the value of the output node is read from the deck
+# and the pid is written in the file given by the deck.
+FAKE_NGSPICE = '''\
+import os, struct, sys, time
+deck = sys.stdin.read()
+parameters = dict(line[2:].split('=') for line in deck.splitlines() if line.startswith('* '))
+with open(parameters['pid'], 'w') as fh:
+    fh.write(str(os.getpid()))
+time.sleep(float(parameters.get('sleep', 0)))
+header = (
+    'Circuit: divider\\n\\n'
+    'Doing analysis at TEMP = 27.000000 and TNOM = 27.000000\\n\\n'
+    'Title: divider\\n'
+    'Date: Sat Oct 17 12:00:00  2026\\n'
+    'Plotname: Operating Point\\n'
+    'Flags: real\\n'
+    'No. Variables: 1\\n'
+    'No. Points: 0\\n'
+    'Variables:\\n'
+    'No. of Data Columns : 1\\n'
+    '\\t0\\tv(out)\\tvoltage\\n'
+    'Binary:\\n'
+)
+sys.stdout.buffer.write(header.encode('ascii') + struct.pack('d', float(parameters['out'])))
+sys.stderr.write('@@@ 1 1\\n')
+'''
+
+# This script mimics Xyce
+FAKE_XYCE = '''\
+import struct, sys
+header = (
+    'Title: divider\\n'
+    'Date: Sat Oct 17 12:00:00 2026\\n'
+    'Plotname: Operating Point\\n'
+    'Flags: real\\n'
+    'No. Variables: 1\\n'
+    'No. Points: 1\\n'
+    'Variables:\\n'
+    '\\t0\\tV(OUT)\\tvoltage\\n'
+    'Binary:\\n'
+)
+with open(sys.argv[2], 'wb') as fh:
+    fh.write(header.encode('ascii') + struct.pack('d', 5))
+'''
+
+skip_on_windows = unittest.skipIf(ConfigInstall.OS.on_windows, 'requires a shebang line')
+
+####################################################################################################
+
+@skip_on_windows
+class TestAsyncServer(unittest.TestCase):
+
+    ##############################################
+
+    def _write_script(self, name, source):
+        path = os.path.join(self._directory.name, name)
+        with open(path, 'w') as fh:
+            fh.write('#!' + sys.executable + os.linesep)
+            fh.write(source)
+        os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+        return path
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self._spice_command = self._write_script('ngspice', FAKE_NGSPICE)
+        self._xyce_command = self._write_script('Xyce', FAKE_XYCE)
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    ##############################################
+
+    def _deck(self, i, sleep=0):
+        pid_path = os.path.join(self._directory.name, 'pid{}'.format(i))
+        return '* out={}\n* sleep={}\n* pid={}\n'.format(i, sleep, pid_path), pid_path
+
+    def _assert_killed(self, pid_path):
+        with open(pid_path) as fh:
+            pid = int(fh.read())
+        with self.assertRaises(ProcessLookupError):
+            os.kill(pid, 0)
+
+    ##############################################
+
+    def test_concurrency(self):
+
+        spice_server = AsyncSpiceServer(spice_command=self._spice_command, max_concurrency=2)
+        maximum = 0
+
+        async def monitor():
+            nonlocal maximum
+            while True:
+                maximum = max(maximum, spice_server.number_of_running_processes)
+                await asyncio.sleep(.005)
+
+        async def main():
+            task = asyncio.create_task(monitor())
+            raw_files = await asyncio.gather(*(spice_server(self._deck(i, .1)[0]) for i in range(6)))
+            task.cancel()
+            return raw_files
+
+        # each event loop has its own semaphore
+        for _ in range(2):
+            maximum = 0
+            raw_files = asyncio.run(main())
+            self.assertEqual([float(raw_file.variables['v(out)'].data[0]) for raw_file in raw_files],
+                             list(range(6)))
+            self.assertEqual(maximum, 2)
+
+    ##############################################
+
+    def test_timeout(self):
+
+        spice_server = AsyncSpiceServer(spice_command=self._spice_command, timeout=.5)
+        deck, pid_path = self._deck(1, sleep=30)
+        with self.assertRaises(NameError):
+            asyncio.run(spice_server(deck))
+        self._assert_killed(pid_path)
+        self.assertEqual(spice_server.number_of_running_processes, 0)
+
+    ##############################################
+
+    def test_cancel(self):
+
+        spice_server = AsyncSpiceServer(spice_command=self._spice_command)
+        deck, pid_path = self._deck(1, sleep=30)
+
+        async def main():
+            task = asyncio.create_task(spice_server(deck))
+            # wait for the pid to be written
+            while not os.path.exists(pid_path) or not os.path.getsize(pid_path):
+                await asyncio.sleep(.01)
+            task.cancel()
+            await task
+
+        with self.assertRaises(asyncio.CancelledError):
+            asyncio.run(main())
+        self._assert_killed(pid_path)
+
+    ##############################################
+
+    def test_xyce(self):
+        working_directory = os.path.join(self._directory.name, 'work')
+        os.mkdir(working_directory)
+        xyce_server = AsyncXyceServer(xyce_command=self._xyce_command, working_directory=working_directory)
+        raw_file = asyncio.run(xyce_server('* deck\n'))
+        self.assertEqual(float(raw_file.variables['V(OUT)'].data[0]), 5)
+        self.assertEqual(os.listdir(working_directory), [])
+
+####################################################################################################
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+####################################################################################################
+#
+# PySpice - A Spice Package for Python
+# Copyright (C) 2021 Fabrice Salvaire
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+####################################################################################################
+
+
+####################################################################################################
+
+import os
+import stat
+import sys
+import tempfile
+import unittest
+
+####################################################################################################
+
+from PySpice.Config import ConfigInstall
+from PySpice.Spice.Batch import simulate_many
+from PySpice.Spice.Netlist import Circuit
+from PySpice.Unit import *
+
+from FakeNgSpiceLibrary import FakeNgSpiceShared
+
+####################################################################################################
+
+# This script mimics ngspice in server mode, the value of the output node is read from the deck.
+FAKE_NGSPICE = '''\
+import struct, sys
+deck = sys.stdin.read()
+if 'error' in deck:
+    sys.stdout.write('Error on line 2 :\\n  r1 in out\\n')
+    sys.exit(1)
+out = float(deck.split('* out=')[1].split()[0])
+header = (
+    'Circuit: divider\\n\\n'
+    'Doing analysis at TEMP = 27.000000 and TNOM = 27.000000\\n\\n'
+    'Title: divider\\n'
+    'Date: Sat Oct 17 12:00:00  2026\\n'
+    'Plotname: Operating Point\\n'
+    'Flags: real\\n'
+    'No. Variables: 2\\n'
+    'No. Points: 0\\n'
+    'Variables:\\n'
+    'No. of Data Columns : 2\\n'
+    '\\t0\\tv(out)\\tvoltage\\n'
+    '\\t1\\ti(vinput)\\tcurrent\\n'
+    'Binary:\\n'
+)
+sys.stdout.buffer.write(header.encode('ascii') + struct.pack('2d', out, -1e-3))
+sys.stderr.write('@@@ 1 1\\n')
+'''
+
+skip_on_windows = unittest.skipIf(ConfigInstall.OS.on_windows, 'requires a shebang line')
+
+####################################################################################################
+
+class TestBatch(unittest.TestCase):
+
+    ##############################################
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        command = os.path.join(self._directory.name, 'ngspice')
+        with open(command, 'w') as fh:
+            fh.write('#!' + sys.executable + os.linesep)
+            fh.write(FAKE_NGSPICE)
+        os.chmod(command, os.stat(command).st_mode | stat.S_IEXEC)
+        self._spice_command = command
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    ##############################################
+
+    def _make_simulation(self, raw_spice):
+        circuit = Circuit('Divider')
+        circuit.V('input', 'in', circuit.gnd, 10@u_V)
+        circuit.R(1, 'in', 'out', 1@u_kΩ)
+        circuit.R(2, 'out', circuit.gnd, 1@u_kΩ)
+        circuit.raw_spice = raw_spice
+        simulator = circuit.simulator(simulator='ngspice-subprocess', spice_command=self._spice_command)
+        return simulator.prepare('operating_point')
+
+    ##############################################
+
+    @skip_on_windows
+    def test_simulate_many(self):
+
+        simulations = [self._make_simulation('* out={}'.format(i)) for i in range(6)]
+        simulations.insert(3, self._make_simulation('* error'))
+        results = list(simulate_many(simulations, max_workers=3))
+
+        self.assertEqual(sorted(result.index for result in results), list(range(7)))
+        for result in results:
+            self.assertIs(result.simulation, simulations[result.index])
+            if result.index == 3:
+                self.assertTrue(result.failed)
+                self.assertIsInstance(result.error, NameError)
+            else:
+                self.assertFalse(result.failed)
+                self.assertIs(result.analysis.simulation, simulations[result.index])
+                out = result.index if result.index < 3 else result.index - 1
+                self.assertEqual(float(result.analysis.out[0]), out)
+
+    ##############################################
+
+    def test_shared_simulator(self):
+        circuit = Circuit('Divider')
+        circuit.V('input', 'in', circuit.gnd, 10@u_V)
+        circuit.R(1, 'in', circuit.gnd, 1@u_kΩ)
+        simulator = circuit.simulator(simulator='ngspice-shared',
+                                      ngspice_shared=FakeNgSpiceShared(ngspice_id=20))
+        simulation = simulator.prepare('operating_point')
+        with self.assertRaises(ValueError):
+            list(simulate_many([simulation]))
+
+    ##############################################
+
+    def test_empty(self):
+        self.assertEqual(list(simulate_many([])), [])
+
+####################################################################################################
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,185 @@
+####################################################################################################
+#
+# PySpice - A Spice Package for Python
+# Copyright (C) 2021 Fabrice Salvaire
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+####################################################################################################
+
+
+####################################################################################################
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+from numpy import testing as np_test
+
+####################################################################################################
+
+from PySpice.Probe.WaveForm import TransientAnalysis
+from PySpice.Spice.Cache import SimulationCache
+from PySpice.Spice.Simulation import CircuitSimulation
+from PySpice.Unit import *
+
+from DividerSimulator import DividerSimulator, make_divider_simulator
+
+####################################################################################################
+
+class TestSimulationCache(unittest.TestCase):
+
+    ##############################################
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self._cache = SimulationCache(self._directory.name)
+        DividerSimulator.number_of_runs = 0
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    ##############################################
+
+    def _make_simulator(self, r2=1@u_kΩ, cache=None):
+        return make_divider_simulator(r2=r2, cache=cache or self._cache)
+
+    def _transient(self, simulator):
+        return simulator.transient(step_time=1@u_ms, end_time=1@u_s)
+
+    ##############################################
+
+    def test_hit(self):
+
+        simulator = self._make_simulator()
+        analysis = self._transient(simulator)
+        cached_analysis = self._transient(self._make_simulator())
+        self.assertEqual(DividerSimulator.number_of_runs, 1)
+        self.assertEqual((self._cache.hits, self._cache.misses), (1, 1))
+        self.assertEqual(len(self._cache), 1)
+        np_test.assert_array_equal(np.asarray(cached_analysis.out), np.asarray(analysis.out))
+        np_test.assert_array_equal(np.asarray(cached_analysis.time), np.asarray(analysis.time))
+        self.assertIsInstance(cached_analysis, TransientAnalysis)
+
+        # the analysis parameters and the circuit are in the key
+        simulator.transient(step_time=2@u_ms, end_time=1@u_s)
+        self._transient(self._make_simulator(r2=2@u_kΩ))
+        self.assertEqual(DividerSimulator.number_of_runs, 3)
+
+        # a directory path is accepted
+        self._transient(self._make_simulator(cache=self._directory.name))
+        self.assertEqual(DividerSimulator.number_of_runs, 3)
+
+    ##############################################
+
+    def test_include(self):
+
+        include_path = os.path.join(self._directory.name, 'models.lib')
+        nested_path = os.path.join(self._directory.name, 'nested.lib')
+        with open(include_path, 'w') as fh:
+            fh.write('* models\n.include nested.lib\n')
+        with open(nested_path, 'w') as fh:
+            fh.write('.model D1 D (IS=1e-14)\n')
+
+        def run():
+            simulator = self._make_simulator()
+            simulator.circuit.include(include_path)
+            self._transient(simulator)
+
+        run()
+        run()
+        self.assertEqual(DividerSimulator.number_of_runs, 1)
+        with open(nested_path, 'w') as fh:
+            fh.write('.model D1 D (IS=2e-14)\n')
+        run()
+        self.assertEqual(DividerSimulator.number_of_runs, 2)
+
+    ##############################################
+
+    def test_lib_section(self):
+
+        # ".lib tt" opens a section of the library, it is not a path
+        library_path = os.path.join(self._directory.name, 'models.lib')
+        nested_path = os.path.join(self._directory.name, 'nested.lib')
+        section_path = os.path.join(self._directory.name, 'tt')
+        with open(library_path, 'w') as fh:
+            fh.write('.lib tt\n.lib nested.lib tt\n.endl tt\n')
+        for path in (nested_path, section_path):
+            with open(path, 'w') as fh:
+                fh.write('.lib tt\n.model D1 D (IS=1e-14)\n.endl tt\n')
+
+        def run():
+            simulator = self._make_simulator()
+            simulator.circuit.lib(library_path, 'tt')
+            self._transient(simulator)
+
+        run()
+        with open(section_path, 'w') as fh:
+            fh.write('* changed\n')
+        run()
+        self.assertEqual(DividerSimulator.number_of_runs, 1)
+        with open(nested_path, 'w') as fh:
+            fh.write('.lib tt\n.model D1 D (IS=2e-14)\n.endl tt\n')
+        run()
+        self.assertEqual(DividerSimulator.number_of_runs, 2)
+
+    ##############################################
+
+    def test_declarations(self):
+
+        # the analysis is declared once per lookup and simulated only on a miss
+        transient = CircuitSimulation.transient
+        with mock.patch.object(CircuitSimulation, 'transient', autospec=True, side_effect=transient) as declare:
+            self._transient(self._make_simulator())
+            self.assertEqual((declare.call_count, DividerSimulator.number_of_runs), (1, 1))
+            self._transient(self._make_simulator())
+            self.assertEqual((declare.call_count, DividerSimulator.number_of_runs), (2, 1))
+
+    ##############################################
+
+    def test_eviction(self):
+
+        self._transient(self._make_simulator())
+        entry_size = self._cache.size
+        cache = SimulationCache(self._directory.name, max_size=int(2.5*entry_size))
+        for i in range(2, 6):
+            self._transient(self._make_simulator(r2=i@u_kΩ, cache=cache))
+        self.assertEqual(len(cache), 2)
+        self.assertLessEqual(cache.size, cache.max_size)
+        # the most recent entries are kept
+        self._transient(self._make_simulator(r2=5@u_kΩ, cache=cache))
+        self.assertEqual(cache.hits, 1)
+        self._transient(self._make_simulator(cache=cache))
+        self.assertEqual(cache.hits, 1)
+
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+
+    ##############################################
+
+    def test_corrupted_entry(self):
+        simulator = self._make_simulator()
+        self._transient(simulator)
+        for filename in os.listdir(self._directory.name):
+            with open(os.path.join(self._directory.name, filename), 'wb') as fh:
+                fh.write(b'garbage')
+        self._transient(simulator)
+        self.assertEqual(DividerSimulator.number_of_runs, 2)
+
+####################################################################################################
+
+if __name__ == '__main__':
+    unittest.main()
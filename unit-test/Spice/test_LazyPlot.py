@@ -0,0 +1,127 @@
+####################################################################################################
+#
+# PySpice - A Spice Package for Python
+# Copyright (C) 2021 Fabrice Salvaire
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+####################################################################################################
+
+
+####################################################################################################
+
+import unittest
+
+import numpy as np
+from numpy import testing as np_test
+
+####################################################################################################
+
+from PySpice.Probe.WaveForm import NoiseAnalysis, TransientAnalysis
+from PySpice.Spice.NgSpice.Shared import LazyPlot, Plot, Vector
+from PySpice.Spice.NgSpice.SimulationType import SIMULATION_TYPE
+from PySpice.Tools.EnumFactory import EnumFactory
+from PySpice.Unit import u_s, u_V, u_A
+
+####################################################################################################
+
+class PlotMemory:
+
+    """Provide the vectors of a plot in place of the Ngspice shared library."""
+
+    def __init__(self, vectors):
+        self.simulation_type = EnumFactory('SimulationType', SIMULATION_TYPE['last'])
+        self._vectors = vectors
+        self.fetched = []
+
+    def type_to_unit(self, vector_type):
+        return {
+            self.simulation_type.time: u_s,
+            self.simulation_type.voltage: u_V,
+            self.simulation_type.current: u_A,
+        }.get(vector_type, None)
+
+    def _get_vector_type(self, plot_name, vector_name):
+        return getattr(self.simulation_type, self._vectors[vector_name][0])
+
+    def _get_vector(self, plot_name, vector_name, zero_copy=False):
+        self.fetched.append(vector_name)
+        vector_type, array = self._vectors[vector_name]
+        return Vector(self, vector_name, getattr(self.simulation_type, vector_type), np.array(array))
+
+####################################################################################################
+
+class TestLazyPlot(unittest.TestCase):
+
+    ##############################################
+
+    def test_transient(self):
+
+        memory = PlotMemory({
+            'time': ('time', [0., 1., 2.]),
+            'out': ('voltage', [1., 2., 3.]),
+            'in': ('voltage', [4., 5., 6.]),
+            'v1#branch': ('current', [7., 8., 9.]),
+            '@r1[i]': ('current', [1., 1., 1.]),
+        })
+        plot = LazyPlot(None, 'tran1', memory, ['time', 'out', 'in', 'v1#branch', '@r1[i]'])
+        analysis = plot.to_analysis()
+        self.assertIsInstance(analysis, TransientAnalysis)
+        self.assertEqual(memory.fetched, ['time'])
+
+        self.assertEqual(sorted(analysis.nodes), ['in', 'out'])
+        self.assertEqual(list(analysis.branches), ['v1'])
+        self.assertEqual(list(analysis.internal_parameters), ['@r1[i]'])
+        self.assertEqual(memory.fetched, ['time'])
+
+        np_test.assert_array_equal(analysis.out.as_ndarray(), [1., 2., 3.])
+        np_test.assert_array_equal(analysis.out.abscissa.as_ndarray(), [0., 1., 2.])
+        np_test.assert_array_equal(analysis['v1'].as_ndarray(), [7., 8., 9.])
+        analysis.out
+        self.assertEqual(memory.fetched, ['time', 'out', 'v1#branch'])
+
+    ##############################################
+
+    def test_vector_types(self):
+
+        # the vectors are classified by their types, like Plot
+        vectors = {
+            'inoise_spectrum': ('voltage_density', [1., 2.]),
+            'onoise_spectrum': ('voltage_density', [3., 4.]),
+            'frequency': ('frequency', [1., 10.]),
+            'V(out)': ('voltage', [5., 6.]),
+            'l1#branch': ('current', [7., 8.]),
+            '@q1[ic]': ('current', [9., 9.]),
+        }
+        memory = PlotMemory(vectors)
+        lazy_plot = LazyPlot(None, 'noise1', memory, list(vectors))
+        plot = Plot(None, 'noise1')
+        for name in vectors:
+            plot[name] = memory._get_vector('noise1', name)
+        memory.fetched = []
+
+        lazy_analysis = lazy_plot.to_analysis()
+        analysis = plot.to_analysis()
+        self.assertIsInstance(lazy_analysis, NoiseAnalysis)
+        for attribute in ('nodes', 'branches', 'internal_parameters'):
+            self.assertEqual(sorted(getattr(lazy_analysis, attribute)), sorted(getattr(analysis, attribute)))
+        self.assertEqual(list(lazy_analysis.nodes), ['out'])
+        self.assertEqual(list(lazy_analysis.branches), ['l1'])
+        self.assertEqual(memory.fetched, [])
+
+####################################################################################################
+
+if __name__ == '__main__':
+
+    unittest.main()
@@ -0,0 +1,156 @@
+####################################################################################################
+#
+# PySpice - A Spice Package for Python
+# Copyright (C) 2021 Fabrice Salvaire
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+####################################################################################################
+
+
+####################################################################################################
+
+from pathlib import Path
+import tempfile
+import unittest
+
+import numpy as np
+from numpy import testing as np_test
+
+####################################################################################################
+
+from PySpice.Spice.MonteCarlo import Gaussian, MonteCarlo, Uniform
+from PySpice.Spice.Netlist import Circuit
+from PySpice.Spice.NgSpice.Shared import NgSpiceSharedPool
+from PySpice.Unit import *
+
+from DividerSimulator import make_divider_simulator
+from FakeNgSpiceLibrary import FakeNgSpiceShared
+
+####################################################################################################
+
+class TestMonteCarlo(unittest.TestCase):
+
+    ##############################################
+
+    def _make_simulator(self):
+        simulator = make_divider_simulator()
+        self.diode_model = simulator.circuit.model('Diode', 'D', IS=1e-14)
+        return simulator
+
+    ##############################################
+
+    def test_draw(self):
+
+        simulator = self._make_simulator()
+        circuit = simulator.circuit
+        circuit.R1.set_tolerance('resistance', Gaussian(.03))
+        circuit.R2.set_tolerance('resistance', Uniform(.1))
+        self.diode_model.set_tolerance('IS', Uniform(1e-15, relative=False))
+
+        samples = MonteCarlo(simulator, 20000, seed=0).draw()
+        self.assertEqual(sorted(samples), ['Diode.IS', 'R1.resistance', 'R2.resistance'])
+        r1 = samples['R1.resistance']
+        self.assertEqual(r1.shape, (20000,))
+        self.assertAlmostEqual(r1.mean(), 1000, delta=1)
+        self.assertAlmostEqual(r1.std(), 10, delta=.5)
+        r2 = samples['R2.resistance']
+        self.assertTrue(np.all((r2 >= 900) & (r2 <= 1100)))
+        diode_is = samples['Diode.IS']
+        self.assertTrue(np.all((diode_is >= 9e-15) & (diode_is <= 11e-15)))
+
+        # the seed reproduces the draws
+        np_test.assert_array_equal(MonteCarlo(simulator, 20000, seed=0).draw()['R1.resistance'], r1)
+
+    ##############################################
+
+    def test_lot(self):
+
+        simulator = self._make_simulator()
+        circuit = simulator.circuit
+        circuit.R1.set_tolerance('resistance', Gaussian(.05, lot='array'))
+        circuit.R2.set_tolerance('resistance', Gaussian(.05, lot='array'))
+        samples = MonteCarlo(simulator, 100, seed=1).draw()
+        np_test.assert_allclose(samples['R1.resistance'], samples['R2.resistance'])
+
+        circuit.R2.set_tolerance('resistance', Gaussian(.05, lot='array'), Gaussian(.01))
+        samples = MonteCarlo(simulator, 100, seed=1).draw()
+        self.assertFalse(np.allclose(samples['R1.resistance'], samples['R2.resistance']))
+
+    ##############################################
+
+    def test_unknown_parameter(self):
+        simulator = self._make_simulator()
+        with self.assertRaises(NameError):
+            simulator.circuit.R1.set_tolerance('capacitance', Gaussian(.01))
+        with self.assertRaises(NameError):
+            MonteCarlo(simulator, 10).run('operating_point')
+
+    ##############################################
+
+    def test_run(self):
+
+        simulator = self._make_simulator()
+        circuit = simulator.circuit
+        circuit.R1.set_tolerance('resistance', Gaussian(.05, lot='array'))
+        circuit.R2.set_tolerance('resistance', Gaussian(.05, lot='array'))
+        analysis = simulator.monte_carlo(50, 'operating_point', seed=2, max_workers=4)
+        self.assertEqual(analysis.number_of_samples, 50)
+        self.assertEqual(analysis.out.shape, (50, 1))
+        # a ratio of correlated resistors doesn't vary
+        np_test.assert_allclose(analysis.mean('out'), [5])
+        np_test.assert_allclose(analysis.std('out'), [0], atol=1e-12)
+        self.assertEqual(analysis.yield_ratio(lambda sample: abs(np.asarray(sample.out)[0] - 5) < 1e-9), 1)
+
+        circuit.R2.set_tolerance('resistance', Uniform(.1))
+        analysis = simulator.monte_carlo(50, 'operating_point', seed=2)
+        statistics = analysis.statistics('out')
+        self.assertTrue(np.all(statistics['min'] < statistics['mean']))
+        self.assertTrue(np.all(statistics['mean'] < statistics['max']))
+        np_test.assert_allclose(analysis.percentile('out', 50), np.median(analysis.out, axis=0))
+        # the nominal values are restored
+        self.assertEqual(float(circuit.R1.resistance), 1000)
+
+    ##############################################
+
+    def test_run_on_pool(self):
+
+        circuit = Circuit('Divider')
+        circuit.V('input', 'in', circuit.gnd, 10@u_V)
+        circuit.R(1, 'in', circuit.gnd, 1@u_kΩ)
+        circuit.Vinput.set_tolerance('dc_value', Uniform(.1))
+
+        with tempfile.TemporaryDirectory() as path:
+            path = Path(path)
+            library_path = path.joinpath('libngspice.so')
+            library_path.write_bytes(b'fake library')
+            pool = NgSpiceSharedPool(2, cache_path=path, library_path=library_path,
+                                     ngspice_shared_cls=FakeNgSpiceShared)
+            try:
+                simulator = circuit.simulator(simulator='ngspice-shared', ngspice_shared=pool.acquire())
+                analysis = simulator.monte_carlo(10, 'operating_point', seed=0, pool=pool)
+            finally:
+                pool.shutdown()
+
+        # the fake library sets the node voltage to the source value
+        np_test.assert_allclose(analysis['in'][:, 0], analysis.samples['Vinput.dc_value'])
+        # the instance held by the simulator is checked out, thus the other one runs every sample
+        number_of_runs = [instance.library.number_of_runs for instance in pool]
+        self.assertEqual(sorted(number_of_runs), [0, 10])
+        self.assertEqual(float(circuit.Vinput.dc_value), 10)
+
+####################################################################################################
+
+if __name__ == '__main__':
+    unittest.main()
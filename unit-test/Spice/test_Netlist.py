@@ -206,6 +206,22 @@ R1 in out 9kOhm
         # circuit.parameter('pop', 'pp + p')
         self._test_spice_declaration(circuit, spice_declaration)
 
+    ##############################################
+
+    def test_flat_size(self):
+
+        circuit = Circuit('Divider chain')
+        circuit.subcircuit(VoltageDivider())
+        circuit.V('input', 'n0', circuit.gnd, 10@u_V)
+        for i in range(4):
+            circuit.X(i, 'VoltageDivider', 'n{}'.format(i), 'n{}'.format(i+1), circuit.gnd)
+        # an undefined subcircuit counts for an element
+        circuit.X('lib', 'LibraryCell', 'n4', circuit.gnd)
+        self.assertEqual(circuit.flat_size(), (1 + 4*2 + 1, 6))
+
+        circuit.X3.enabled = False
+        self.assertEqual(circuit.flat_size(), (1 + 3*2 + 1, 6))
+
 ####################################################################################################
 
 if __name__ == '__main__':
@@ -0,0 +1,537 @@
+####################################################################################################
+#
+# PySpice - A Spice Package for Python
+# Copyright (C) 2021 Fabrice Salvaire
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+####################################################################################################
+
+
+####################################################################################################
+
+from pathlib import Path
+import asyncio
+import gc
+import io
+import logging
+import os
+import subprocess
+import sys
+import threading
+import unittest
+
+import numpy as np
+from numpy import testing as np_test
+
+####################################################################################################
+
+from PySpice.Spice.Netlist import Circuit
+from PySpice.Spice.NgSpice.OutputSink import DropSink, FileSink, RingBufferSink
+from PySpice.Spice.NgSpice.Shared import NgSpiceCircuitError
+from PySpice.Unit import *
+
+from FakeNgSpiceLibrary import FakeNgSpiceShared
+
+####################################################################################################
+
+TRANSIENT_DESK = '''.title test
+V1 input 0 1V
+R1 input 0 1kOhm
+.tran 1us 10us
+.end
+'''
+
+AC_DESK = '''.title test
+V1 input 0 2V
+R1 input 0 1kOhm
+.ac lin 5 1kHz 5kHz
+.end
+'''
+
+# The cffi module is selected at import time, thus the API tests run in a new interpreter
+
+EXTERNAL_DESK = '''.title test
+Vinput input 0 dc 0 external
+Iload 0 load dc 0 external
+R1 input 0 1kOhm
+R2 load 0 1kOhm
+.tran 100us 1ms
+.end
+'''
+
+PREBUILT_API_SCRIPT = '''
+import importlib.util
+import sys
+import tempfile
+
+from PySpice.Spice.NgSpice import api_build
+
+tmp_directory = tempfile.mkdtemp()
+path = api_build.ffibuilder.compile(tmpdir=tmp_directory)
+spec = importlib.util.spec_from_file_location(api_build.MODULE_NAME, path)
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+sys.modules[api_build.MODULE_NAME] = module
+
+from PySpice.Spice.NgSpice import Shared
+assert Shared.ffi is module.ffi
+assert Shared._ffi_api_defined
+'''
+
+INLINE_API_SCRIPT = '''
+import sys
+
+# the module is not available
+sys.modules['PySpice.Spice.NgSpice._ngspice_cffi'] = None
+
+from PySpice.Spice.NgSpice import Shared
+assert not Shared._ffi_api_defined
+Shared._define_api()
+Shared._define_api()
+assert Shared._ffi_api_defined
+'''
+
+FAKE_SIMULATION_SCRIPT = '''
+from FakeNgSpiceLibrary import FakeNgSpiceShared
+ngspice_shared = FakeNgSpiceShared(ngspice_id=1)
+assert ngspice_shared.ngspice_version == 34
+ngspice_shared.load_circuit({!r})
+ngspice_shared.run()
+analysis = ngspice_shared.plot(None, ngspice_shared.last_plot).to_analysis()
+assert len(analysis.time) == 11
+'''
+
+####################################################################################################
+
+class StatNgSpiceShared(FakeNgSpiceShared):
+
+    def __init__(self, *args, **kwargs):
+        self.stat_messages_received = []
+        super().__init__(*args, **kwargs)
+
+    def send_stat(self, message, ngspice_id):
+        self.stat_messages_received.append(message)
+        return 0
+
+####################################################################################################
+
+class ExternalNgSpiceShared(FakeNgSpiceShared):
+
+    def __init__(self, *args, **kwargs):
+        self.vsrc_calls = []
+        self.sync_calls = []
+        super().__init__(*args, **kwargs)
+
+    def get_vsrc_data(self, voltage, time, node, ngspice_id):
+        self.vsrc_calls.append((time, node))
+        voltage[0] = -1
+        return 0
+
+    def get_sync_data(self, time, delta_time, old_delta_time, redo_step, ngspice_id, location):
+        self.sync_calls.append((time, delta_time, old_delta_time, redo_step, ngspice_id, location))
+        return delta_time / 2
+
+####################################################################################################
+
+class TestNgSpiceSharedAsync(unittest.TestCase):
+
+    ##############################################
+
+    def test_run_async(self):
+
+        ngspice_shared = StatNgSpiceShared(ngspice_id=1)
+        ngspice_shared.load_circuit(TRANSIENT_DESK)
+
+        async def simulate():
+            task = asyncio.create_task(ngspice_shared.run_async())
+            messages = [message async for message in ngspice_shared.stat_messages()]
+            await task
+            return messages
+
+        messages = asyncio.run(simulate())
+        self.assertEqual(len(messages), 11)
+        self.assertEqual(messages[-1], 'tran: 100.0%')
+        self.assertEqual(ngspice_shared.stat_messages_received, messages)
+        self.assertFalse(ngspice_shared.is_running)
+        self.assertTrue(ngspice_shared.wait(timeout=0))
+        self.assertEqual(ngspice_shared.library.commands[-1], 'bg_run')
+
+        analysis = ngspice_shared.plot(None, ngspice_shared.last_plot).to_analysis()
+        np_test.assert_allclose(analysis.time.as_ndarray(), np.arange(11) * 1e-6)
+
+    ##############################################
+
+    def test_concurrent_waiters(self):
+
+        ngspice_shared = FakeNgSpiceShared(ngspice_id=2)
+        ngspice_shared.load_circuit(TRANSIENT_DESK)
+
+        async def simulate():
+            # each iterator receives the messages
+            messages = []
+            async def collect():
+                async for message in ngspice_shared.stat_messages():
+                    messages.append(message)
+            collectors = [asyncio.create_task(collect()) for _ in range(2)]
+            await asyncio.sleep(0)
+            await ngspice_shared.run_async()
+            await asyncio.gather(*collectors)
+            return messages
+
+        messages = asyncio.run(simulate())
+        self.assertEqual(len(messages), 2*11)
+        self.assertEqual(ngspice_shared.library.number_of_runs, 1)
+
+####################################################################################################
+
+class TestApi(unittest.TestCase):
+
+    ##############################################
+
+    def _run_script(self, script):
+        import PySpice
+        paths = [str(Path(PySpice.__file__).parents[1]), str(Path(__file__).parent)]
+        if 'PYTHONPATH' in os.environ:
+            paths.append(os.environ['PYTHONPATH'])
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(paths))
+        script += FAKE_SIMULATION_SCRIPT.format(TRANSIENT_DESK)
+        process = subprocess.run([sys.executable, '-c', script], env=env,
+                                 stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        self.assertEqual(process.returncode, 0, process.stdout.decode('utf8', errors='replace'))
+
+    ##############################################
+
+    def test_prebuilt_api(self):
+        self._run_script(PREBUILT_API_SCRIPT)
+
+    ##############################################
+
+    def test_inline_api(self):
+        self._run_script(INLINE_API_SCRIPT)
+
+####################################################################################################
+
+class TestOutput(unittest.TestCase):
+
+    ##############################################
+
+    def test_capture(self):
+
+        sink = DropSink()
+        ngspice_shared = FakeNgSpiceShared(ngspice_id=6, output_sink=sink)
+        self.assertEqual(ngspice_shared.ngspice_version, 34)
+        output = ngspice_shared.exec_command('version -f', capture=True)
+        self.assertIn('** ngspice-34', output)
+        self.assertIs(ngspice_shared.output_sink, sink)
+        self.assertEqual(ngspice_shared.exec_command('version -f'), '')
+
+    ##############################################
+
+    def test_query_capture(self):
+
+        # a query command returns the whole output whatever the output sink
+        ngspice_shared = FakeNgSpiceShared(ngspice_id=38, output_sink=RingBufferSink(1))
+        ngspice_shared.load_circuit(TRANSIENT_DESK)
+        listing = ngspice_shared.listing().splitlines()
+        self.assertEqual(listing, ['.title test', 'V1 input 0 1V', 'R1 input 0 1kOhm', '.tran 1us 10us', '.end'])
+        self.assertEqual(ngspice_shared.exec_command('listing'), '.end')
+
+    ##############################################
+
+    def test_capture_concurrent_output(self):
+
+        # the lines written by another thread during a captured command reach the output sink
+        file = io.BytesIO()
+        ngspice_shared = FakeNgSpiceShared(ngspice_id=7, output_sink=FileSink(file))
+        number_of_lines = 1000
+        def write():
+            for i in range(number_of_lines):
+                ngspice_shared.library._print('stdout', 'background {}'.format(i))
+        thread = threading.Thread(target=write)
+        thread.start()
+        while thread.is_alive():
+            ngspice_shared.exec_command('version -f', capture=True)
+        thread.join()
+        lines = [line for line in file.getvalue().splitlines() if line.startswith(b'stdout background')]
+        self.assertEqual(len(lines), number_of_lines)
+
+    ##############################################
+
+    def test_circuit_error(self):
+
+        ngspice_shared = FakeNgSpiceShared(ngspice_id=8, output_sink=DropSink())
+        # the PySpice loggers can be disabled by the logging setup of other tests
+        ngspice_shared._logger = logging.getLogger('test_NgSpiceShared.circuit_error')
+        desk = TRANSIENT_DESK.replace('.tran', 'X1 input 0 undefined\n.tran')
+        with self.assertLogs(ngspice_shared._logger, level='ERROR') as logs:
+            with self.assertRaises(NgSpiceCircuitError):
+                ngspice_shared.load_circuit(desk)
+        self.assertIn('unknown subckt', logs.output[0])
+
+####################################################################################################
+
+class TestRunChunked(unittest.TestCase):
+
+    ##############################################
+
+    def _check_commands(self, commands):
+        # the stop condition is deleted before to resume
+        for i, command in enumerate(commands):
+            if command == 'bg_resume':
+                self.assertEqual(commands[i-2], 'delete all')
+                self.assertTrue(commands[i-1].startswith('stop when time >= '))
+        self.assertEqual(commands[-1], 'delete all')
+
+    ##############################################
+
+    def test_run_chunked(self):
+
+        ngspice_shared = FakeNgSpiceShared(ngspice_id=3)
+        ngspice_shared.load_circuit(TRANSIENT_DESK)
+        chunks = list(ngspice_shared.run_chunked(3e-6, end_time=10e-6))
+
+        self.assertEqual([chunk['time'].size for chunk in chunks], [4, 3, 3, 1])
+        time = np.concatenate([chunk['time'] for chunk in chunks])
+        np_test.assert_allclose(time, np.arange(11) * 1e-6)
+        self.assertEqual(sorted(chunks[0]), ['input', 'time', 'v1#branch'])
+        np_test.assert_array_equal(np.concatenate([chunk['input'] for chunk in chunks]), np.ones(11))
+
+        library = ngspice_shared.library
+        np_test.assert_allclose(library.breakpoints, (3e-6, 6e-6, 9e-6, 12e-6))
+        self.assertEqual(library.number_of_runs, 1)
+        self._check_commands(library.commands)
+
+    ##############################################
+
+    def test_end_on_chunk(self):
+
+        # the end of the simulation coincides with the end of the last chunk
+        circuit = Circuit('test')
+        circuit.V(1, 'input', circuit.gnd, 1@u_V)
+        circuit.R(1, 'input', circuit.gnd, 1@u_kΩ)
+        ngspice_shared = FakeNgSpiceShared(ngspice_id=4)
+        simulator = circuit.simulator(simulator='ngspice-shared', ngspice_shared=ngspice_shared)
+        chunks = list(simulator.transient_chunked(5@u_us, step_time=1@u_us, end_time=10@u_us))
+
+        self.assertEqual([chunk['time'].size for chunk in chunks], [6, 5])
+        self.assertAlmostEqual(chunks[-1]['time'][-1], 10e-6)
+        library = ngspice_shared.library
+        self.assertEqual(library.number_of_runs, 1)
+        self.assertEqual(library.commands.count('bg_resume'), 1)
+        self._check_commands(library.commands)
+
+    ##############################################
+
+    def test_end_on_chunk_without_end_time(self):
+
+        # resume starts a new run which is discarded
+        ngspice_shared = FakeNgSpiceShared(ngspice_id=5)
+        ngspice_shared.load_circuit(TRANSIENT_DESK)
+        chunks = list(ngspice_shared.run_chunked(5e-6))
+
+        self.assertEqual([chunk['time'].size for chunk in chunks], [6, 5])
+        self.assertEqual(ngspice_shared.library.number_of_runs, 2)
+        self.assertEqual(ngspice_shared.plot_names, ['tran1', 'const'])
+
+####################################################################################################
+
+class TestZeroCopy(unittest.TestCase):
+
+    ##############################################
+
+    def _simulate(self, desk, ngspice_id):
+        ngspice_shared = FakeNgSpiceShared(ngspice_id=ngspice_id)
+        ngspice_shared._logger = logging.getLogger('test_NgSpiceShared.zero_copy')
+        ngspice_shared.load_circuit(desk)
+        ngspice_shared.run()
+        return ngspice_shared, ngspice_shared.last_plot
+
+    ##############################################
+
+    def test_real_views(self):
+
+        ngspice_shared, plot_name = self._simulate(TRANSIENT_DESK, 30)
+        plot = ngspice_shared.plot(None, plot_name, zero_copy=True)
+        library_vector = ngspice_shared.library._find_plot(plot_name).vectors['input']
+        data = plot['input']._data
+        self.assertEqual(data.dtype, np.float64)
+        self.assertFalse(data.flags.writeable)
+        self.assertFalse(data.flags.owndata)
+        np_test.assert_array_equal(data, np.ones(11))
+        # the view shares the memory of the library
+        library_vector.data[0] = 2
+        self.assertEqual(data[0], 2)
+
+        analysis = plot.to_analysis()
+        self.assertFalse(analysis.time.flags.writeable)
+        np_test.assert_allclose(analysis.time.as_ndarray(), np.arange(11) * 1e-6)
+
+    ##############################################
+
+    def test_complex_views(self):
+
+        ngspice_shared, plot_name = self._simulate(AC_DESK, 31)
+        self.assertEqual(plot_name, 'ac1')
+        plot = ngspice_shared.plot(None, plot_name, zero_copy=True)
+        data = plot['input']._data
+        self.assertEqual(data.dtype, np.complex128)
+        self.assertFalse(data.flags.writeable)
+        np_test.assert_array_equal(data, np.full(5, 2 - 2j))
+        np_test.assert_array_equal(plot['frequency']._data.real, np.linspace(1e3, 5e3, 5))
+        # the copy is the same
+        copied_plot = ngspice_shared.plot(None, plot_name)
+        np_test.assert_array_equal(copied_plot['input']._data, data)
+        self.assertTrue(copied_plot['input']._data.flags.writeable)
+
+    ##############################################
+
+    def test_deferred_destroy(self):
+
+        ngspice_shared, plot_name = self._simulate(TRANSIENT_DESK, 32)
+        library = ngspice_shared.library
+        plot = ngspice_shared.plot(None, plot_name, zero_copy=True)
+        self.assertEqual(ngspice_shared.pinned_plots, {plot_name})
+        # the plot is pinned by each view
+        view = plot['input']._data
+
+        ngspice_shared.destroy(plot_name)
+        ngspice_shared.destroy()
+        self.assertNotIn('destroy ' + plot_name, library.commands)
+        self.assertNotIn('destroy all', library.commands)
+        self.assertIn(plot_name, ngspice_shared.plot_names)
+
+        del plot
+        gc.collect()
+        self.assertEqual(ngspice_shared.pinned_plots, {plot_name})
+        np_test.assert_array_equal(view, np.ones(11))
+        del view
+        gc.collect()
+        self.assertEqual(ngspice_shared.pinned_plots, set())
+        # the plot is still there until the next destroy
+        self.assertIn(plot_name, ngspice_shared.plot_names)
+        ngspice_shared.destroy()
+        self.assertEqual(library.commands[-1], 'destroy all')
+        self.assertEqual(ngspice_shared.plot_names, ['const'])
+
+        # a released plot is destroyed by the next destroy of another plot
+        ngspice_shared.run()
+        ngspice_shared.run()
+        plot = ngspice_shared.plot(None, 'tran2', zero_copy=True)
+        ngspice_shared.destroy('tran2')
+        del plot
+        gc.collect()
+        ngspice_shared.destroy('tran3')
+        self.assertEqual(library.commands[-2:], ['destroy tran2', 'destroy tran3'])
+
+    ##############################################
+
+    def test_unpin_under_lock(self):
+
+        # a view can be collected on a thread holding the plot lock
+        ngspice_shared, plot_name = self._simulate(TRANSIENT_DESK, 33)
+        plot = ngspice_shared.plot(None, plot_name, zero_copy=True)
+
+        def release():
+            nonlocal plot
+            with ngspice_shared._plot_lock:
+                del plot
+                gc.collect()
+
+        thread = threading.Thread(target=release, daemon=True)
+        thread.start()
+        thread.join(timeout=10)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(ngspice_shared.pinned_plots, set())
+
+    ##############################################
+
+    def test_unpinned_commands(self):
+
+        ngspice_shared, plot_name = self._simulate(TRANSIENT_DESK, 34)
+        plot = ngspice_shared.plot(None, plot_name, zero_copy=True)
+        for method, command in ((ngspice_shared.reset, 'reset'),
+                                (ngspice_shared.remove_circuit, 'remcirc'),
+                                (ngspice_shared.quit, 'quit')):
+            with self.assertLogs(ngspice_shared._logger, logging.WARNING) as logs:
+                method()
+            self.assertIn('{} invalidates the zero-copy views of the plots {}'.format(command, plot_name),
+                          logs.output[0])
+        del plot
+        gc.collect()
+        with self.assertLogs(ngspice_shared._logger, logging.WARNING) as logs:
+            ngspice_shared.reset()
+            ngspice_shared._logger.warning('no other warning')
+        self.assertEqual(len(logs.output), 1)
+
+####################################################################################################
+
+class TestExternalSource(unittest.TestCase):
+
+    ##############################################
+
+    def test_array_source(self):
+
+        ngspice_shared = ExternalNgSpiceShared(ngspice_id=35)
+        library = ngspice_shared.library
+        ngspice_shared.add_array_source('VInput', [0, 1e-3], [0, 1])
+        current_source = ngspice_shared.add_array_source('iload', [0, 1e-3], [1e-3, 0])
+        ngspice_shared.load_circuit(EXTERNAL_DESK)
+        ngspice_shared.run()
+        analysis = ngspice_shared.plot(None, ngspice_shared.last_plot).to_analysis()
+        time = analysis.time.as_ndarray()
+        np_test.assert_allclose(time, np.arange(11) * 1e-4)
+        # the sources are interpolated by the callbacks
+        np_test.assert_allclose(analysis['input'].as_ndarray(), time * 1e3)
+        np_test.assert_allclose(library.external_values['iload'], 1e-3 - time)
+        self.assertEqual(ngspice_shared.vsrc_calls, [])
+
+        # a removed source falls back to the get_vsrc_data method
+        ngspice_shared.remove_array_source('vinput')
+        self.assertEqual(ngspice_shared.array_sources, {'iload': current_source})
+        ngspice_shared.run()
+        analysis = ngspice_shared.plot(None, ngspice_shared.last_plot).to_analysis()
+        np_test.assert_array_equal(analysis['input'].as_ndarray(), np.full(11, -1))
+        self.assertEqual(ngspice_shared.vsrc_calls, [(_, 'vinput') for _ in time])
+        np_test.assert_allclose(library.external_values['iload'][11:], 1e-3 - time)
+
+    ##############################################
+
+    def test_sync_data(self):
+
+        ngspice_shared = ExternalNgSpiceShared(ngspice_id=36, sync_data=True)
+        ngspice_shared.load_circuit(EXTERNAL_DESK)
+        ngspice_shared.run()
+        analysis = ngspice_shared.plot(None, ngspice_shared.last_plot).to_analysis()
+        # the returned time step is used
+        np_test.assert_allclose(analysis.time.as_ndarray(), np.arange(21) * 5e-5)
+        self.assertEqual(len(ngspice_shared.sync_calls), 20)
+        np_test.assert_allclose(ngspice_shared.sync_calls[0], (0, 1e-4, 1e-4, 0, 36, 0))
+        np_test.assert_allclose(ngspice_shared.sync_calls[1][1:3], (1e-4, 5e-5))
+
+    ##############################################
+
+    def test_without_sync_data(self):
+
+        ngspice_shared = ExternalNgSpiceShared(ngspice_id=37)
+        ngspice_shared.load_circuit(EXTERNAL_DESK)
+        ngspice_shared.run()
+        analysis = ngspice_shared.plot(None, ngspice_shared.last_plot).to_analysis()
+        np_test.assert_allclose(analysis.time.as_ndarray(), np.arange(11) * 1e-4)
+        self.assertEqual(ngspice_shared.sync_calls, [])
+
+####################################################################################################
+
+if __name__ == '__main__':
+    unittest.main()
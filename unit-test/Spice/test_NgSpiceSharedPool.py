@@ -0,0 +1,161 @@
+####################################################################################################
+#
+# PySpice - A Spice Package for Python
+# Copyright (C) 2021 Fabrice Salvaire
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+####################################################################################################
+
+
+####################################################################################################
+
+from pathlib import Path
+import gc
+import queue
+import tempfile
+import unittest
+
+####################################################################################################
+
+from PySpice.Spice.Netlist import Circuit
+from PySpice.Spice.NgSpice.Shared import NgSpiceShared, NgSpiceSharedPool, NgSpiceCircuitError
+from PySpice.Spice.NgSpice.Simulation import NgSpiceSharedCircuitSimulator
+from PySpice.Unit import *
+
+from FakeNgSpiceLibrary import FakeNgSpiceShared
+
+####################################################################################################
+
+def make_circuit(voltage):
+    circuit = Circuit('Pool test')
+    circuit.V(1, 'input', circuit.gnd, voltage@u_V)
+    circuit.R(1, 'input', circuit.gnd, 1@u_kΩ)
+    return circuit
+
+####################################################################################################
+
+class TestNgSpiceSharedPool(unittest.TestCase):
+
+    ##############################################
+
+    def setUp(self):
+        self._tmp_directory = tempfile.TemporaryDirectory()
+        path = Path(self._tmp_directory.name)
+        library_path = path.joinpath('libngspice.so')
+        library_path.write_bytes(b'fake library')
+        self._pool = NgSpiceSharedPool(
+            number_of_instances=2,
+            cache_path=path.joinpath('cache'),
+            library_path=library_path,
+            ngspice_shared_cls=FakeNgSpiceShared,
+        )
+
+    def tearDown(self):
+        self._pool.shutdown()
+        self._tmp_directory.cleanup()
+
+    ##############################################
+
+    def test_instances(self):
+
+        pool = self._pool
+        self.assertEqual(len(pool), 2)
+        self.assertEqual([instance.ngspice_id for instance in pool], [1, 2])
+        for instance in pool:
+            # each instance loads its own copy of the library
+            copy_path = pool.directory.joinpath(Path(NgSpiceShared.LIBRARY_PATH.format(instance.ngspice_id)).name)
+            self.assertEqual(instance.library.library_path, str(copy_path))
+            self.assertEqual(copy_path.read_bytes(), b'fake library')
+            self.assertEqual(instance.library.ngspice_id, instance.ngspice_id)
+
+        first = pool.acquire()
+        second = pool.acquire()
+        self.assertNotEqual(first.ngspice_id, second.ngspice_id)
+        with self.assertRaises(queue.Empty):
+            pool.acquire(timeout=0)
+        pool.release(first)
+        with pool.instance() as instance:
+            self.assertIs(instance, first)
+        pool.release(second)
+
+        with self.assertRaises(ValueError):
+            pool.release(FakeNgSpiceShared(ngspice_id=3))
+
+    ##############################################
+
+    def test_two_pools(self):
+
+        # the pools must not load the same copies
+        pool = NgSpiceSharedPool(
+            number_of_instances=2,
+            cache_path=self._pool.cache_path,
+            library_path=Path(self._tmp_directory.name).joinpath('libngspice.so'),
+            ngspice_shared_cls=FakeNgSpiceShared,
+        )
+        self.assertNotEqual(pool.directory, self._pool.directory)
+        self.assertEqual(pool.directory.parent, self._pool.directory.parent)
+        library_paths = {instance.library.library_path for instance in list(pool) + list(self._pool)}
+        self.assertEqual(len(library_paths), 4)
+
+        # the copies are removed with the pool
+        directory = pool.directory
+        del pool
+        gc.collect()
+        self.assertFalse(directory.exists())
+
+    ##############################################
+
+    def test_submit(self):
+
+        future = NgSpiceSharedCircuitSimulator.submit(self._pool, make_circuit(3), 'operating_point')
+        analysis = future.result()
+        self.assertEqual(float(analysis['input'][0]), 3)
+
+    ##############################################
+
+    def test_map(self):
+
+        voltages = list(range(6))
+        circuits = [make_circuit(voltage) for voltage in voltages]
+        analyses = NgSpiceSharedCircuitSimulator.map(self._pool, circuits, 'transient',
+                                                     step_time=1@u_us, end_time=10@u_us)
+        for voltage, analysis in zip(voltages, analyses):
+            self.assertEqual(len(analysis.time), 11)
+            self.assertEqual(float(analysis['input'][-1]), voltage)
+        # the simulations are spread over the instances
+        number_of_runs = [instance.library.number_of_runs for instance in self._pool]
+        self.assertEqual(sum(number_of_runs), len(circuits))
+
+    ##############################################
+
+    def test_error(self):
+
+        circuit = make_circuit(1)
+        circuit.X(1, 'undefined', 'input', circuit.gnd)
+        future = NgSpiceSharedCircuitSimulator.submit(self._pool, circuit, 'operating_point')
+        with self.assertRaises(NgSpiceCircuitError):
+            future.result()
+        # the instance is checked in
+        instances = [self._pool.acquire(timeout=0) for _ in range(len(self._pool))]
+        for instance in instances:
+            self._pool.release(instance)
+        # and still usable
+        analysis = NgSpiceSharedCircuitSimulator.submit(self._pool, make_circuit(2), 'operating_point').result()
+        self.assertEqual(float(analysis['input'][0]), 2)
+
+####################################################################################################
+
+if __name__ == '__main__':
+    unittest.main()
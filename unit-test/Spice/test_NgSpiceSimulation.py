@@ -0,0 +1,170 @@
+####################################################################################################
+#
+# PySpice - A Spice Package for Python
+# Copyright (C) 2021 Fabrice Salvaire
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+####################################################################################################
+
+
+####################################################################################################
+
+import unittest
+
+####################################################################################################
+
+from PySpice.Spice.Netlist import Circuit
+from PySpice.Spice.NgSpice.Simulation import NgSpiceSharedCircuitSimulator
+from PySpice.Unit import *
+
+####################################################################################################
+
+class AlterLog:
+
+    """Record the alter commands in place of the Ngspice shared library."""
+
+    def __init__(self):
+        self.circuit_serial = 0
+        self.commands = []
+
+    def alter_device(self, device, **kwargs):
+        self.circuit_serial += 1
+        self.commands.append(('alter', device, kwargs))
+
+    def alter_model(self, model, **kwargs):
+        self.circuit_serial += 1
+        self.commands.append(('altermod', model, kwargs))
+
+class SessionLog(AlterLog):
+
+    """Record the loaded desk and return a plot per analysis in place of the Ngspice shared library."""
+
+    PLOTS = {'.op': ['op1'], '.ac': ['ac1'], '.tran': ['tran1'], '.noise': ['noise1', 'noise2']}
+
+    class Plot:
+
+        def __init__(self, plot_name):
+            self.plot_name = plot_name
+
+        def to_analysis(self):
+            return 'analysis of ' + self.plot_name
+
+    def __init__(self):
+        super().__init__()
+        self.plot_names = ['const']
+
+    def destroy(self):
+        self.plot_names = ['const']
+
+    def load_circuit(self, desk):
+        self.circuit_serial += 1
+        self.desk = desk
+
+    def run(self):
+        for line in self.desk.splitlines():
+            for plot_name in self.PLOTS.get(line.split(' ')[0], ()):
+                self.plot_names.insert(0, plot_name)
+
+    def plot(self, simulation, plot_name, zero_copy=False, lazy=False):
+        return self.Plot(plot_name)
+
+####################################################################################################
+
+class TestIncrementalSimulation(unittest.TestCase):
+
+    ##############################################
+
+    def _make_simulator(self):
+
+        circuit = Circuit('Divider')
+        circuit.V('input', 'input', circuit.gnd, 10@u_V)
+        circuit.R(1, 'input', 'output', 1@u_kΩ)
+        circuit.R(2, 'output', circuit.gnd, 2@u_kΩ)
+        self._diode = circuit.model('Diode', 'D', IS=1e-14, N=1)
+        ngspice_shared = AlterLog()
+        simulator = NgSpiceSharedCircuitSimulator(circuit, ngspice_shared=ngspice_shared)
+        simulator._loaded_state = simulator._netlist_state()
+        simulator._loaded_serial = ngspice_shared.circuit_serial
+        return circuit, simulator, ngspice_shared
+
+    ##############################################
+
+    def test_alter(self):
+
+        circuit, simulator, ngspice_shared = self._make_simulator()
+        circuit.R1.resistance = 5@u_kΩ
+        self._diode._parameters['N'] = 2
+        self.assertTrue(simulator._alter_circuit(simulator._netlist_state()))
+        self.assertEqual(ngspice_shared.commands, [
+            ('alter', 'R1', {'resistance': '5000.0'}),
+            ('altermod', 'Diode', {'N': '2.0'}),
+        ])
+
+    ##############################################
+
+    def test_reload(self):
+
+        circuit, simulator, ngspice_shared = self._make_simulator()
+        circuit.R(3, 'output', circuit.gnd, 1@u_kΩ)
+        self.assertFalse(simulator._alter_circuit(simulator._netlist_state()))
+
+        circuit, simulator, ngspice_shared = self._make_simulator()
+        circuit.R1.resistance = 5@u_kΩ
+        ngspice_shared.circuit_serial += 1 # circuit loaded by someone else
+        self.assertFalse(simulator._alter_circuit(simulator._netlist_state()))
+        self.assertEqual(ngspice_shared.commands, [])
+
+####################################################################################################
+
+class TestMultiAnalysis(unittest.TestCase):
+
+    ##############################################
+
+    def test_run_analyses(self):
+
+        circuit = Circuit('Divider')
+        circuit.V('input', 'input', circuit.gnd, 10@u_V)
+        circuit.R(1, 'input', 'output', 1@u_kΩ)
+        circuit.R(2, 'output', circuit.gnd, 2@u_kΩ)
+        ngspice_shared = SessionLog()
+        simulator = NgSpiceSharedCircuitSimulator(circuit, ngspice_shared=ngspice_shared)
+
+        analyses = simulator.run_analyses({
+            'operating_point': {},
+            'ac': dict(start_frequency=1@u_Hz, stop_frequency=1@u_MHz, number_of_points=10, variation='dec'),
+            'transient': dict(step_time=1@u_us, end_time=1@u_ms),
+            'noise': dict(output_node='output', ref_node=circuit.gnd, src='Vinput', variation='dec',
+                          points=10, start_frequency=1@u_Hz, stop_frequency=1@u_MHz),
+        })
+        self.assertEqual(list(analyses), ['op1', 'ac1', 'tran1', 'noise1', 'noise2'])
+        self.assertEqual(analyses['noise2'], 'analysis of noise2')
+        # a single load
+        self.assertEqual(ngspice_shared.circuit_serial, 1)
+        self.assertEqual(simulator._analyses, {})
+
+        with self.assertRaises(NameError):
+            simulator.run_analyses({'foo': {}})
+
+        # the plots kept from a previous simulation are not returned
+        ngspice_shared.destroy = lambda: None
+        ngspice_shared.plot_names = ['dc1', 'const']
+        analyses = simulator.run_analyses({'operating_point': {}})
+        self.assertEqual(list(analyses), ['op1'])
+
+####################################################################################################
+
+if __name__ == '__main__':
+
+    unittest.main()
@@ -0,0 +1,75 @@
+####################################################################################################
+#
+# PySpice - A Spice Package for Python
+# Copyright (C) 2021 Fabrice Salvaire
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+####################################################################################################
+
+
+####################################################################################################
+
+import io
+import unittest
+
+####################################################################################################
+
+from PySpice.Spice.NgSpice.OutputSink import DropSink, FileSink, ListSink, RingBufferSink
+
+####################################################################################################
+
+class TestOutputSink(unittest.TestCase):
+
+    ##############################################
+
+    def _write(self, sink):
+        for i in range(5):
+            sink.write('stdout', 'line {}'.format(i).encode('utf8'))
+        sink.write('stderr', b'error')
+
+    ##############################################
+
+    def test_sinks(self):
+
+        sink = ListSink()
+        self._write(sink)
+        self.assertEqual(sink.lines('stdout'), ['line {}'.format(i) for i in range(5)])
+        self.assertEqual(sink.lines('stderr'), ['error'])
+        sink.clear()
+        self.assertEqual(sink.lines('stdout'), [])
+
+        sink = RingBufferSink(2)
+        self._write(sink)
+        self.assertEqual(sink.lines('stdout'), ['line 3', 'line 4'])
+        sink = RingBufferSink(2.)
+        self.assertEqual(sink.max_lines, 2)
+        self._write(sink)
+        self.assertEqual(sink.lines('stdout'), ['line 3', 'line 4'])
+
+        file = io.BytesIO()
+        sink = FileSink(file)
+        self._write(sink)
+        self.assertEqual(sink.lines('stdout'), [])
+        self.assertEqual(file.getvalue().splitlines()[-2:], [b'stdout line 4', b'stderr error'])
+
+        sink = DropSink()
+        self._write(sink)
+        self.assertEqual(sink.lines('stdout'), [])
+
+####################################################################################################
+
+if __name__ == '__main__':
+
+    unittest.main()
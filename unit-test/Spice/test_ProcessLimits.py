@@ -0,0 +1,191 @@
+####################################################################################################
+#
+# PySpice - A Spice Package for Python
+# Copyright (C) 2021 Fabrice Salvaire
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+####################################################################################################
+
+
+####################################################################################################
+
+import asyncio
+import os
+import stat
+import sys
+import tempfile
+import unittest
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+####################################################################################################
+
+from PySpice.Config import ConfigInstall
+from PySpice.Spice.NgSpice.Server import AsyncSpiceServer, SpiceServer
+from PySpice.Spice.ProcessLimits import ProcessLimits
+from PySpice.Spice.Xyce.Server import XyceServer
+
+####################################################################################################
+
+# This script mimics ngspice in server mode, it sleeps, spins or reports its address space limit
+# according to the deck.
+FAKE_NGSPICE = '''\
+import os, resource, struct, sys, time
+deck = sys.stdin.read()
+parameters = dict(line[2:].split('=') for line in deck.splitlines() if line.startswith('* '))
+with open(parameters['pid'], 'w') as fh:
+    fh.write(str(os.getpid()))
+action = parameters.get('action')
+if action == 'sleep':
+    time.sleep(30)
+elif action == 'spin':
+    while True:
+        pass
+value = resource.getrlimit(resource.RLIMIT_AS)[0]
+header = (
+    'Circuit: divider\\n\\n'
+    'Doing analysis at TEMP = 27.000000 and TNOM = 27.000000\\n\\n'
+    'Title: divider\\n'
+    'Date: Sat Oct 17 12:00:00  2026\\n'
+    'Plotname: Operating Point\\n'
+    'Flags: real\\n'
+    'No. Variables: 1\\n'
+    'No. Points: 0\\n'
+    'Variables:\\n'
+    'No. of Data Columns : 1\\n'
+    '\\t0\\tv(out)\\tvoltage\\n'
+    'Binary:\\n'
+)
+sys.stdout.buffer.write(header.encode('ascii') + struct.pack('d', float(value)))
+sys.stderr.write('@@@ 1 1\\n')
+'''
+
+# This script mimics a Xyce which never completes
+FAKE_XYCE = '''\
+import time
+print('Xyce is running', flush=True)
+time.sleep(30)
+'''
+
+skip_on_windows = unittest.skipIf(ConfigInstall.OS.on_windows, 'requires a shebang line')
+
+####################################################################################################
+
+@skip_on_windows
+class TestProcessLimits(unittest.TestCase):
+
+    ##############################################
+
+    def _write_script(self, name, source):
+        path = os.path.join(self._directory.name, name)
+        with open(path, 'w') as fh:
+            fh.write('#!' + sys.executable + os.linesep)
+            fh.write(source)
+        os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+        return path
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self._spice_command = self._write_script('ngspice', FAKE_NGSPICE)
+        self._xyce_command = self._write_script('Xyce', FAKE_XYCE)
+        self._pid_path = os.path.join(self._directory.name, 'pid')
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    ##############################################
+
+    def _deck(self, action=''):
+        return '* action={}\n* pid={}\n'.format(action, self._pid_path)
+
+    def _assert_killed(self):
+        with open(self._pid_path) as fh:
+            pid = int(fh.read())
+        with self.assertRaises(ProcessLookupError):
+            os.kill(pid, 0)
+
+    ##############################################
+
+    def test_invalid_limits(self):
+        for kwargs in (dict(timeout=0), dict(cpu_time=-1), dict(memory=0)):
+            with self.assertRaises(ValueError):
+                ProcessLimits(**kwargs)
+        limits = ProcessLimits.from_kwargs(dict(timeout=10, spice_command='ngspice'))
+        self.assertEqual(limits.timeout, 10)
+        self.assertEqual(limits.command(['ngspice', '-s']), ('ngspice', '-s'))
+
+    ##############################################
+
+    @unittest.skipIf(resource is None, 'resource limits are not supported')
+    def test_command(self):
+        limits = ProcessLimits(cpu_time=10, memory=2**20 + 1)
+        command = limits.command(['ngspice', '-s'])
+        self.assertEqual(command[:2], (ProcessLimits.SHELL, '-c'))
+        self.assertEqual(command[3:], ('ngspice', '-s'))
+        self.assertIn('ulimit -H -t 11', command[2])
+        self.assertIn('ulimit -S -t 10', command[2])
+        self.assertIn('ulimit -v 1024', command[2])
+
+    ##############################################
+
+    def test_timeout(self):
+        spice_server = SpiceServer(spice_command=self._spice_command, timeout=.5)
+        with self.assertRaises(NameError) as context:
+            spice_server(self._deck('sleep'))
+        self.assertIn('timeout', str(context.exception))
+        self._assert_killed()
+
+    ##############################################
+
+    def test_async_timeout(self):
+        spice_server = AsyncSpiceServer(spice_command=self._spice_command, timeout=.5)
+        with self.assertRaises(NameError):
+            asyncio.run(spice_server(self._deck('sleep')))
+        self._assert_killed()
+
+    ##############################################
+
+    def test_xyce_timeout(self):
+        xyce_server = XyceServer(xyce_command=self._xyce_command, timeout=.5)
+        with self.assertRaises(NameError) as context:
+            xyce_server('* deck\n')
+        self.assertIn('Xyce is running', str(context.exception))
+
+    ##############################################
+
+    @unittest.skipIf(resource is None, 'resource limits are not supported')
+    def test_cpu_time_limit(self):
+        spice_server = SpiceServer(spice_command=self._spice_command, cpu_time_limit=1, timeout=30)
+        with self.assertRaises(NameError) as context:
+            spice_server(self._deck('spin'))
+        self.assertIn('CPU time limit', str(context.exception))
+        self._assert_killed()
+
+    ##############################################
+
+    @unittest.skipIf(resource is None, 'resource limits are not supported')
+    def test_memory_limit(self):
+        memory_limit = 2**34
+        spice_server = SpiceServer(spice_command=self._spice_command, memory_limit=memory_limit)
+        raw_file = spice_server(self._deck())
+        self.assertEqual(float(raw_file.variables['v(out)'].data[0]), memory_limit)
+
+####################################################################################################
+
+if __name__ == '__main__':
+    unittest.main()
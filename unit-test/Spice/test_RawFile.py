@@ -0,0 +1,410 @@
+####################################################################################################
+#
+# PySpice - A Spice Package for Python
+# Copyright (C) 2021 Fabrice Salvaire
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+####################################################################################################
+
+
+####################################################################################################
+
+import io
+import os
+import tempfile
+import types
+import unittest
+
+import numpy as np
+from numpy import testing as np_test
+
+####################################################################################################
+
+from PySpice.Spice.Netlist import Circuit
+from PySpice.Spice.NgSpice.RawFile import RawFile, RawFileWriter
+from PySpice.Spice.Xyce.RawFile import RawFile as XyceRawFile, RawFileWriter as XyceRawFileWriter
+
+####################################################################################################
+
+def make_header(plot_name, flags, names, data):
+    header = (
+        'Title: rc\n'
+        'Date: Sat Oct 17 12:00:00  2026\n'
+        'Plotname: {}\n'
+        'Flags: {}\n'
+        'No. Variables: {}\n'
+        'No. Points: {}\n'
+        'Variables:\n'
+    ).format(plot_name, flags, len(names), data.shape[0])
+    for i, (name, unit) in enumerate(names):
+        header += '\t{}\t{}\t{}\n'.format(i, name, unit)
+    return header
+
+def make_raw_file(plot_name, flags, names, data):
+    header = make_header(plot_name, flags, names, data) + 'Binary:\n'
+    dtype = np.float64 if flags == 'real' else np.complex128
+    return header.encode('ascii') + np.ascontiguousarray(data, dtype=dtype).tobytes()
+
+def make_ascii_raw_file(plot_name, flags, names, data):
+    # as written by ngspice: the index and the first value on the same line
+    content = make_header(plot_name, flags, names, data) + 'Values:\n'
+    for i, point in enumerate(data):
+        if flags == 'complex':
+            values = ['{:.17e},{:.17e}'.format(x.real, x.imag) for x in point]
+        else:
+            values = ['{:.17e}'.format(x) for x in point]
+        content += ' {}\t'.format(i) + '\n\t'.join(values) + '\n\n'
+    return content.encode('ascii')
+
+NUMBER_OF_POINTS = 1000
+TIME = np.linspace(0, 1e-3, NUMBER_OF_POINTS)
+TRANSIENT_DATA = np.column_stack((TIME, np.sin(TIME), np.cos(TIME)))
+TRANSIENT_NAMES = (('time', 'time'), ('out', 'voltage'), ('vinput#branch', 'current'))
+
+FREQUENCY = np.logspace(0, 6, 100)
+AC_DATA = np.column_stack((FREQUENCY, 1/(1 + 1j*FREQUENCY)))
+AC_NAMES = (('frequency', 'frequency'), ('out', 'voltage'))
+
+OP_DATA = np.array([[1., .5, -1e-3]])
+OP_NAMES = (('in', 'voltage'), ('out', 'voltage'), ('vinput#branch', 'current'))
+
+SWEEP = np.linspace(0, 5, 11)
+DC_DATA = np.column_stack((SWEEP, SWEEP/2))
+DC_NAMES = (('v-sweep', 'voltage'), ('out', 'voltage'))
+
+####################################################################################################
+
+class TestRawFile(unittest.TestCase):
+
+    ##############################################
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    ##############################################
+
+    def _simulation(self):
+        circuit = Circuit('rc')
+        circuit.V('input', 'in', circuit.gnd, 1)
+        circuit.R(1, 'in', 'out', 1)
+        return types.SimpleNamespace(circuit=circuit)
+
+    def _analysis(self, raw_file_cls, content):
+        raw_file = raw_file_cls(content)
+        raw_file.simulation = self._simulation()
+        return raw_file.to_analysis()
+
+    def _write(self, name, *contents):
+        path = os.path.join(self._directory.name, name)
+        with open(path, 'wb') as fh:
+            for content in contents:
+                fh.write(content)
+        return path
+
+    def _assert_transient(self, raw_file):
+        self.assertEqual(raw_file.number_of_points, NUMBER_OF_POINTS)
+        np_test.assert_array_equal(raw_file.variables['time'].data, TIME)
+        np_test.assert_array_equal(raw_file.variables['v(out)'].data, np.sin(TIME))
+        np_test.assert_array_equal(raw_file.variables['i(vinput)'].data, np.cos(TIME))
+
+    ##############################################
+
+    def test_path(self):
+        content = make_raw_file('Transient Analysis', 'real', TRANSIENT_NAMES, TRANSIENT_DATA)
+        # the data following the binary section are ignored
+        path = self._write('transient.raw', content, b'Title: next plot\n')
+        for memory_map in (False, True):
+            raw_file = RawFile(path=path, memory_map=memory_map)
+            self._assert_transient(raw_file)
+            self.assertEqual(raw_file.memory_map is not None, memory_map)
+            self.assertEqual(raw_file.copy_data, not memory_map)
+
+    ##############################################
+
+    def test_file_object(self):
+        content = make_raw_file('Transient Analysis', 'real', TRANSIENT_NAMES, TRANSIENT_DATA)
+        fh = io.BytesIO(b'garbage' + content)
+        fh.seek(len(b'garbage'))
+        self._assert_transient(RawFile(path=fh))
+        path = self._write('transient.raw', b'garbage', content)
+        with open(path, 'rb') as fh:
+            fh.seek(len(b'garbage'))
+            raw_file = RawFile(path=fh, memory_map=True)
+        self._assert_transient(raw_file)
+
+    ##############################################
+
+    def test_line_separator(self):
+
+        class WindowsRawFile(RawFile):
+            OUTPUT_LINES = (b'Binary:\r\n', b'Values:\r\n')
+
+        # the written raw files use '\n' on all platforms
+        content = make_raw_file('Transient Analysis', 'real', TRANSIENT_NAMES, TRANSIENT_DATA)
+        self._assert_transient(WindowsRawFile(path=self._write('transient.raw', content)))
+        self._assert_transient(WindowsRawFile(content))
+
+        # the stdout of the server mode uses the line separator of the platform
+        names = (('time', 'time'), ('v(out)', 'voltage'), ('i(vinput)', 'current'))
+        header = make_header('Transient Analysis', 'real', names, TRANSIENT_DATA)
+        header = header.replace('Variables:\n', 'Variables:\nNo. of Data Columns : 3\n')
+        header = (
+            'Circuit: rc\n\n'
+            'Doing analysis at TEMP = 27.000000 and TNOM = 27.000000\n\n'
+            + header + 'Binary:\n'
+        )
+        stdout = header.replace('\n', '\r\n').encode('ascii') + TRANSIENT_DATA.tobytes()
+        self._assert_transient(WindowsRawFile(stdout, number_of_points=NUMBER_OF_POINTS))
+
+    ##############################################
+
+    def test_complex(self):
+        path = self._write('ac.raw', make_raw_file('AC Analysis', 'complex', AC_NAMES, AC_DATA))
+        raw_file = XyceRawFile(path=path, memory_map=True)
+        self.assertEqual(raw_file.data_size, 16*2*FREQUENCY.size)
+        np_test.assert_array_equal(raw_file.variables['out'].data, AC_DATA[:, 1])
+        np_test.assert_array_equal(raw_file.variables['frequency'].data.real, FREQUENCY)
+
+    ##############################################
+
+    def test_iter_chunks(self):
+        path = self._write('transient.raw',
+                           make_raw_file('Transient Analysis', 'real', TRANSIENT_NAMES, TRANSIENT_DATA))
+        raw_file = RawFile(path=path, memory_map=True)
+        chunks = list(raw_file.iter_chunks(number_of_points=300))
+        self.assertEqual([chunk['time'].size for chunk in chunks], [300, 300, 300, 100])
+        np_test.assert_array_equal(np.concatenate([chunk['v(out)'] for chunk in chunks]), np.sin(TIME))
+        self.assertTrue(chunks[0]['time'].flags.writeable)
+        with self.assertRaises(ValueError):
+            next(raw_file.iter_chunks(0))
+
+    ##############################################
+
+    def _write_plots(self):
+        contents = (
+            make_raw_file('Operating Point', 'real', OP_NAMES, OP_DATA),
+            make_raw_file('Transient Analysis', 'real', TRANSIENT_NAMES, TRANSIENT_DATA),
+            make_raw_file('AC Analysis', 'complex', AC_NAMES, AC_DATA),
+        )
+        return self._write('plots.raw', *contents, b'\n'), contents
+
+    ##############################################
+
+    def test_index(self):
+
+        path, contents = self._write_plots()
+        plots = RawFile.index(path, simulation=self._simulation())
+
+        self.assertEqual(len(plots), 3)
+        self.assertEqual(plots.plot_names, ['Operating Point', 'Transient Analysis', 'AC Analysis'])
+        self.assertEqual([plot.offset for plot in plots], [0, len(contents[0]), len(contents[0]) + len(contents[1])])
+        self.assertEqual(plots.plots[1].variables, ['time', 'v(out)', 'i(vinput)'])
+        self.assertEqual(plots.plots[2].flags, 'complex')
+        self.assertEqual(plots.plots[2].number_of_points, FREQUENCY.size)
+        # the plots are loaded on demand
+        self.assertEqual(plots._raw_files, {})
+
+        self._assert_transient(plots[1])
+        self.assertIs(plots[1], plots[-2])
+        self.assertEqual(list(plots._raw_files), [1])
+
+        analysis = plots.to_analysis(0)
+        self.assertEqual(float(np.asarray(analysis.out)[0]), .5)
+        analysis = plots.to_analysis(2)
+        np_test.assert_array_equal(np.asarray(analysis.out), AC_DATA[:, 1])
+        np_test.assert_array_equal(np.asarray(analysis.frequency), FREQUENCY)
+
+    ##############################################
+
+    def test_index_file_object(self):
+        path, contents = self._write_plots()
+        with open(path, 'rb') as fh:
+            plots = XyceRawFile.index(fh, memory_map=True)
+            self.assertEqual(len(plots), 3)
+            raw_file = plots[1]
+        np_test.assert_array_equal(raw_file.variables['out'].data, np.sin(TIME))
+        self.assertIsNotNone(raw_file.memory_map)
+
+    ##############################################
+
+    def test_truncated_plot(self):
+        content = make_raw_file('Transient Analysis', 'real', TRANSIENT_NAMES, TRANSIENT_DATA)
+        path = self._write('truncated.raw', content[:-8])
+        with self.assertRaises(NameError):
+            RawFile.index(path)
+
+    ##############################################
+
+    def test_ascii(self):
+
+        content = make_ascii_raw_file('Transient Analysis', 'real', TRANSIENT_NAMES, TRANSIENT_DATA)
+        raw_file = RawFile(content)
+        self.assertFalse(raw_file.binary)
+        self._assert_transient(raw_file)
+        path = self._write('transient.raw', content)
+        self._assert_transient(RawFile(path=path, memory_map=True))
+
+        content = make_ascii_raw_file('AC Analysis', 'complex', AC_NAMES, AC_DATA)
+        raw_file = XyceRawFile(content)
+        np_test.assert_array_equal(raw_file.variables['out'].data, AC_DATA[:, 1])
+        np_test.assert_array_equal(raw_file.variables['frequency'].data, FREQUENCY)
+
+        with self.assertRaises(NameError):
+            RawFile(content[:-200])
+
+    ##############################################
+
+    def test_ascii_index(self):
+        contents = (
+            make_ascii_raw_file('AC Analysis', 'complex', AC_NAMES, AC_DATA),
+            make_raw_file('Transient Analysis', 'real', TRANSIENT_NAMES, TRANSIENT_DATA),
+            make_ascii_raw_file('Transient Analysis', 'real', TRANSIENT_NAMES, TRANSIENT_DATA),
+        )
+        path = self._write('plots.raw', *contents)
+        plots = RawFile.index(path)
+        self.assertEqual([plot.binary for plot in plots], [False, True, False])
+        self.assertEqual([plot.offset for plot in plots], [0, len(contents[0]), len(contents[0]) + len(contents[1])])
+        np_test.assert_array_equal(plots[0].variables['v(out)'].data, AC_DATA[:, 1])
+        self._assert_transient(plots[1])
+        self._assert_transient(plots[2])
+
+        # only the values of the plot are read, not the rest of the file
+        class CountingFile(io.BytesIO):
+            number_of_bytes_read = 0
+            def read(self, size=-1):
+                data = super().read(size)
+                self.number_of_bytes_read += len(data)
+                return data
+
+        fh = CountingFile(b''.join(contents))
+        plots = RawFile.index(fh)
+        fh.number_of_bytes_read = 0
+        np_test.assert_array_equal(plots[0].variables['v(out)'].data, AC_DATA[:, 1])
+        self.assertEqual(fh.number_of_bytes_read, len(contents[0]))
+
+    ##############################################
+
+    def test_selection(self):
+
+        content = make_raw_file('Transient Analysis', 'real', TRANSIENT_NAMES, TRANSIENT_DATA)
+        path = self._write('transient.raw', content)
+
+        raw_file = RawFile(content, variables='V(OUT)')
+        self.assertEqual(list(raw_file.variables), ['time', 'v(out)'])
+        # only the selected columns are kept
+        self.assertEqual(raw_file._data.shape, (NUMBER_OF_POINTS, 2))
+        np_test.assert_array_equal(raw_file.variables['v(out)'].data, np.sin(TIME))
+
+        # the simplified name and the patterns are matched
+        for variables in (('vinput',), ('i(*)',), ('*input',)):
+            raw_file = RawFile(path=path, variables=variables)
+            self.assertEqual(list(raw_file.variables), ['time', 'i(vinput)'])
+            np_test.assert_array_equal(raw_file.variables['i(vinput)'].data, np.cos(TIME))
+            self.assertIsNone(raw_file.memory_map)
+        chunks = list(raw_file.iter_chunks(NUMBER_OF_POINTS))
+        self.assertEqual(sorted(chunks[0]), ['i(vinput)', 'time'])
+        np_test.assert_array_equal(chunks[0]['i(vinput)'], np.cos(TIME))
+
+        raw_file = RawFile(path=path, memory_map=True, variables=['out'])
+        self.assertEqual(list(raw_file.variables), ['time', 'v(out)'])
+        self.assertIsNotNone(raw_file.memory_map)
+        np_test.assert_array_equal(raw_file.variables['v(out)'].data, np.sin(TIME))
+
+        # a file object without file descriptor is read in memory
+        raw_file = RawFile(path=io.BytesIO(content), variables=['out'])
+        self.assertEqual(list(raw_file.variables), ['time', 'v(out)'])
+        np_test.assert_array_equal(raw_file.variables['v(out)'].data, np.sin(TIME))
+        with self.assertRaises(ValueError):
+            RawFile(path=io.BytesIO(content), memory_map=True)
+
+        content = make_ascii_raw_file('AC Analysis', 'complex', AC_NAMES, AC_DATA)
+        raw_file = XyceRawFile(content, variables=())
+        self.assertEqual(list(raw_file.variables), ['frequency'])
+        np_test.assert_array_equal(raw_file.variables['frequency'].data, FREQUENCY)
+
+        plots = RawFile.index(self._write_plots()[0], variables=['v(out)'])
+        self.assertEqual(list(plots[1].variables), ['time', 'v(out)'])
+        self.assertEqual(plots.plots[1].variables, ['time', 'v(out)', 'i(vinput)'])
+
+        # the ASCII values are never memory-mapped
+        path = self._write('ac.raw', make_ascii_raw_file('AC Analysis', 'complex', AC_NAMES, AC_DATA))
+        plots = RawFile.index(path, memory_map=True, variables=['out'])
+        np_test.assert_array_equal(plots[0].variables['v(out)'].data, AC_DATA[:, 1])
+
+    ##############################################
+
+    def _assert_same_waveforms(self, analysis1, analysis2, names):
+        for name in names:
+            np_test.assert_array_equal(np.asarray(analysis1[name]), np.asarray(analysis2[name]))
+
+    ##############################################
+
+    def test_writer_round_trip(self):
+
+        analyses = (
+            self._analysis(RawFile, make_raw_file('Operating Point', 'real', OP_NAMES, OP_DATA)),
+            self._analysis(RawFile, make_raw_file('Transient Analysis', 'real', TRANSIENT_NAMES, TRANSIENT_DATA)),
+            self._analysis(RawFile, make_raw_file('AC Analysis', 'complex', AC_NAMES, AC_DATA)),
+            self._analysis(RawFile, make_raw_file('DC transfer characteristic', 'real', DC_NAMES, DC_DATA)),
+        )
+        names = (('in', 'out', 'Vinput'), ('out', 'Vinput'), ('out',), ('out',))
+
+        for raw_file_cls, writer_cls in ((RawFile, RawFileWriter), (XyceRawFile, XyceRawFileWriter)):
+            path = os.path.join(self._directory.name, writer_cls.__module__ + '.raw')
+            with writer_cls(path) as writer:
+                writer.CHUNK_SIZE = 300
+                for analysis in analyses:
+                    writer.write_analysis(analysis)
+                self.assertEqual(writer.number_of_plots, 4)
+            # the simulators write '\n' on all platforms
+            with open(path, 'rb') as fh:
+                self.assertTrue(fh.read(200).startswith(b'Title: rc\n'))
+
+            plots = raw_file_cls.index(path, simulation=self._simulation())
+            self.assertEqual(plots.plot_names, [writer_cls.plot_name(analysis) for analysis in analyses])
+            self.assertEqual([plot.flags for plot in plots], ['real', 'real', 'complex', 'real'])
+            self.assertEqual(plots[0].title, 'rc')
+            read_analyses = [plots.to_analysis(i) for i in range(len(plots))]
+            for analysis, read_analysis, analysis_names in zip(analyses, read_analyses, names):
+                self._assert_same_waveforms(analysis, read_analysis, analysis_names)
+            np_test.assert_array_equal(np.asarray(read_analyses[1].time), TIME)
+            np_test.assert_array_equal(np.asarray(read_analyses[2].frequency), FREQUENCY)
+            np_test.assert_array_equal(np.asarray(read_analyses[3].sweep), SWEEP)
+
+    ##############################################
+
+    def test_write_plot(self):
+
+        fh = io.BytesIO()
+        writer = XyceRawFileWriter(fh)
+        variables = [('time', 'time', TIME), ('V(OUT)', 'voltage', np.sin(TIME))]
+        writer.write_plot('Transient Analysis', variables, title='t', date='d')
+        writer.close()
+        self.assertFalse(fh.closed)
+        expected = make_raw_file('Transient Analysis', 'real', (('time', 'time'), ('V(OUT)', 'voltage')),
+                                 TRANSIENT_DATA[:, :2])
+        self.assertEqual(fh.getvalue().split(b'Date:')[1].split(b'\n', 1)[1],
+                         expected.split(b'Date:')[1].split(b'\n', 1)[1])
+
+        with self.assertRaises(ValueError):
+            writer.write_plot('Transient Analysis', [('time', 'time', TIME), ('V(OUT)', 'voltage', TIME[1:])])
+
+####################################################################################################
+
+if __name__ == '__main__':
+    unittest.main()
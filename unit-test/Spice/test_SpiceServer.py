@@ -0,0 +1,215 @@
+####################################################################################################
+#
+# PySpice - A Spice Package for Python
+# Copyright (C) 2021 Fabrice Salvaire
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+####################################################################################################
+
+
+####################################################################################################
+
+import os
+import pickle
+import stat
+import struct
+import sys
+import tempfile
+import textwrap
+import time
+import unittest
+
+import numpy as np
+from numpy import testing as np_test
+
+####################################################################################################
+
+from PySpice.Config import ConfigInstall
+from PySpice.Spice.Netlist import Circuit
+from PySpice.Spice.NgSpice.RawFile import RawFile
+from PySpice.Spice.NgSpice.Server import PersistentSpiceServer, close_persistent_servers
+from PySpice.Spice.NgSpice.Simulation import NgSpiceSubprocessCircuitSimulator
+from PySpice.Unit import *
+
+####################################################################################################
+
+RAW_HEADER = textwrap.dedent('''\
+    Title: divider
+    Date: Sat Oct 17 12:00:00  2026
+    Plotname: Operating Point
+    Flags: real
+    No. Variables: 3
+    No. Points: 1
+    Command: version 34
+    Option: noinit
+    Variables:
+    \t0\tin\tvoltage
+    \t1\tout\tvoltage
+    \t2\tvinput#branch\tcurrent
+    Binary:
+    ''')
+
+def make_raw_file(values):
+    return RAW_HEADER.encode('ascii') + struct.pack('3d', *values)
+
+####################################################################################################
+
+# This script mimics the ngspice pipe mode: the deck value of the output node is written in the
+# raw file, a deck containing "crash" kills the process and a deck containing "warnings" prints
+# warnings forever.
+FAKE_NGSPICE = '''\
+import struct, sys, time
+deck = ''
+for line in sys.stdin:
+    command, _, argument = line.strip().partition(' ')
+    if command == 'source':
+        deck = open(argument).read()
+        if 'crash' in deck:
+            sys.exit(1)
+    elif command == 'run' and 'error' in deck:
+        print('Error: unknown subckt', flush=True)
+    elif command == 'run' and 'warnings' in deck:
+        while True:
+            print('Warning: timestep too small', flush=True)
+            time.sleep(.05)
+    elif command == 'write' and 'error' not in deck:
+        out = float(deck.split('* out=')[1].split()[0])
+        with open(argument, 'wb') as fh:
+            fh.write({header!r}.encode('ascii') + struct.pack('3d', 10, out, -1e-3))
+    elif command == 'echo':
+        print(argument, flush=True)
+    elif command == 'quit':
+        break
+'''
+
+# The fake ngspice is run through its shebang line
+skip_on_windows = unittest.skipIf(ConfigInstall.OS.on_windows, 'requires a shebang line')
+
+####################################################################################################
+
+class TestSpiceServer(unittest.TestCase):
+
+    ##############################################
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        command = os.path.join(self._directory.name, 'ngspice')
+        with open(command, 'w') as fh:
+            fh.write('#!' + sys.executable + os.linesep)
+            fh.write(FAKE_NGSPICE.format(header=RAW_HEADER))
+        os.chmod(command, os.stat(command).st_mode | stat.S_IEXEC)
+        self._spice_command = command
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    ##############################################
+
+    def test_written_raw_file(self):
+        raw_file = RawFile(make_raw_file((10, 5, -1e-3)))
+        self.assertEqual(raw_file.number_of_points, 1)
+        self.assertEqual(raw_file.plot_name, 'Operating Point')
+        self.assertEqual(sorted(raw_file.variables), ['i(vinput)', 'v(in)', 'v(out)'])
+        np_test.assert_array_equal(raw_file.variables['v(out)'].data, [5])
+
+    ##############################################
+
+    @skip_on_windows
+    def test_persistent_server(self):
+
+        with PersistentSpiceServer(spice_command=self._spice_command, timeout=30) as spice_server:
+            self.assertEqual(spice_server.ping(), 1)
+            pid = spice_server.pid
+            for out in (2, 3):
+                raw_file = spice_server('.title divider\n* out={}\n.end\n'.format(out))
+                np_test.assert_array_equal(raw_file.variables['v(out)'].data, [out])
+            self.assertEqual(spice_server.pid, pid)
+
+            with self.assertRaises(NameError):
+                spice_server('* error\n')
+            self.assertEqual(spice_server.pid, pid)
+
+            with self.assertRaises(NameError):
+                spice_server('* crash\n')
+            self.assertFalse(spice_server.is_alive())
+            raw_file = spice_server('* out=4\n')
+            np_test.assert_array_equal(raw_file.variables['v(out)'].data, [4])
+            self.assertEqual(spice_server.number_of_starts, 2)
+
+        self.assertFalse(spice_server.is_alive())
+
+    ##############################################
+
+    @skip_on_windows
+    def test_timeout(self):
+
+        # the timeout applies to the whole simulation, not to each line
+        with PersistentSpiceServer(spice_command=self._spice_command, timeout=.5) as spice_server:
+            start_time = time.monotonic()
+            with self.assertRaises(NameError) as context:
+                spice_server('* warnings\n')
+            self.assertLess(time.monotonic() - start_time, 5)
+            self.assertIn('timeout', str(context.exception))
+            self.assertIn('timestep too small', str(context.exception))
+            self.assertFalse(spice_server.is_alive())
+
+    ##############################################
+
+    @skip_on_windows
+    def test_simulator(self):
+
+        circuit = Circuit('Divider')
+        circuit.V('input', 'in', circuit.gnd, 10@u_V)
+        circuit.R(1, 'in', 'out', 1@u_kΩ)
+        circuit.R(2, 'out', circuit.gnd, 1@u_kΩ)
+
+        with PersistentSpiceServer(spice_command=self._spice_command) as spice_server:
+            simulator = NgSpiceSubprocessCircuitSimulator(circuit, spice_server=spice_server)
+            circuit.raw_spice = '* out=6'
+            analysis = simulator.operating_point()
+            self.assertAlmostEqual(float(analysis.out[0]), 6)
+            self.assertAlmostEqual(float(analysis['in'][0]), 10)
+            self.assertAlmostEqual(float(analysis.Vinput[0]), -1e-3)
+
+    ##############################################
+
+    @skip_on_windows
+    def test_shared_servers(self):
+
+        circuit = Circuit('Divider')
+        circuit.raw_spice = '* out=7'
+        simulator = NgSpiceSubprocessCircuitSimulator(circuit, spice_command=self._spice_command, persistent=True)
+        spice_server = simulator.spice_server
+        self.assertIs(PersistentSpiceServer.shared(spice_command=self._spice_command), spice_server)
+        self.assertIsNot(PersistentSpiceServer.shared(spice_command=self._spice_command, timeout=10),
+                         spice_server)
+        # a copy is the shared server for the same settings
+        self.assertIs(pickle.loads(pickle.dumps(spice_server)), spice_server)
+        copy = pickle.loads(pickle.dumps(PersistentSpiceServer(spice_command=self._spice_command, timeout=20)))
+        self.assertIs(copy, PersistentSpiceServer.shared(spice_command=self._spice_command, timeout=20))
+
+        analysis = simulator.operating_point()
+        self.assertAlmostEqual(float(analysis.out[0]), 7)
+        self.assertTrue(spice_server.is_alive())
+
+        close_persistent_servers()
+        self.assertFalse(spice_server.is_alive())
+        self.assertIsNot(PersistentSpiceServer.shared(spice_command=self._spice_command), spice_server)
+        close_persistent_servers()
+
+####################################################################################################
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+####################################################################################################
+#
+# PySpice - A Spice Package for Python
+# Copyright (C) 2021 Fabrice Salvaire
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+####################################################################################################
+
+
+####################################################################################################
+
+import unittest
+
+import numpy as np
+from numpy import testing as np_test
+
+####################################################################################################
+
+from PySpice.Unit import *
+
+from DividerSimulator import make_divider_simulator
+
+####################################################################################################
+
+class TestSweep(unittest.TestCase):
+
+    ##############################################
+
+    def test_product(self):
+
+        simulator = make_divider_simulator()
+        analysis = simulator.sweep({
+            'R1.resistance': [1@u_kΩ, 3@u_kΩ],
+            'R2.resistance': [1@u_kΩ, 2@u_kΩ, 4@u_kΩ],
+        }, 'operating_point')
+        self.assertEqual(analysis.out.shape, (2, 3, 1))
+        r1 = np.array([1., 3.])[:, np.newaxis]
+        r2 = np.array([1., 2., 4.])[np.newaxis, :]
+        np_test.assert_almost_equal(analysis.out[..., 0], 10 * r2 / (r1 + r2))
+        # the circuit is not modified
+        self.assertEqual(float(simulator.circuit.R1.resistance), 1000)
+
+    ##############################################
+
+    def test_zip_padding(self):
+
+        simulator = make_divider_simulator()
+        analysis = simulator.sweep({
+            'R1.resistance': [1@u_kΩ, 3@u_kΩ],
+            'R2.resistance': [1@u_kΩ, 3@u_kΩ],
+        }, 'transient', step_time=1@u_s, end_time=3@u_s, mode='zip', max_workers=2)
+        self.assertEqual(analysis.out.shape, (2, 4))
+        np_test.assert_almost_equal(analysis.out[0], [5, 5, np.nan, np.nan])
+        np_test.assert_almost_equal(analysis.abscissa[1], [0, 1, 2, 3])
+
+    ##############################################
+
+    def test_invalid(self):
+
+        simulator = make_divider_simulator()
+        with self.assertRaises(NameError):
+            simulator.sweep({'R3.resistance': [1@u_kΩ]}, 'operating_point')
+        with self.assertRaises(ValueError):
+            simulator.sweep({'R1.resistance': [1@u_kΩ], 'R2.resistance': []}, 'operating_point', mode='zip')
+
+####################################################################################################
+
+if __name__ == '__main__':
+
+    unittest.main()
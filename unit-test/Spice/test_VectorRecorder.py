@@ -0,0 +1,126 @@
+####################################################################################################
+#
+# PySpice - A Spice Package for Python
+# Copyright (C) 2021 Fabrice Salvaire
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+####################################################################################################
+
+####################################################################################################
+
+import unittest
+
+import numpy as np
+from numpy import testing as np_test
+
+####################################################################################################
+
+from PySpice.Spice.NgSpice.Recorder import VectorRecorder
+from PySpice.Spice.NgSpice.Shared import ffi, _define_api
+
+####################################################################################################
+
+class TestVectorRecorder(unittest.TestCase):
+
+    ##############################################
+
+    def test_growable(self):
+
+        recorder = VectorRecorder(capacity=2)
+        recorder.reset(('time', 'out', 'ac'), (False, False, True))
+        for i in range(5):
+            recorder.append((i, 2*i, 3*i), (-i,))
+        self.assertEqual(len(recorder), 5)
+        self.assertEqual(recorder.capacity, 8)
+        np_test.assert_array_equal(recorder['time'], np.arange(5))
+        np_test.assert_array_equal(recorder['out'], 2*np.arange(5))
+        np_test.assert_array_equal(recorder['ac'], 3*np.arange(5) - 1j*np.arange(5))
+        self.assertTrue(recorder['out'].flags.c_contiguous)
+        self.assertEqual(sorted(recorder.to_dict()), ['ac', 'out', 'time'])
+
+    ##############################################
+
+    def test_ring_buffer(self):
+
+        recorder = VectorRecorder(capacity=3, ring_buffer=True)
+        recorder.reset(('time',))
+        for i in range(7):
+            recorder.append((i,))
+        self.assertEqual(len(recorder), 3)
+        self.assertEqual(recorder.number_of_points, 7)
+        np_test.assert_array_equal(recorder['time'], (4, 5, 6))
+
+    ##############################################
+
+    def test_ring_buffer_copy(self):
+
+        recorder = VectorRecorder(capacity=3, ring_buffer=True)
+        recorder.reset(('time',))
+        recorder.append((1,))
+        time = recorder['time']
+        for i in range(2, 5):
+            recorder.append((i,))
+        np_test.assert_array_equal(time, (1,))
+
+    ##############################################
+
+    def _record(self, recorder, order):
+
+        _define_api()
+        names = ('time', 'out', 'ac')
+        names_c = [ffi.new('char[]', name.encode('utf8')) for name in names]
+        vecinfo = ffi.new('vecinfo[]', len(names))
+        vecinfo_pointers = ffi.new('pvecinfo[]', [vecinfo + i for i in range(len(names))])
+        for i, name_c in enumerate(names_c):
+            vecinfo[i].vecname = name_c
+            vecinfo[i].is_real = names[i] != 'ac'
+        init_data = ffi.new('vecinfoall *')
+        init_data.veccount = len(names)
+        init_data.vecs = vecinfo_pointers
+        recorder.init(init_data)
+
+        # the structures are equally spaced or not, depending of the order
+        values = ffi.new('vecvalues[]', len(names))
+        vecsa = ffi.new('pvecvalues[]', [values + i for i in order])
+        for i, j in enumerate(order):
+            values[j].name = names_c[i]
+            values[j].is_complex = names[i] == 'ac'
+        data = ffi.new('vecvaluesall *')
+        data.veccount = len(names)
+        data.vecsa = vecsa
+        for k in range(5):
+            for i, j in enumerate(order):
+                values[j].creal = (i + 1)*k
+                values[j].cimag = -k
+            recorder.record(data, len(names))
+
+    ##############################################
+
+    def test_record(self):
+
+        for order in ((0, 1, 2), (2, 0, 1)):
+            recorder = VectorRecorder(capacity=2)
+            self._record(recorder, order)
+            self.assertEqual(recorder.names, ['time', 'out', 'ac'])
+            k = np.arange(5)
+            np_test.assert_array_equal(recorder['time'], k)
+            np_test.assert_array_equal(recorder['out'], 2*k)
+            np_test.assert_array_equal(recorder['ac'], 3*k - 1j*k)
+
+####################################################################################################
+
+if __name__ == '__main__':
+
+    unittest.main()
@@ -0,0 +1,205 @@
+####################################################################################################
+#
+# PySpice - A Spice Package for Python
+# Copyright (C) 2021 Fabrice Salvaire
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+####################################################################################################
+
+
+####################################################################################################
+
+import gc
+import os
+import stat
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+from numpy import testing as np_test
+
+####################################################################################################
+
+from PySpice.Config import ConfigInstall
+from PySpice.Spice.Netlist import Circuit
+from PySpice.Spice.Xyce.RawFile import RawFile
+from PySpice.Unit import *
+
+####################################################################################################
+
+NUMBER_OF_POINTS = 1000
+
+# This script mimics Xyce: a transient analysis of the divider is written in the raw file.
+FAKE_XYCE = '''\
+import sys
+import numpy as np
+raw_path = sys.argv[2]
+number_of_points = {number_of_points}
+header = (
+    'Title: divider\\n'
+    'Date: Sat Oct 17 12:00:00 2026\\n'
+    'Plotname: Transient Analysis\\n'
+    'Flags: real\\n'
+    'No. Variables: 3\\n'
+    'No. Points: {{}}\\n'
+    'Variables:\\n'
+    '\\t0\\ttime\\ttime\\n'
+    '\\t1\\tV(OUT)\\tvoltage\\n'
+    '\\t2\\tVINPUT#branch\\tcurrent\\n'
+    'Binary:\\n'
+).format(number_of_points)
+time = np.linspace(0, 1e-3, number_of_points)
+data = np.stack((time, 5*np.sin(time), -np.ones(number_of_points)*1e-3), axis=1)
+with open(raw_path, 'wb') as fh:
+    fh.write(header.encode('ascii'))
+    fh.write(data.tobytes())
+'''
+
+# This script mimics mpirun, the arguments are saved
+FAKE_MPIRUN = '''\
+import subprocess, sys
+with open(sys.argv[0] + '.log', 'a') as fh:
+    fh.write(' '.join(sys.argv[1:3]) + '\\n')
+sys.exit(subprocess.call(sys.argv[3:]))
+'''
+
+skip_on_windows = unittest.skipIf(ConfigInstall.OS.on_windows, 'requires a shebang line')
+
+####################################################################################################
+
+class TestXyceServer(unittest.TestCase):
+
+    ##############################################
+
+    def _write_script(self, name, source):
+        path = os.path.join(self._directory.name, name)
+        with open(path, 'w') as fh:
+            fh.write('#!' + sys.executable + os.linesep)
+            fh.write(source)
+        os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+        return path
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self._xyce_command = self._write_script('Xyce', FAKE_XYCE.format(number_of_points=NUMBER_OF_POINTS))
+        self._mpi_command = self._write_script('mpirun', FAKE_MPIRUN)
+        self._working_directory = os.path.join(self._directory.name, 'work')
+        os.mkdir(self._working_directory)
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    ##############################################
+
+    def _make_simulator(self, simulator='xyce-serial', **kwargs):
+        circuit = Circuit('Divider')
+        circuit.V('input', 'in', circuit.gnd, 10@u_V)
+        circuit.R(1, 'in', 'out', 1@u_kΩ)
+        circuit.R(2, 'out', circuit.gnd, 1@u_kΩ)
+        return circuit.simulator(simulator=simulator,
+                                 xyce_command=self._xyce_command,
+                                 mpi_command=self._mpi_command,
+                                 working_directory=self._working_directory,
+                                 **kwargs)
+
+    def _simulate(self, memory_map):
+        simulator = self._make_simulator(memory_map=memory_map)
+        return simulator.transient(step_time=1@u_us, end_time=1@u_ms)
+
+    def _mpirun_log(self):
+        try:
+            with open(self._mpi_command + '.log') as fh:
+                return fh.read().splitlines()
+        except FileNotFoundError:
+            return []
+
+    ##############################################
+
+    @skip_on_windows
+    def test_memory_map(self):
+
+        analysis = self._simulate(memory_map=True)
+        time = np.linspace(0, 1e-3, NUMBER_OF_POINTS)
+        np_test.assert_allclose(np.asarray(analysis.time), time)
+        np_test.assert_allclose(np.asarray(analysis.out), 5*np.sin(time))
+        self.assertFalse(analysis.out.flags.writeable)
+        self.assertFalse(analysis.out.flags.owndata)
+
+        # the files are kept as long as a waveform is alive
+        out = analysis.out
+        del analysis
+        gc.collect()
+        self.assertEqual(len(os.listdir(self._working_directory)), 1)
+        np_test.assert_allclose(np.asarray(out), 5*np.sin(time))
+        del out
+        gc.collect()
+        self.assertEqual(os.listdir(self._working_directory), [])
+
+    ##############################################
+
+    @skip_on_windows
+    def test_copy(self):
+        analysis = self._simulate(memory_map=False)
+        self.assertEqual(os.listdir(self._working_directory), [])
+        self.assertTrue(analysis.out.flags.writeable)
+        self.assertEqual(analysis.out.size, NUMBER_OF_POINTS)
+
+    ##############################################
+
+    @skip_on_windows
+    def test_parallel(self):
+
+        simulator = self._make_simulator('xyce-parallel', number_of_processes=3)
+        self.assertEqual(simulator.number_of_processes(), 3)
+        analysis = simulator.transient(step_time=1@u_us, end_time=1@u_ms)
+        self.assertEqual(analysis.out.size, NUMBER_OF_POINTS)
+        self.assertEqual(self._mpirun_log(), ['-np 3'])
+
+        # the circuit has 3 elements and 3 nodes
+        simulator = self._make_simulator('xyce-parallel', parallel='auto', number_of_processes=4)
+        self.assertEqual(simulator.number_of_processes(), 1)
+        simulator.transient(step_time=1@u_us, end_time=1@u_ms)
+        self.assertEqual(self._mpirun_log(), ['-np 3'])
+        simulator.PARALLEL_SIZE_THRESHOLD = 4
+        simulator.SIZE_PER_PROCESS = 2
+        self.assertEqual(simulator.number_of_processes(), 3)
+        simulator.SIZE_PER_PROCESS = 1
+        self.assertEqual(simulator.number_of_processes(), 4)
+
+        self.assertEqual(self._make_simulator(number_of_processes=3).number_of_processes(), 1)
+        with self.assertRaises(ValueError):
+            self._make_simulator(parallel='yes')
+
+    ##############################################
+
+    def test_read_header(self):
+
+        # the binary line overlaps two chunks
+        path = os.path.join(self._directory.name, 'output.raw')
+        with open(path, 'wb') as fh:
+            fh.write(b'Title: t\nDate: d\nPlotname: Operating Point\nFlags: real\n'
+                     b'No. Variables: 1\nNo. Points: 1\nVariables:\n\t0\tV(OUT)\tvoltage\nBinary:\n')
+            fh.write(np.array([5.]).tobytes())
+        raw_file = RawFile(path=path)
+        header, offset = raw_file._read_file_header(path, chunk_size=7)
+        self.assertEqual(offset, os.path.getsize(path) - 8)
+        self.assertTrue(header.endswith(b'Binary:\n'))
+        np_test.assert_array_equal(raw_file.variables['V(OUT)'].data, [5.])
+
+####################################################################################################
+
+if __name__ == '__main__':
+    unittest.main()